@@ -6,26 +6,46 @@ Manage human annotations and scores on traces.
 
 USAGE:
     python annotation_manager.py create-score --trace-id "abc" --name "quality" --value 8.5
+    python annotation_manager.py create-batch --input scores.csv --concurrency 4
     python annotation_manager.py update-score --score-id "xyz" --value 9.0
     python annotation_manager.py delete-score --score-id "xyz"
     python annotation_manager.py list-scores --trace-id "abc"
     python annotation_manager.py pending --score-name "review" --days 7
     python annotation_manager.py export --score-name "quality" --days 30 --format json
+    python annotation_manager.py export --score-name "quality" --days 180 --format jsonl --output q.jsonl.gz
     python annotation_manager.py configs
+    python annotation_manager.py agreement --score-name "accuracy" --days 30
 """
 
 import argparse
 import csv
+import gzip
+import hashlib
 import io
 import json
+import math
+import os
 import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple
 
 # Add parent directories to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
 from langfuse_client import get_langfuse_client
+import langfuse_rest_client
+
+# Ingestion limits (the API caps a batch at 3.5 MB, 100 scores stays well below)
+INGESTION_BATCH_SIZE = 100
+INGESTION_MAX_RETRIES = 3
+
+# Pagination for score/trace scans
+PAGE_SIZE = 100
+# Above this many scored traces, track them in a bloom filter instead of a set
+BLOOM_FILTER_THRESHOLD = 250_000
 
 
 def get_time_range(days: int) -> tuple:
@@ -90,6 +110,255 @@ def create_score(
         return {"error": str(e)}
 
 
+def score_idempotency_key(row: Dict[str, Any]) -> str:
+    """
+    Deterministic score ID for a batch row.
+
+    Langfuse upserts scores by ID, so re-running the same file updates the
+    existing scores instead of creating duplicates. An explicit
+    `idempotency_key` column wins over the derived key.
+    """
+    explicit = row.get("idempotency_key") or row.get("id")
+    if explicit:
+        return str(explicit)
+    parts = [
+        str(row.get("trace_id") or ""),
+        str(row.get("observation_id") or ""),
+        str(row.get("name") or ""),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def read_score_rows(input_file: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (line_number, row) from a CSV or JSONL score file.
+
+    The format is picked from the extension (.csv, otherwise JSONL). Expected
+    columns: trace_id, name, value | string_value, and optionally data_type,
+    comment, observation_id, idempotency_key.
+    """
+    path = Path(input_file)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, {k: v for k, v in row.items() if v not in (None, "")}
+        else:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, {"_parse_error": str(e)}
+
+
+def _category_labels(categories: Any) -> List[str]:
+    """Flatten score config categories ({label, value} dicts or strings) to labels."""
+    labels = []
+    for category in categories or []:
+        if isinstance(category, dict):
+            labels.append(str(category.get("label")))
+        elif hasattr(category, "label"):
+            labels.append(str(category.label))
+        else:
+            labels.append(str(category))
+    return labels
+
+
+def enum_name(value: Any) -> str:
+    """Plain upper-case name of an SDK enum or string ("ScoreDataType.NUMERIC" -> "NUMERIC")."""
+    value = getattr(value, "value", value)
+    return str(value or "").upper().split(".")[-1]
+
+
+def build_score_body(
+    row: Dict[str, Any],
+    configs: Dict[str, Dict[str, Any]],
+    strict: bool = False
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Validate a batch row against score configs and build the ingestion body.
+
+    Returns (body, None) on success or (None, error_message).
+    """
+    if "_parse_error" in row:
+        return None, f"Invalid JSON: {row['_parse_error']}"
+    trace_id = row.get("trace_id")
+    name = row.get("name")
+    if not trace_id or not name:
+        return None, "Row requires trace_id and name"
+
+    config = configs.get(name)
+    if config is None and strict:
+        return None, f"No score config named '{name}'"
+
+    config_type = enum_name((config or {}).get("data_type"))
+    data_type = enum_name(row.get("data_type")) or config_type or "NUMERIC"
+    if config_type and config_type != data_type:
+        return None, f"Data type {data_type} does not match config ({config_type})"
+
+    body: Dict[str, Any] = {
+        "id": score_idempotency_key(row),
+        "traceId": trace_id,
+        "name": name,
+        "dataType": data_type,
+    }
+
+    if data_type == "CATEGORICAL":
+        value = row.get("string_value", row.get("value"))
+        if value is None:
+            return None, "Categorical score requires string_value"
+        value = str(value)
+        labels = _category_labels((config or {}).get("categories"))
+        if labels and value not in labels:
+            return None, f"'{value}' is not one of {', '.join(labels)}"
+        body["value"] = value
+    else:
+        try:
+            value = float(row.get("value"))
+        except (TypeError, ValueError):
+            return None, f"{data_type} score requires a numeric value"
+        if data_type == "BOOLEAN":
+            if value not in (0.0, 1.0):
+                return None, "Boolean score requires value 0 or 1"
+        elif config:
+            min_value = config.get("min_value")
+            max_value = config.get("max_value")
+            if min_value is not None and value < min_value:
+                return None, f"Value {value} below config minimum {min_value}"
+            if max_value is not None and value > max_value:
+                return None, f"Value {value} above config maximum {max_value}"
+        body["value"] = value
+
+    if row.get("comment"):
+        body["comment"] = str(row["comment"])
+    if row.get("observation_id"):
+        body["observationId"] = row["observation_id"]
+
+    return body, None
+
+
+def _submit_score_chunk(chunk: List[Dict[str, Any]], max_retries: int) -> Dict[str, Any]:
+    """
+    Submit one chunk of score bodies via the ingestion API with retries.
+
+    Only events that failed with retryable statuses (429/5xx) or transport
+    errors are resent; each attempt uses fresh event envelope IDs while the
+    score IDs stay fixed.
+    """
+    pending = list(chunk)
+    succeeded: List[str] = []
+    failed: List[Dict[str, Any]] = []
+    attempt = 0
+
+    while pending:
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        events = [
+            {"id": str(uuid.uuid4()), "type": "score-create", "timestamp": now, "body": body}
+            for body in pending
+        ]
+        by_event = {event["id"]: event["body"] for event in events}
+        retry: List[Dict[str, Any]] = []
+
+        try:
+            response = langfuse_rest_client.ingest_batch(events)
+            if response is None:
+                failed.extend({"id": b["id"], "trace_id": b["traceId"], "error": "Missing Langfuse credentials"} for b in pending)
+                break
+            for success in response.get("successes", []):
+                body = by_event.get(success.get("id"))
+                if body:
+                    succeeded.append(body["id"])
+            for error in response.get("errors", []):
+                body = by_event.get(error.get("id"))
+                if not body:
+                    continue
+                status = error.get("status", 0)
+                if status == 429 or status >= 500:
+                    retry.append(body)
+                else:
+                    failed.append({
+                        "id": body["id"],
+                        "trace_id": body["traceId"],
+                        "error": error.get("message") or str(error.get("error")),
+                    })
+        except Exception as e:
+            retry = pending
+            last_error = str(e)
+        else:
+            last_error = "Retryable ingestion error"
+
+        attempt += 1
+        if retry and attempt > max_retries:
+            failed.extend({"id": b["id"], "trace_id": b["traceId"], "error": last_error} for b in retry)
+            break
+        if retry:
+            time.sleep(min(2 ** attempt, 30))
+        pending = retry
+
+    return {"succeeded": succeeded, "failed": failed}
+
+
+def create_scores_batch(
+    input_file: str,
+    batch_size: int = INGESTION_BATCH_SIZE,
+    concurrency: int = 4,
+    max_retries: int = INGESTION_MAX_RETRIES,
+    strict: bool = False,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Create many scores from a CSV/JSONL file through batched ingestion.
+
+    Rows are validated against the score configs (fetched once), grouped into
+    ingestion batches and submitted concurrently. Score IDs are derived from
+    each row, so reruns update rather than duplicate.
+    """
+    configs = {c["name"]: c for c in list_score_configs() if c.get("name")}
+
+    bodies: List[Dict[str, Any]] = []
+    invalid: List[Dict[str, Any]] = []
+    seen_ids = set()
+    try:
+        for line_no, row in read_score_rows(input_file):
+            body, error = build_score_body(row, configs, strict=strict)
+            if error:
+                invalid.append({"line": line_no, "trace_id": row.get("trace_id"), "error": error})
+            elif body["id"] in seen_ids:
+                invalid.append({"line": line_no, "trace_id": body["traceId"], "error": "Duplicate row (same idempotency key)"})
+            else:
+                seen_ids.add(body["id"])
+                bodies.append(body)
+    except OSError as e:
+        return {"error": f"Could not read file {input_file}: {e}"}
+
+    result = {
+        "status": "validated" if dry_run else "completed",
+        "input_file": input_file,
+        "rows": len(bodies) + len(invalid),
+        "valid": len(bodies),
+        "invalid": invalid,
+        "created": 0,
+        "failed": [],
+    }
+    if dry_run or not bodies:
+        return result
+
+    chunks = [bodies[i:i + batch_size] for i in range(0, len(bodies), batch_size)]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(_submit_score_chunk, chunk, max_retries) for chunk in chunks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            chunk_result = future.result()
+            result["created"] += len(chunk_result["succeeded"])
+            result["failed"].extend(chunk_result["failed"])
+            print(f"Submitted batch {done}/{len(chunks)} ({result['created']} scores)", file=sys.stderr)
+
+    if result["failed"]:
+        result["status"] = "partial"
+    return result
+
+
 def update_score(
     score_id: str,
     value: Optional[float] = None,
@@ -190,59 +459,364 @@ def list_scores(
         return []
 
 
+def iter_pages(
+    list_fn: Callable,
+    page_size: int = PAGE_SIZE,
+    start_page: int = 1,
+    **kwargs
+) -> Iterator[Any]:
+    """
+    Yield successive pages from a paginated Langfuse list endpoint.
+
+    Stops on an empty/short page or when meta.total_pages is reached.
+    """
+    page = start_page
+    while True:
+        response = list_fn(page=page, limit=page_size, **kwargs)
+        data = getattr(response, "data", None) or []
+        if not data:
+            break
+        yield response
+
+        meta = getattr(response, "meta", None)
+        total_pages = getattr(meta, "total_pages", None)
+        if len(data) < page_size or (total_pages is not None and page >= total_pages):
+            break
+        page += 1
+
+
+def iter_scores(
+    client,
+    name: Optional[str] = None,
+    from_time: Optional[str] = None,
+    to_time: Optional[str] = None,
+    page_size: int = PAGE_SIZE
+) -> Iterator[Any]:
+    """Stream every score matching the filters, page by page."""
+    kwargs: Dict[str, Any] = {}
+    if name:
+        kwargs["name"] = name
+    if from_time:
+        kwargs["from_timestamp"] = from_time
+    if to_time:
+        kwargs["to_timestamp"] = to_time
+    for response in iter_pages(client.api.scores.get_many, page_size=page_size, **kwargs):
+        yield from response.data
+
+
+def iter_traces(
+    client,
+    from_time: str,
+    to_time: str,
+    trace_name: Optional[str] = None,
+    page_size: int = PAGE_SIZE
+) -> Iterator[Any]:
+    """Stream traces in the window, newest first."""
+    kwargs: Dict[str, Any] = {
+        "from_timestamp": from_time,
+        "to_timestamp": to_time,
+        "order_by": "timestamp.desc",
+    }
+    if trace_name:
+        kwargs["name"] = trace_name
+    for response in iter_pages(client.api.trace.list, page_size=page_size, **kwargs):
+        yield from response.data
+
+
+class TraceIdBloomFilter:
+    """
+    Fixed-size bloom filter for trace IDs.
+
+    Used instead of a set when a window holds too many scored traces to keep
+    in memory. False positives only hide a pending trace, never surface an
+    already-scored one.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+def collect_scored_trace_ids(
+    client,
+    score_name: str,
+    from_time: str,
+    to_time: str,
+    bloom_threshold: int = BLOOM_FILTER_THRESHOLD
+):
+    """
+    Page through all scores with this name in the window and collect their trace IDs.
+
+    Returns a set, or a TraceIdBloomFilter when the API reports more scores
+    than `bloom_threshold`.
+    """
+    scored = None
+    pages = iter_pages(
+        client.api.scores.get_many,
+        name=score_name,
+        from_timestamp=from_time,
+        to_timestamp=to_time,
+    )
+    for response in pages:
+        if scored is None:
+            total = getattr(getattr(response, "meta", None), "total_items", None) or 0
+            scored = TraceIdBloomFilter(total) if total > bloom_threshold else set()
+        for score in response.data:
+            trace_id = getattr(score, "trace_id", None)
+            if trace_id:
+                scored.add(trace_id)
+    return scored if scored is not None else set()
+
+
+def collect_score_values(client, score_name: str, from_time: str, to_time: str) -> Dict[str, float]:
+    """Map trace ID -> lowest numeric value of a score in the window."""
+    values: Dict[str, float] = {}
+    for score in iter_scores(client, name=score_name, from_time=from_time, to_time=to_time):
+        trace_id = getattr(score, "trace_id", None)
+        value = getattr(score, "value", None)
+        if trace_id and isinstance(value, (int, float)):
+            values[trace_id] = min(value, values.get(trace_id, value))
+    return values
+
+
+def _pending_trace_dict(trace) -> Dict[str, Any]:
+    return {
+        "id": trace.id,
+        "name": getattr(trace, 'name', None),
+        "timestamp": str(trace.timestamp) if hasattr(trace, 'timestamp') else None,
+        "input_preview": str(getattr(trace, 'input', ''))[:100] if getattr(trace, 'input', None) else None
+    }
+
+
+def iter_pending_traces(
+    client,
+    score_name: str,
+    from_time: str,
+    to_time: str,
+    trace_name: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream traces in the window that lack `score_name` (newest first).
+
+    Anti-join: all scored trace IDs are collected first, then traces are
+    paged and yielded when absent from that set.
+    """
+    scored = collect_scored_trace_ids(client, score_name, from_time, to_time)
+    for trace in iter_traces(client, from_time, to_time, trace_name=trace_name):
+        if trace.id not in scored:
+            yield _pending_trace_dict(trace)
+
+
 def find_pending_traces(
     score_name: str,
     days: int,
     trace_name: Optional[str] = None,
-    limit: int = 20
+    limit: int = 20,
+    priority_score: Optional[str] = None,
+    scan_limit: int = 2000
 ) -> List[Dict[str, Any]]:
-    """Find traces that don't have a specific score."""
+    """
+    Find traces that don't have a specific score.
+
+    If priority_score is set, up to scan_limit pending traces are scanned and
+    the ones with the lowest existing value of that score come first.
+    """
     client = get_langfuse_client()
     from_time, to_time = get_time_range(days)
 
     try:
-        # Get recent traces
-        kwargs = {
-            "limit": limit * 5,  # Fetch more since we'll filter
-            "from_timestamp": from_time,
-            "to_timestamp": to_time
-        }
-        if trace_name:
-            kwargs["name"] = trace_name
+        pending_iter = iter_pending_traces(client, score_name, from_time, to_time, trace_name)
+
+        if not priority_score:
+            pending = []
+            for trace in pending_iter:
+                pending.append(trace)
+                if len(pending) >= limit:
+                    break
+            return pending
+
+        priorities = collect_score_values(client, priority_score, from_time, to_time)
+        candidates = []
+        for trace in pending_iter:
+            trace["priority_value"] = priorities.get(trace["id"])
+            candidates.append(trace)
+            if len(candidates) >= scan_limit:
+                break
+        candidates.sort(key=lambda t: (t["priority_value"] is None, t["priority_value"] or 0.0))
+        return candidates[:limit]
+    except Exception as e:
+        print(f"Error finding pending traces: {e}", file=sys.stderr)
+        return []
+
+
+EXPORT_FIELDS = ["id", "name", "trace_id", "value", "string_value", "comment", "data_type", "timestamp"]
+
+
+def score_export_row(score) -> Dict[str, Any]:
+    """Flatten a score object into an export row."""
+    return {
+        "id": score.id,
+        "name": score.name,
+        "trace_id": getattr(score, 'trace_id', None),
+        "value": getattr(score, 'value', None),
+        "string_value": getattr(score, 'string_value', None),
+        "comment": getattr(score, 'comment', None),
+        "data_type": getattr(score, 'data_type', None),
+        "timestamp": str(score.timestamp) if hasattr(score, 'timestamp') else None
+    }
+
+
+class ScoreExportWriter:
+    """Incremental writer for json (array), jsonl and csv score exports."""
+
+    def __init__(self, handle, format: str, write_header: bool = True):
+        self.handle = handle
+        self.format = format
+        self.rows = 0
+        self._csv = None
+        if format == "csv":
+            self._csv = csv.DictWriter(handle, fieldnames=EXPORT_FIELDS)
+            if write_header:
+                self._csv.writeheader()
+        elif format == "json":
+            handle.write("[")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self.format == "csv":
+            self._csv.writerow(row)
+        elif self.format == "json":
+            self.handle.write(("," if self.rows else "") + "\n  " + json.dumps(row))
+        else:
+            self.handle.write(json.dumps(row) + "\n")
+        self.rows += 1
+
+    def close(self) -> None:
+        if self.format == "json":
+            self.handle.write("\n]\n" if self.rows else "]\n")
+        self.handle.flush()
 
-        traces = client.api.trace.list(**kwargs)
 
-        # Get traces that already have this score
-        scored_traces = set()
-        scores = client.api.scores.get_many(
+def _cursor_path(output: str) -> Path:
+    return Path(f"{output}.cursor")
+
+
+def _write_cursor(output: str, cursor: Dict[str, Any]) -> None:
+    """Persist the export cursor atomically next to the output file."""
+    path = _cursor_path(output)
+    tmp = path.with_suffix(".cursor.tmp")
+    tmp.write_text(json.dumps(cursor), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def stream_export_scores(
+    score_name: str,
+    days: int,
+    format: str = "jsonl",
+    output: Optional[str] = None,
+    gzip_output: bool = False,
+    resume: bool = False,
+    page_size: int = PAGE_SIZE
+) -> Dict[str, Any]:
+    """
+    Stream scores page by page into a file (or stdout) in constant memory.
+
+    When writing to a file, a `<output>.cursor` sidecar records the time
+    window and last completed page; `resume=True` continues from it and
+    appends to the existing output. The cursor is removed on completion, so
+    resuming an existing output without a cursor is an error rather than a
+    fresh export over it; without either, resume starts a new export.
+    JSON array output cannot be resumed; use jsonl or csv for long exports.
+    """
+    client = get_langfuse_client()
+
+    if resume and not output:
+        return {"error": "--resume requires --output"}
+    if resume and format == "json":
+        return {"error": "JSON array exports cannot be resumed; use --format jsonl or csv"}
+
+    gzip_output = gzip_output or bool(output and output.endswith(".gz"))
+    start_page = 1
+    rows_before = 0
+
+    if resume and _cursor_path(output).exists():
+        cursor = json.loads(_cursor_path(output).read_text(encoding="utf-8"))
+        if cursor.get("score_name") != score_name or cursor.get("format") != format:
+            return {"error": f"Cursor {_cursor_path(output)} belongs to a different export"}
+        from_time, to_time = cursor["from"], cursor["to"]
+        start_page = cursor["page"] + 1
+        rows_before = cursor.get("rows", 0)
+    elif resume and Path(output).exists():
+        # The cursor is removed once an export finishes; starting over would truncate it
+        return {"error": f"No cursor for {output}; nothing to resume"}
+    else:
+        resume = False
+        from_time, to_time = get_time_range(days)
+
+    mode = "a" if resume else "w"
+    if output:
+        handle = gzip.open(output, mode + "t", encoding="utf-8", newline="") if gzip_output \
+            else open(output, mode, encoding="utf-8", newline="")
+    else:
+        handle = sys.stdout
+
+    writer = ScoreExportWriter(handle, format, write_header=not resume)
+    cursor = {"score_name": score_name, "format": format, "from": from_time, "to": to_time}
+    page = start_page - 1
+
+    try:
+        pages = iter_pages(
+            client.api.scores.get_many,
+            page_size=page_size,
+            start_page=start_page,
             name=score_name,
             from_timestamp=from_time,
             to_timestamp=to_time,
-            limit=1000
         )
-        if hasattr(scores, 'data'):
-            for score in scores.data:
-                if hasattr(score, 'trace_id'):
-                    scored_traces.add(score.trace_id)
-
-        # Filter to traces without the score
-        pending = []
-        if hasattr(traces, 'data'):
-            for trace in traces.data:
-                if trace.id not in scored_traces:
-                    pending.append({
-                        "id": trace.id,
-                        "name": getattr(trace, 'name', None),
-                        "timestamp": str(trace.timestamp) if hasattr(trace, 'timestamp') else None,
-                        "input_preview": str(getattr(trace, 'input', ''))[:100] if getattr(trace, 'input', None) else None
-                    })
-                    if len(pending) >= limit:
-                        break
-
-        return pending
+        for page, response in enumerate(pages, start=start_page):
+            for score in response.data:
+                writer.write(score_export_row(score))
+            if output:
+                handle.flush()
+                _write_cursor(output, {**cursor, "page": page, "rows": rows_before + writer.rows})
+        writer.close()
     except Exception as e:
-        print(f"Error finding pending traces: {e}", file=sys.stderr)
-        return []
+        print(f"Error exporting scores (page {page + 1}): {e}", file=sys.stderr)
+        if output:
+            handle.close()
+        return {
+            "error": str(e),
+            "rows": rows_before + writer.rows,
+            "resumable": bool(output) and format != "json",
+        }
+
+    if output:
+        handle.close()
+        _cursor_path(output).unlink(missing_ok=True)
+
+    return {
+        "status": "exported",
+        "output": output or "stdout",
+        "format": format,
+        "gzip": gzip_output,
+        "rows": rows_before + writer.rows,
+        "resumed": resume,
+    }
 
 
 def export_scores(
@@ -250,46 +824,19 @@ def export_scores(
     days: int,
     format: str = "json"
 ) -> str:
-    """Export scores to JSON or CSV format."""
+    """Export scores to a JSON, JSONL or CSV string (use stream_export_scores for large windows)."""
     client = get_langfuse_client()
     from_time, to_time = get_time_range(days)
 
     try:
-        scores = client.api.scores.get_many(
-            name=score_name,
-            from_timestamp=from_time,
-            to_timestamp=to_time,
-            limit=10000
-        )
-
-        data = []
-        if hasattr(scores, 'data'):
-            for score in scores.data:
-                row = {
-                    "id": score.id,
-                    "name": score.name,
-                    "trace_id": getattr(score, 'trace_id', None),
-                    "value": getattr(score, 'value', None),
-                    "string_value": getattr(score, 'string_value', None),
-                    "comment": getattr(score, 'comment', None),
-                    "data_type": getattr(score, 'data_type', None),
-                    "timestamp": str(score.timestamp) if hasattr(score, 'timestamp') else None
-                }
-                data.append(row)
-
-        if format == "json":
-            return json.dumps(data, indent=2)
-        elif format == "csv":
-            if not data:
-                return "No data to export"
-
-            output = io.StringIO()
-            writer = csv.DictWriter(output, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-            return output.getvalue()
-        else:
-            return json.dumps(data, indent=2)
+        output = io.StringIO()
+        writer = ScoreExportWriter(output, format if format in ("csv", "jsonl") else "json")
+        for score in iter_scores(client, name=score_name, from_time=from_time, to_time=to_time):
+            writer.write(score_export_row(score))
+        writer.close()
+        if format == "csv" and writer.rows == 0:
+            return "No data to export"
+        return output.getvalue()
 
     except Exception as e:
         print(f"Error exporting scores: {e}", file=sys.stderr)
@@ -309,7 +856,7 @@ def list_score_configs() -> List[Dict[str, Any]]:
                 for config in configs.data:
                     result.append({
                         "name": config.name,
-                        "data_type": getattr(config, 'data_type', None),
+                        "data_type": enum_name(getattr(config, 'data_type', None)) or None,
                         "min_value": getattr(config, 'min_value', None),
                         "max_value": getattr(config, 'max_value', None),
                         "categories": getattr(config, 'categories', None),
@@ -326,7 +873,7 @@ def list_score_configs() -> List[Dict[str, Any]]:
                     if name not in seen_names:
                         seen_names[name] = {
                             "name": name,
-                            "data_type": getattr(score, 'data_type', 'NUMERIC'),
+                            "data_type": enum_name(getattr(score, 'data_type', None)) or "NUMERIC",
                             "sample_value": getattr(score, 'value', None)
                         }
             return list(seen_names.values())
@@ -336,6 +883,271 @@ def list_score_configs() -> List[Dict[str, Any]]:
         return []
 
 
+# Agreement analytics
+
+HUMAN_SOURCE = "ANNOTATION"
+
+
+def normalize_score(value: Any) -> float:
+    """Normalize numeric scores to 0-1 (0-10 values are divided by 10)."""
+    v = float(value)
+    if v < 0:
+        return 0.0
+    if v <= 1.0:
+        return v
+    if v <= 10.0:
+        return v / 10.0
+    return 1.0
+
+
+def score_source(score) -> str:
+    """Score source as plain upper-case string (ANNOTATION, API, EVAL)."""
+    return enum_name(getattr(score, "source", None))
+
+
+def score_value(score) -> Any:
+    """Comparable value of a score: string for categorical, 0-1 float otherwise."""
+    data_type = str(getattr(score, "data_type", "") or "").upper()
+    if "CATEGORICAL" in data_type:
+        return getattr(score, "string_value", None)
+    value = getattr(score, "value", None)
+    if isinstance(value, (int, float)):
+        return normalize_score(value)
+    return getattr(score, "string_value", None)
+
+
+def build_score_index(
+    client,
+    name: str,
+    from_time: str,
+    to_time: str,
+    source: Optional[str] = None,
+    exclude_source: Optional[str] = None
+) -> Dict[str, Any]:
+    """Hash index trace ID -> score value for one score stream."""
+    index: Dict[str, Any] = {}
+    for score in iter_scores(client, name=name, from_time=from_time, to_time=to_time):
+        src = score_source(score)
+        if source and src != source:
+            continue
+        if exclude_source and src == exclude_source:
+            continue
+        trace_id = getattr(score, "trace_id", None)
+        value = score_value(score)
+        if trace_id and value is not None:
+            index[trace_id] = value
+    return index
+
+
+def pair_scores(
+    client,
+    human_name: str,
+    judge_name: str,
+    from_time: str,
+    to_time: str,
+    human_source: str = HUMAN_SOURCE
+) -> List[Tuple[Any, Any]]:
+    """
+    Join human and judge scores by trace ID.
+
+    Human scores are indexed in memory; judge scores are streamed against
+    that index, so only one side is ever held at once.
+    """
+    human = build_score_index(client, human_name, from_time, to_time, source=human_source)
+    pairs = []
+    if not human:
+        return pairs
+    for score in iter_scores(client, name=judge_name, from_time=from_time, to_time=to_time):
+        if score_source(score) == human_source:
+            continue
+        trace_id = getattr(score, "trace_id", None)
+        value = score_value(score)
+        if trace_id in human and value is not None:
+            pairs.append((human.pop(trace_id), value))
+    return pairs
+
+
+def cohens_kappa(a: List[Any], b: List[Any], categories: List[Any], weights: Optional[str] = None) -> Optional[float]:
+    """Cohen's kappa; weights="quadratic" gives the ordinal weighted variant."""
+    n = len(a)
+    k = len(categories)
+    if n == 0 or k < 2:
+        return None
+    position = {c: i for i, c in enumerate(categories)}
+
+    def weight(i: int, j: int) -> float:
+        if weights == "quadratic":
+            return ((i - j) / (k - 1)) ** 2
+        return 0.0 if i == j else 1.0
+
+    marg_a = [0] * k
+    marg_b = [0] * k
+    observed = 0.0
+    for x, y in zip(a, b):
+        i, j = position[x], position[y]
+        marg_a[i] += 1
+        marg_b[j] += 1
+        observed += weight(i, j)
+    observed /= n
+    expected = sum(marg_a[i] * marg_b[j] * weight(i, j) for i in range(k) for j in range(k)) / (n * n)
+    if expected == 0:
+        return 1.0 if observed == 0 else None
+    return 1.0 - observed / expected
+
+
+def krippendorff_alpha(a: List[Any], b: List[Any], level: str = "interval") -> Optional[float]:
+    """
+    Krippendorff's alpha for two raters with no missing values.
+
+    level="interval" uses squared differences, "nominal" exact matches.
+    """
+    n = len(a)
+    if n < 2:
+        return None
+    pooled = list(a) + list(b)
+    m = len(pooled)
+    if level == "nominal":
+        observed = sum(1 for x, y in zip(a, b) if x != y) / n
+        counts: Dict[Any, int] = {}
+        for v in pooled:
+            counts[v] = counts.get(v, 0) + 1
+        expected = (m * m - sum(c * c for c in counts.values())) / (m * (m - 1))
+    else:
+        observed = sum((x - y) ** 2 for x, y in zip(a, b)) / n
+        mean = sum(pooled) / m
+        expected = 2 * sum((v - mean) ** 2 for v in pooled) / (m - 1)
+    if expected == 0:
+        return 1.0 if observed == 0 else None
+    return 1.0 - observed / expected
+
+
+def pearson(a: List[float], b: List[float]) -> Optional[float]:
+    n = len(a)
+    if n < 2:
+        return None
+    mean_a = sum(a) / n
+    mean_b = sum(b) / n
+    cov = sum((x - mean_a) * (y - mean_b) for x, y in zip(a, b))
+    var_a = sum((x - mean_a) ** 2 for x in a)
+    var_b = sum((y - mean_b) ** 2 for y in b)
+    if var_a == 0 or var_b == 0:
+        return None
+    return cov / math.sqrt(var_a * var_b)
+
+
+def _ranks(values: List[float]) -> List[float]:
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def spearman(a: List[float], b: List[float]) -> Optional[float]:
+    return pearson(_ranks(a), _ranks(b))
+
+
+def bin_value(value: float, bins: int) -> int:
+    return min(int(value * bins), bins - 1)
+
+
+def agreement_metrics(pairs: List[Tuple[Any, Any]], bins: int = 5) -> Dict[str, Any]:
+    """Agreement statistics for (human, judge) value pairs."""
+    human = [h for h, _ in pairs]
+    judge = [j for _, j in pairs]
+    numeric = all(isinstance(v, (int, float)) for v in human + judge)
+
+    if numeric:
+        human_bins = [bin_value(v, bins) for v in human]
+        judge_bins = [bin_value(v, bins) for v in judge]
+        categories = list(range(bins))
+        metrics = {
+            "data_type": "NUMERIC",
+            "pearson": pearson(human, judge),
+            "spearman": spearman(human, judge),
+            "mae": sum(abs(h - j) for h, j in pairs) / len(pairs) if pairs else None,
+            "bias": sum(j - h for h, j in pairs) / len(pairs) if pairs else None,
+            "kappa": cohens_kappa(human_bins, judge_bins, categories),
+            "weighted_kappa": cohens_kappa(human_bins, judge_bins, categories, weights="quadratic"),
+            "alpha": krippendorff_alpha(human, judge, level="interval"),
+        }
+        labels = [f"{i / bins:.1f}-{(i + 1) / bins:.1f}" for i in categories]
+    else:
+        human_bins = [str(v) for v in human]
+        judge_bins = [str(v) for v in judge]
+        categories = sorted(set(human_bins) | set(judge_bins))
+        metrics = {
+            "data_type": "CATEGORICAL",
+            "kappa": cohens_kappa(human_bins, judge_bins, categories),
+            "alpha": krippendorff_alpha(human_bins, judge_bins, level="nominal"),
+        }
+        labels = categories
+
+    position = {c: i for i, c in enumerate(categories)}
+    matrix = [[0] * len(categories) for _ in categories]
+    for h, j in zip(human_bins, judge_bins):
+        matrix[position[h]][position[j]] += 1
+
+    metrics["pairs"] = len(pairs)
+    metrics["exact_agreement"] = (
+        sum(1 for h, j in zip(human_bins, judge_bins) if h == j) / len(pairs) if pairs else None
+    )
+    metrics["confusion"] = {"labels": labels, "matrix": matrix}
+    metrics["verdict"] = agreement_verdict(metrics.get("alpha"))
+    return metrics
+
+
+def agreement_verdict(alpha: Optional[float]) -> str:
+    """Krippendorff's reliability conventions: >=0.8 reliable, >=0.667 tentative."""
+    if alpha is None:
+        return "insufficient data"
+    if alpha >= 0.8:
+        return "trust"
+    if alpha >= 0.667:
+        return "tentative"
+    return "do not trust"
+
+
+def compute_agreement(
+    score_names: Optional[List[str]],
+    days: int,
+    judge_name: Optional[str] = None,
+    human_source: str = HUMAN_SOURCE,
+    all_configs: bool = False,
+    bins: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Compare human annotations with judge scores per score name.
+
+    By default human and judge scores share a name and are told apart by
+    source (ANNOTATION vs API/EVAL). With judge_name, a single human score
+    is compared against a differently named judge score.
+    """
+    client = get_langfuse_client()
+    from_time, to_time = get_time_range(days)
+
+    names = list(score_names or [])
+    if all_configs:
+        names.extend(c["name"] for c in list_score_configs() if c.get("name") and c["name"] not in names)
+
+    results = []
+    for name in names:
+        judge = judge_name or name
+        try:
+            pairs = pair_scores(client, name, judge, from_time, to_time, human_source=human_source)
+            results.append({"human_score": name, "judge_score": judge, **agreement_metrics(pairs, bins=bins)})
+        except Exception as e:
+            print(f"Error computing agreement for '{name}': {e}", file=sys.stderr)
+            results.append({"human_score": name, "judge_score": judge, "error": str(e)})
+    return results
+
+
 # Formatting functions
 
 def format_result(result: Dict[str, Any]) -> str:
@@ -353,6 +1165,79 @@ def format_result(result: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def format_batch_scores(result: Dict[str, Any]) -> str:
+    """Format batch score creation result."""
+    if "error" in result:
+        return f"Error: {result['error']}"
+
+    lines = ["# Batch Score Import\n"]
+    lines.append(f"**Status:** {result.get('status')}")
+    lines.append(f"**File:** {result.get('input_file')}")
+    lines.append(f"**Rows:** {result.get('rows', 0)}")
+    lines.append(f"**Valid:** {result.get('valid', 0)}")
+    lines.append(f"**Created/Updated:** {result.get('created', 0)}")
+    lines.append(f"**Invalid:** {len(result.get('invalid', []))}")
+    lines.append(f"**Failed:** {len(result.get('failed', []))}")
+
+    if result.get("invalid"):
+        lines.append("\n## Invalid Rows\n")
+        lines.append("| Line | Trace ID | Error |")
+        lines.append("|------|----------|-------|")
+        for row in result["invalid"][:50]:
+            lines.append(f"| {row.get('line')} | {row.get('trace_id') or '-'} | {row.get('error')} |")
+        if len(result["invalid"]) > 50:
+            lines.append(f"\n_...and {len(result['invalid']) - 50} more_")
+
+    if result.get("failed"):
+        lines.append("\n## Failed Submissions\n")
+        lines.append("| Score ID | Trace ID | Error |")
+        lines.append("|----------|----------|-------|")
+        for row in result["failed"][:50]:
+            lines.append(f"| {row.get('id')} | {row.get('trace_id')} | {row.get('error')} |")
+        if len(result["failed"]) > 50:
+            lines.append(f"\n_...and {len(result['failed']) - 50} more_")
+
+    return "\n".join(lines)
+
+
+def format_agreement(results: List[Dict[str, Any]]) -> str:
+    """Format human vs judge agreement analytics."""
+    if not results:
+        return "No score names to compare"
+
+    def fmt(value: Optional[float]) -> str:
+        return f"{value:.3f}" if isinstance(value, (int, float)) else "-"
+
+    lines = ["# Judge vs Human Agreement\n"]
+    lines.append("| Human Score | Judge Score | Pairs | Kappa | Weighted Kappa | Alpha | Spearman | MAE | Verdict |")
+    lines.append("|-------------|-------------|-------|-------|----------------|-------|----------|-----|---------|")
+    for r in results:
+        if "error" in r:
+            lines.append(f"| {r['human_score']} | {r['judge_score']} | - | - | - | - | - | - | error: {r['error']} |")
+            continue
+        lines.append(
+            f"| {r['human_score']} | {r['judge_score']} | {r['pairs']} | {fmt(r.get('kappa'))} | "
+            f"{fmt(r.get('weighted_kappa'))} | {fmt(r.get('alpha'))} | {fmt(r.get('spearman'))} | "
+            f"{fmt(r.get('mae'))} | {r['verdict']} |"
+        )
+
+    for r in results:
+        if "error" in r or not r.get("pairs"):
+            continue
+        lines.append(f"\n## {r['human_score']} (rows: human, columns: judge)\n")
+        labels = r["confusion"]["labels"]
+        lines.append("| | " + " | ".join(str(l) for l in labels) + " |")
+        lines.append("|---|" + "---|" * len(labels))
+        for label, row in zip(labels, r["confusion"]["matrix"]):
+            lines.append(f"| **{label}** | " + " | ".join(str(c) for c in row) + " |")
+        if r.get("bias") is not None:
+            lines.append(f"\n**Judge bias:** {r['bias']:+.3f} · **Exact agreement:** {fmt(r['exact_agreement'])}")
+        else:
+            lines.append(f"\n**Exact agreement:** {fmt(r['exact_agreement'])}")
+
+    return "\n".join(lines)
+
+
 def format_score_list(scores: List[Dict[str, Any]]) -> str:
     """Format score list for display."""
     if not scores:
@@ -383,9 +1268,15 @@ def format_pending(traces: List[Dict[str, Any]], score_name: str) -> str:
     if not traces:
         return f"No traces pending for score '{score_name}'"
 
+    show_priority = any("priority_value" in t for t in traces)
+
     lines = [f"# Traces Pending '{score_name}' Annotation\n"]
-    lines.append("| Trace ID | Name | Timestamp | Input Preview |")
-    lines.append("|----------|------|-----------|---------------|")
+    if show_priority:
+        lines.append("| Trace ID | Name | Timestamp | Priority Score | Input Preview |")
+        lines.append("|----------|------|-----------|----------------|---------------|")
+    else:
+        lines.append("| Trace ID | Name | Timestamp | Input Preview |")
+        lines.append("|----------|------|-----------|---------------|")
 
     for t in traces:
         trace_id = t.get('id', '-')
@@ -399,7 +1290,12 @@ def format_pending(traces: List[Dict[str, Any]], score_name: str) -> str:
         if len(preview) > 40:
             preview = preview[:40] + "..."
 
-        lines.append(f"| {trace_id} | {name} | {timestamp} | {preview} |")
+        if show_priority:
+            priority = t.get('priority_value')
+            priority = f"{priority:.3f}" if priority is not None else '-'
+            lines.append(f"| {trace_id} | {name} | {timestamp} | {priority} | {preview} |")
+        else:
+            lines.append(f"| {trace_id} | {name} | {timestamp} | {preview} |")
 
     return "\n".join(lines)
 
@@ -453,6 +1349,18 @@ def main():
                                help="Score data type")
     create_parser.add_argument("--observation-id", help="Optional observation ID")
 
+    # Create batch command
+    batch_parser = subparsers.add_parser("create-batch", help="Create scores from a CSV/JSONL file")
+    batch_parser.add_argument("--input", required=True, help="CSV or JSONL file with one score per row")
+    batch_parser.add_argument("--batch-size", type=int, default=INGESTION_BATCH_SIZE,
+                              help=f"Scores per ingestion request (default: {INGESTION_BATCH_SIZE})")
+    batch_parser.add_argument("--concurrency", type=int, default=4, help="Parallel ingestion requests")
+    batch_parser.add_argument("--max-retries", type=int, default=INGESTION_MAX_RETRIES,
+                              help="Retries for rate-limited or failed batches")
+    batch_parser.add_argument("--strict", action="store_true",
+                              help="Reject rows whose score name has no score config")
+    batch_parser.add_argument("--dry-run", action="store_true", help="Validate rows without submitting")
+
     # Update score command
     update_parser = subparsers.add_parser("update-score", help="Update a score")
     update_parser.add_argument("--score-id", required=True, help="Score ID")
@@ -476,18 +1384,37 @@ def main():
     pending_parser.add_argument("--days", type=int, default=7, help="Days to look back")
     pending_parser.add_argument("--trace-name", help="Filter by trace name")
     pending_parser.add_argument("--limit", type=int, default=20, help="Max results")
+    pending_parser.add_argument("--priority-score",
+                                help="Order pending traces by lowest value of this score (e.g. an automated judge)")
+    pending_parser.add_argument("--scan-limit", type=int, default=2000,
+                                help="Pending traces to scan when ordering by --priority-score")
 
     # Export command
     export_parser = subparsers.add_parser("export", help="Export scores")
     export_parser.add_argument("--score-name", required=True, help="Score name")
     export_parser.add_argument("--days", type=int, default=30, help="Days to export")
     export_parser.add_argument("--format", default="json",
-                               choices=["json", "csv"], help="Output format")
+                               choices=["json", "jsonl", "csv"], help="Output format")
     export_parser.add_argument("--output", help="Output file (prints to stdout if not set)")
+    export_parser.add_argument("--gzip", action="store_true",
+                               help="Gzip-compress the output file (implied by a .gz suffix)")
+    export_parser.add_argument("--resume", action="store_true",
+                               help="Continue an interrupted export from its .cursor file")
 
     # Configs command
     subparsers.add_parser("configs", help="List score configurations")
 
+    # Agreement command
+    agreement_parser = subparsers.add_parser("agreement", help="Compare human annotations with judge scores")
+    agreement_parser.add_argument("--score-name", nargs="+", help="Score name(s) scored by both humans and judges")
+    agreement_parser.add_argument("--judge-name", help="Judge score name if it differs from the human score name")
+    agreement_parser.add_argument("--all-configs", action="store_true", help="Compare every score config")
+    agreement_parser.add_argument("--human-source", default=HUMAN_SOURCE,
+                                  help=f"Score source treated as human (default: {HUMAN_SOURCE})")
+    agreement_parser.add_argument("--days", type=int, default=30, help="Days to look back")
+    agreement_parser.add_argument("--bins", type=int, default=5, help="Bins for numeric kappa/confusion")
+    agreement_parser.add_argument("--format", default="markdown", choices=["markdown", "json"], help="Output format")
+
     args = parser.parse_args()
 
     if args.command == "create-score":
@@ -502,6 +1429,17 @@ def main():
         )
         print(format_result(result))
 
+    elif args.command == "create-batch":
+        result = create_scores_batch(
+            input_file=args.input,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            max_retries=args.max_retries,
+            strict=args.strict,
+            dry_run=args.dry_run
+        )
+        print(format_batch_scores(result))
+
     elif args.command == "update-score":
         result = update_score(
             score_id=args.score_id,
@@ -528,27 +1466,49 @@ def main():
             score_name=args.score_name,
             days=args.days,
             trace_name=args.trace_name,
-            limit=args.limit
+            limit=args.limit,
+            priority_score=args.priority_score,
+            scan_limit=args.scan_limit
         )
         print(format_pending(traces, args.score_name))
 
     elif args.command == "export":
-        output = export_scores(
+        result = stream_export_scores(
             score_name=args.score_name,
             days=args.days,
-            format=args.format
+            format=args.format,
+            output=args.output,
+            gzip_output=args.gzip,
+            resume=args.resume
         )
+        if "error" in result:
+            print(f"Error: {result['error']}", file=sys.stderr)
+            if result.get("resumable"):
+                print(f"Re-run with --resume to continue ({result['rows']} rows written)", file=sys.stderr)
+            sys.exit(1)
         if args.output:
-            with open(args.output, 'w') as f:
-                f.write(output)
-            print(f"Exported to {args.output}")
-        else:
-            print(output)
+            print(f"Exported {result['rows']} scores to {args.output}")
 
     elif args.command == "configs":
         configs = list_score_configs()
         print(format_configs(configs))
 
+    elif args.command == "agreement":
+        if not args.score_name and not args.all_configs:
+            parser.error("agreement requires --score-name or --all-configs")
+        results = compute_agreement(
+            score_names=args.score_name,
+            days=args.days,
+            judge_name=args.judge_name,
+            human_source=args.human_source,
+            all_configs=args.all_configs,
+            bins=args.bins
+        )
+        if args.format == "json":
+            print(json.dumps(results, indent=2))
+        else:
+            print(format_agreement(results))
+
 
 if __name__ == "__main__":
     main()
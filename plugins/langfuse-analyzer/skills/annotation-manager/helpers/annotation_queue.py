@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Langfuse Annotation Queue
+
+Persistent, lease-based work queue for human review, built on annotation_manager.
+Pending traces are sampled per stratum (trace name, release, metadata fields),
+prioritized by low or uncertain automated scores, and deduplicated by a hash of
+their normalized input. Reviewers pull leased items so several people can work
+the same queue without collisions.
+
+USAGE:
+    python annotation_queue.py refresh --queue review-q --score-name "human_review" --days 7 \\
+        --priority-score "accuracy" --stratify-by name release --per-stratum 25
+    python annotation_queue.py pull --queue review-q --reviewer alice --count 5
+    python annotation_queue.py complete --queue review-q --reviewer alice --trace-id abc --value 8
+    python annotation_queue.py release --queue review-q --reviewer alice --trace-id abc
+    python annotation_queue.py status --queue review-q
+
+Queue state lives in .claude/annotation-queue/<queue>.json; refreshes only scan
+traces and scores newer than the last refresh.
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from annotation_manager import (
+    TraceIdBloomFilter,
+    collect_score_values,
+    collect_scored_trace_ids,
+    create_score,
+    get_langfuse_client,
+    get_time_range,
+    iter_scores,
+    iter_traces,
+)
+
+QUEUE_DIR = ".claude/annotation-queue"
+DEFAULT_LEASE_MINUTES = 30
+# Re-scan a little before the watermark so late-arriving traces are not missed
+REFRESH_OVERLAP = timedelta(minutes=5)
+# Candidates beyond a full stratum wait in a backlog of up to this many times per_stratum
+BACKLOG_MULTIPLE = 4
+
+_WHITESPACE = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def to_iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def from_iso(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+# =============================================================================
+# QUEUE STORAGE
+# =============================================================================
+
+def queue_path(queue_name: str, queue_dir: str = QUEUE_DIR) -> Path:
+    return Path(queue_dir) / f"{queue_name}.json"
+
+
+@contextmanager
+def locked_queue(queue_name: str, queue_dir: str = QUEUE_DIR) -> Iterator[Dict[str, Any]]:
+    """
+    Load a queue under an exclusive file lock and write it back on exit.
+
+    The lock serializes concurrent reviewers pulling from the same queue.
+    """
+    path = queue_path(queue_name, queue_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            state = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+            yield state
+            if state:
+                state["updated_at"] = to_iso(utc_now())
+                tmp = path.with_suffix(".json.tmp")
+                tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+                os.replace(tmp, path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# =============================================================================
+# SAMPLING HELPERS
+# =============================================================================
+
+def input_fingerprint(value: Any) -> str:
+    """
+    Hash a trace input after normalization (case, whitespace, punctuation).
+
+    Near-identical inputs (formatting or casing differences) share a hash.
+    """
+    text = json.dumps(value, sort_keys=True, default=str) if not isinstance(value, str) else value
+    text = _PUNCTUATION.sub(" ", text.lower())
+    text = _WHITESPACE.sub(" ", text).strip()
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def trace_attribute(trace, field: str) -> Optional[str]:
+    """Read a stratification field from a trace ("name", "release", "metadata.<key>")."""
+    if field.startswith("metadata."):
+        metadata = getattr(trace, "metadata", None) or {}
+        value = metadata.get(field.split(".", 1)[1]) if isinstance(metadata, dict) else None
+    else:
+        value = getattr(trace, field, None)
+    return None if value is None else str(value)
+
+
+def stratum_key(trace, stratify_by: List[str]) -> str:
+    if not stratify_by:
+        return "all"
+    return "|".join(f"{field}={trace_attribute(trace, field) or '-'}" for field in stratify_by)
+
+
+def review_priority(value: Optional[float]) -> float:
+    """
+    Priority in [0, 1] from an automated score.
+
+    Combines how low the score is with how uncertain it is (close to 0.5).
+    Traces without an automated score count as maximally uncertain.
+    """
+    if value is None:
+        return 0.75
+    v = value / 10.0 if value > 1.0 else max(0.0, value)
+    uncertainty = 1.0 - abs(v - 0.5) * 2
+    return round(0.5 * (1.0 - v) + 0.5 * uncertainty, 4)
+
+
+# =============================================================================
+# QUEUE OPERATIONS
+# =============================================================================
+
+def _expire_leases(state: Dict[str, Any], now: datetime) -> int:
+    expired = 0
+    for item in state["items"].values():
+        if item["status"] == "leased" and from_iso(item["lease_expires"]) <= now:
+            item.update(status="open", lease_owner=None, lease_expires=None)
+            expired += 1
+    return expired
+
+
+def _fill_strata(
+    state: Dict[str, Any],
+    candidates: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> Dict[str, int]:
+    """
+    Open the highest-priority backlog items and new candidates of each stratum
+    until it holds `per_stratum` open or leased items. The rest wait in the
+    backlog (bounded per stratum); the lowest-priority overflow is dropped.
+    """
+    items = state["items"]
+    per_stratum = state["per_stratum"]
+    active: Dict[str, int] = {}
+    waiting: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items.values():
+        if item["status"] in ("open", "leased"):
+            active[item["stratum"]] = active.get(item["stratum"], 0) + 1
+        elif item["status"] == "backlog":
+            waiting.setdefault(item["stratum"], []).append(item)
+    for stratum, entries in (candidates or {}).items():
+        waiting.setdefault(stratum, []).extend(entries)
+
+    added = 0
+    sampled_out = 0
+    for stratum, entries in waiting.items():
+        entries.sort(key=lambda e: e["priority"], reverse=True)
+        capacity = max(0, per_stratum - active.get(stratum, 0))
+        for position, entry in enumerate(entries):
+            if position < capacity:
+                entry["status"] = "open"
+                added += 1
+            elif position >= capacity + BACKLOG_MULTIPLE * per_stratum:
+                items.pop(entry["trace_id"], None)
+                state["input_hashes"].pop(entry["input_hash"], None)
+                sampled_out += 1
+                continue
+            items[entry["trace_id"]] = entry
+    return {"added": added, "sampled_out": sampled_out}
+
+
+def refresh_queue(
+    queue_name: str,
+    score_name: Optional[str] = None,
+    days: int = 7,
+    trace_name: Optional[str] = None,
+    priority_score: Optional[str] = None,
+    stratify_by: Optional[List[str]] = None,
+    per_stratum: int = 25
+) -> Dict[str, Any]:
+    """
+    Create or incrementally refresh a queue.
+
+    The first refresh scans the last `days`; later refreshes only scan traces
+    and scores since the previous refresh. Items that received `score_name`
+    in the meantime are marked done, and the freed capacity is refilled from
+    each stratum's backlog.
+    """
+    client = get_langfuse_client()
+    now = utc_now()
+
+    with locked_queue(queue_name) as state:
+        if not state:
+            if not score_name:
+                return {"error": f"Queue '{queue_name}' does not exist; pass --score-name to create it"}
+            state.update({
+                "queue": queue_name,
+                "score_name": score_name,
+                "trace_name": trace_name,
+                "priority_score": priority_score,
+                "stratify_by": stratify_by or ["name"],
+                "per_stratum": per_stratum,
+                "created_at": to_iso(now),
+                "watermark": None,
+                "items": {},
+                "input_hashes": {},
+            })
+
+        if state["watermark"]:
+            from_time = to_iso(from_iso(state["watermark"]) - REFRESH_OVERLAP)
+        else:
+            from_time, _ = get_time_range(days)
+        to_time = to_iso(now)
+        items = state["items"]
+
+        try:
+            scored = collect_scored_trace_ids(client, state["score_name"], from_time, to_time)
+            priorities = (
+                collect_score_values(client, state["priority_score"], from_time, to_time)
+                if state.get("priority_score") else {}
+            )
+
+            newly_scored = {
+                trace_id for trace_id, item in items.items()
+                if item["status"] in ("open", "leased", "backlog") and trace_id in scored
+            }
+            if newly_scored and isinstance(scored, TraceIdBloomFilter):
+                # A bloom filter hit can be a false positive; only exact matches complete an item
+                newly_scored = {
+                    score.trace_id
+                    for score in iter_scores(client, name=state["score_name"], from_time=from_time, to_time=to_time)
+                    if getattr(score, "trace_id", None) in newly_scored
+                }
+
+            completed = 0
+            for trace_id, item in items.items():
+                if trace_id in newly_scored:
+                    item.update(status="done", lease_owner=None, lease_expires=None)
+                    completed += 1
+                if trace_id in priorities and item["status"] in ("open", "backlog"):
+                    item["priority_value"] = priorities[trace_id]
+                    item["priority"] = review_priority(priorities[trace_id])
+
+            # Candidates per stratum, highest priority first
+            candidates: Dict[str, List[Dict[str, Any]]] = {}
+            duplicates = 0
+            scanned = 0
+            for trace in iter_traces(client, from_time, to_time, trace_name=state.get("trace_name")):
+                scanned += 1
+                if trace.id in items or trace.id in scored:
+                    continue
+                fingerprint = input_fingerprint(getattr(trace, "input", None))
+                original = state["input_hashes"].get(fingerprint)
+                if original and original != trace.id:
+                    duplicates += 1
+                    continue
+                value = priorities.get(trace.id)
+                stratum = stratum_key(trace, state["stratify_by"])
+                candidates.setdefault(stratum, []).append({
+                    "trace_id": trace.id,
+                    "name": getattr(trace, "name", None),
+                    "timestamp": str(getattr(trace, "timestamp", "")) or None,
+                    "stratum": stratum,
+                    "input_hash": fingerprint,
+                    "priority_value": value,
+                    "priority": review_priority(value),
+                    "status": "backlog",
+                    "lease_owner": None,
+                    "lease_expires": None,
+                })
+                state["input_hashes"][fingerprint] = trace.id
+        except Exception as e:
+            print(f"Error refreshing queue: {e}", file=sys.stderr)
+            return {"error": str(e)}
+
+        filled = _fill_strata(state, candidates)
+        _expire_leases(state, now)
+        state["watermark"] = to_time
+
+        return {
+            "queue": queue_name,
+            "status": "refreshed",
+            "window": [from_time, to_time],
+            "scanned": scanned,
+            "added": filled["added"],
+            "completed": completed,
+            "duplicates": duplicates,
+            "backlog": sum(1 for item in items.values() if item["status"] == "backlog"),
+            "sampled_out": filled["sampled_out"],
+            "summary": summarize(state),
+        }
+
+
+def pull_items(
+    queue_name: str,
+    reviewer: str,
+    count: int = 5,
+    lease_minutes: int = DEFAULT_LEASE_MINUTES
+) -> Dict[str, Any]:
+    """
+    Lease up to `count` items to a reviewer.
+
+    Items already leased to the reviewer are returned first (with renewed
+    leases). New items are drawn round-robin from the strata with the least
+    review coverage, highest priority first.
+    """
+    now = utc_now()
+    expires = to_iso(now + timedelta(minutes=lease_minutes))
+
+    with locked_queue(queue_name) as state:
+        if not state:
+            return {"error": f"Queue '{queue_name}' does not exist"}
+        _expire_leases(state, now)
+        items = state["items"]
+
+        leased = [i for i in items.values() if i["status"] == "leased" and i["lease_owner"] == reviewer]
+        for item in leased:
+            item["lease_expires"] = expires
+
+        coverage: Dict[str, int] = {}
+        open_by_stratum: Dict[str, List[Dict[str, Any]]] = {}
+        for item in items.values():
+            if item["status"] in ("leased", "done"):
+                coverage[item["stratum"]] = coverage.get(item["stratum"], 0) + 1
+            elif item["status"] == "open":
+                open_by_stratum.setdefault(item["stratum"], []).append(item)
+        for entries in open_by_stratum.values():
+            entries.sort(key=lambda e: e["priority"], reverse=True)
+
+        while len(leased) < count and open_by_stratum:
+            stratum = min(open_by_stratum, key=lambda s: (coverage.get(s, 0), -open_by_stratum[s][0]["priority"]))
+            item = open_by_stratum[stratum].pop(0)
+            if not open_by_stratum[stratum]:
+                del open_by_stratum[stratum]
+            item.update(status="leased", lease_owner=reviewer, lease_expires=expires)
+            coverage[stratum] = coverage.get(stratum, 0) + 1
+            leased.append(item)
+
+        return {
+            "queue": queue_name,
+            "reviewer": reviewer,
+            "score_name": state["score_name"],
+            "lease_expires": expires,
+            "items": leased,
+        }
+
+
+def complete_item(
+    queue_name: str,
+    reviewer: str,
+    trace_id: str,
+    value: Optional[float] = None,
+    string_value: Optional[str] = None,
+    data_type: str = "NUMERIC",
+    comment: Optional[str] = None
+) -> Dict[str, Any]:
+    """Mark a leased item done, optionally creating the review score first."""
+    with locked_queue(queue_name) as state:
+        if not state:
+            return {"error": f"Queue '{queue_name}' does not exist"}
+        item = state["items"].get(trace_id)
+        if not item:
+            return {"error": f"Trace {trace_id} is not in queue '{queue_name}'"}
+        if item["status"] == "leased" and item["lease_owner"] != reviewer:
+            return {"error": f"Trace {trace_id} is leased to {item['lease_owner']}"}
+
+        if value is not None or string_value is not None:
+            result = create_score(
+                trace_id=trace_id,
+                name=state["score_name"],
+                value=value,
+                string_value=string_value,
+                comment=comment,
+                data_type=data_type,
+            )
+            if "error" in result:
+                return result
+
+        item.update(status="done", lease_owner=None, lease_expires=None, reviewed_by=reviewer)
+        _fill_strata(state)
+        return {"status": "done", "queue": queue_name, "trace_id": trace_id, "reviewer": reviewer}
+
+
+def release_item(queue_name: str, reviewer: str, trace_id: str) -> Dict[str, Any]:
+    """Return a leased item to the open pool."""
+    with locked_queue(queue_name) as state:
+        if not state:
+            return {"error": f"Queue '{queue_name}' does not exist"}
+        item = state["items"].get(trace_id)
+        if not item or item["status"] != "leased" or item["lease_owner"] != reviewer:
+            return {"error": f"Trace {trace_id} is not leased to {reviewer}"}
+        item.update(status="open", lease_owner=None, lease_expires=None)
+        return {"status": "released", "queue": queue_name, "trace_id": trace_id}
+
+
+def summarize(state: Dict[str, Any]) -> Dict[str, Any]:
+    by_status: Dict[str, int] = {}
+    by_stratum: Dict[str, Dict[str, int]] = {}
+    for item in state.get("items", {}).values():
+        by_status[item["status"]] = by_status.get(item["status"], 0) + 1
+        stratum = by_stratum.setdefault(item["stratum"], {})
+        stratum[item["status"]] = stratum.get(item["status"], 0) + 1
+    return {"by_status": by_status, "by_stratum": by_stratum}
+
+
+def queue_status(queue_name: str) -> Dict[str, Any]:
+    with locked_queue(queue_name) as state:
+        if not state:
+            return {"error": f"Queue '{queue_name}' does not exist"}
+        _expire_leases(state, utc_now())
+        return {
+            "queue": queue_name,
+            "score_name": state["score_name"],
+            "priority_score": state.get("priority_score"),
+            "stratify_by": state["stratify_by"],
+            "per_stratum": state["per_stratum"],
+            "watermark": state["watermark"],
+            "leases": [
+                {"trace_id": i["trace_id"], "reviewer": i["lease_owner"], "expires": i["lease_expires"]}
+                for i in state["items"].values() if i["status"] == "leased"
+            ],
+            "summary": summarize(state),
+        }
+
+
+# =============================================================================
+# OUTPUT FORMATTING
+# =============================================================================
+
+def format_summary(summary: Dict[str, Any]) -> List[str]:
+    lines = ["| Stratum | Open | Leased | Done | Backlog |", "|---------|------|--------|------|---------|"]
+    for stratum, counts in sorted(summary.get("by_stratum", {}).items()):
+        lines.append(
+            f"| {stratum} | {counts.get('open', 0)} | {counts.get('leased', 0)} | {counts.get('done', 0)} "
+            f"| {counts.get('backlog', 0)} |"
+        )
+    return lines
+
+
+def format_refresh(result: Dict[str, Any]) -> str:
+    if "error" in result:
+        return f"Error: {result['error']}"
+    lines = [f"# Queue Refreshed: {result['queue']}\n"]
+    lines.append(f"**Window:** {result['window'][0]} → {result['window'][1]}")
+    lines.append(f"**Traces Scanned:** {result['scanned']}")
+    lines.append(f"**Added:** {result['added']}")
+    lines.append(f"**Completed Since Last Refresh:** {result['completed']}")
+    lines.append(f"**Near-Duplicates Skipped:** {result['duplicates']}")
+    lines.append(f"**Backlog (stratum full):** {result['backlog']}")
+    lines.append(f"**Sampled Out (backlog full):** {result['sampled_out']}")
+    lines.append("")
+    lines.extend(format_summary(result["summary"]))
+    return "\n".join(lines)
+
+
+def format_pull(result: Dict[str, Any]) -> str:
+    if "error" in result:
+        return f"Error: {result['error']}"
+    items = result["items"]
+    if not items:
+        return f"No open items in queue '{result['queue']}'"
+    lines = [f"# Review Batch for {result['reviewer']}\n"]
+    lines.append(f"**Score:** `{result['score_name']}`")
+    lines.append(f"**Lease Expires:** {result['lease_expires']}")
+    lines.append("")
+    lines.append("| Trace ID | Name | Stratum | Priority | Auto Score |")
+    lines.append("|----------|------|---------|----------|------------|")
+    for item in items:
+        auto = item.get("priority_value")
+        auto = f"{auto:.3f}" if auto is not None else "-"
+        lines.append(
+            f"| {item['trace_id']} | {item.get('name') or '-'} | {item['stratum']} | {item['priority']:.2f} | {auto} |"
+        )
+    return "\n".join(lines)
+
+
+def format_status(result: Dict[str, Any]) -> str:
+    if "error" in result:
+        return f"Error: {result['error']}"
+    lines = [f"# Queue: {result['queue']}\n"]
+    lines.append(f"**Score:** `{result['score_name']}`")
+    if result.get("priority_score"):
+        lines.append(f"**Priority Score:** `{result['priority_score']}`")
+    lines.append(f"**Stratified By:** {', '.join(result['stratify_by'])} (max {result['per_stratum']} active per stratum)")
+    lines.append(f"**Last Refresh:** {result['watermark'] or '-'}")
+    counts = result["summary"]["by_status"]
+    lines.append(
+        f"**Items:** {counts.get('open', 0)} open, {counts.get('leased', 0)} leased, {counts.get('done', 0)} done"
+    )
+    lines.append("")
+    lines.extend(format_summary(result["summary"]))
+    if result["leases"]:
+        lines.append("\n## Active Leases\n")
+        lines.append("| Trace ID | Reviewer | Expires |")
+        lines.append("|----------|----------|---------|")
+        for lease in result["leases"]:
+            lines.append(f"| {lease['trace_id']} | {lease['reviewer']} | {lease['expires']} |")
+    return "\n".join(lines)
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    if "error" in result:
+        return f"Error: {result['error']}"
+    return "\n".join(f"**{key}:** {value}" for key, value in result.items())
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Langfuse Annotation Queue",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    refresh_parser = subparsers.add_parser("refresh", help="Create or incrementally refresh a queue")
+    refresh_parser.add_argument("--queue", required=True, help="Queue name")
+    refresh_parser.add_argument("--score-name", help="Score reviewers add (required when creating)")
+    refresh_parser.add_argument("--days", type=int, default=7, help="Initial look-back window")
+    refresh_parser.add_argument("--trace-name", help="Only queue traces with this name")
+    refresh_parser.add_argument("--priority-score", help="Automated score used for priority (low/uncertain first)")
+    refresh_parser.add_argument("--stratify-by", nargs="+",
+                                help="Trace fields to stratify by: name, release, version, metadata.<key>")
+    refresh_parser.add_argument("--per-stratum", type=int, default=25,
+                                help="Max open+leased items per stratum")
+
+    pull_parser = subparsers.add_parser("pull", help="Lease items for review")
+    pull_parser.add_argument("--queue", required=True, help="Queue name")
+    pull_parser.add_argument("--reviewer", required=True, help="Reviewer name")
+    pull_parser.add_argument("--count", type=int, default=5, help="Items to lease")
+    pull_parser.add_argument("--lease-minutes", type=int, default=DEFAULT_LEASE_MINUTES,
+                             help="Lease duration before items return to the pool")
+
+    complete_parser = subparsers.add_parser("complete", help="Mark an item reviewed (optionally scoring it)")
+    complete_parser.add_argument("--queue", required=True, help="Queue name")
+    complete_parser.add_argument("--reviewer", required=True, help="Reviewer name")
+    complete_parser.add_argument("--trace-id", required=True, help="Trace ID")
+    complete_parser.add_argument("--value", type=float, help="Numeric/boolean score value")
+    complete_parser.add_argument("--string-value", help="Categorical score value")
+    complete_parser.add_argument("--data-type", default="NUMERIC",
+                                 choices=["NUMERIC", "CATEGORICAL", "BOOLEAN"], help="Score data type")
+    complete_parser.add_argument("--comment", help="Optional comment")
+
+    release_parser = subparsers.add_parser("release", help="Return a leased item to the queue")
+    release_parser.add_argument("--queue", required=True, help="Queue name")
+    release_parser.add_argument("--reviewer", required=True, help="Reviewer name")
+    release_parser.add_argument("--trace-id", required=True, help="Trace ID")
+
+    status_parser = subparsers.add_parser("status", help="Show queue status")
+    status_parser.add_argument("--queue", required=True, help="Queue name")
+
+    args = parser.parse_args()
+
+    if args.command == "refresh":
+        result = refresh_queue(
+            queue_name=args.queue,
+            score_name=args.score_name,
+            days=args.days,
+            trace_name=args.trace_name,
+            priority_score=args.priority_score,
+            stratify_by=args.stratify_by,
+            per_stratum=args.per_stratum,
+        )
+        print(format_refresh(result))
+
+    elif args.command == "pull":
+        result = pull_items(args.queue, args.reviewer, count=args.count, lease_minutes=args.lease_minutes)
+        print(format_pull(result))
+
+    elif args.command == "complete":
+        result = complete_item(
+            args.queue,
+            args.reviewer,
+            args.trace_id,
+            value=args.value,
+            string_value=args.string_value,
+            data_type=args.data_type,
+            comment=args.comment,
+        )
+        print(format_result(result))
+
+    elif args.command == "release":
+        print(format_result(release_item(args.queue, args.reviewer, args.trace_id)))
+
+    elif args.command == "status":
+        print(format_status(queue_status(args.queue)))
+
+
+if __name__ == "__main__":
+    main()
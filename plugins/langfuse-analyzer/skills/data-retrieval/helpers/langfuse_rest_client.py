@@ -8,15 +8,20 @@ The SDK's DatasetClient does not eagerly load relationships, necessitating direc
 
 import os
 import sys
-from typing import Any, Dict, List, Optional
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 import httpx
 
 # Default timeout (seconds)
 TIMEOUT = int(os.getenv("LANGFUSE_SDK_TIMEOUT", "30"))
+# Concurrent requests when hydrating run items
+HYDRATION_WORKERS = 8
+MAX_FETCH_RETRIES = 3
 
 
-def _get_httpx_client() -> Optional[httpx.Client]:
-    """Get authenticated httpx client."""
+def _get_httpx_client(max_connections: Optional[int] = None) -> Optional[httpx.Client]:
+    """Get authenticated httpx client, pooling up to max_connections when given."""
     host = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
     public_key = os.getenv("LANGFUSE_PUBLIC_KEY")
     secret_key = os.getenv("LANGFUSE_SECRET_KEY")
@@ -29,10 +34,81 @@ def _get_httpx_client() -> Optional[httpx.Client]:
         base_url=host,
         auth=(public_key, secret_key),
         timeout=float(TIMEOUT),
-        headers={"Content-Type": "application/json"}
+        headers={"Content-Type": "application/json"},
+        **({"limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)}
+           if max_connections else {})
     )
 
 
+def _get_with_retry(
+    client: httpx.Client,
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    retries: int = MAX_FETCH_RETRIES
+) -> httpx.Response:
+    """
+    GET with exponential backoff on 429, 5xx and transport errors.
+    The last response is returned (or its transport error raised) once retries run out.
+    """
+    for attempt in range(retries):
+        last = attempt == retries - 1
+        try:
+            response = client.get(path, params=params)
+        except httpx.HTTPError:
+            if last:
+                raise
+        else:
+            if last or (response.status_code != 429 and response.status_code < 500):
+                return response
+        time.sleep(2 ** attempt)
+
+
+def _iter_pages(
+    path: str,
+    params: Dict[str, Any],
+    page_size: int = 100,
+    prefetch: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily iterate a paginated list endpoint page by page.
+
+    Only one page is held in memory; with prefetch the next page is fetched
+    in the background while the current one is consumed. Pages are retried
+    like _get_with_retry; remaining HTTP errors are raised so a partial read
+    is never mistaken for the whole list.
+    """
+    client = _get_httpx_client()
+    if not client:
+        return
+
+    def fetch(page: int) -> Dict[str, Any]:
+        response = _get_with_retry(client, path, {**params, "page": page, "limit": page_size})
+        response.raise_for_status()
+        return response.json()
+
+    pool = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page = 1
+        pending = pool.submit(fetch, page) if pool else None
+        while True:
+            data = pending.result() if pool else fetch(page)
+            items = data.get("data", [])
+            total_pages = (data.get("meta") or {}).get("totalPages", 0)
+            has_more = bool(items) and page < total_pages and len(items) >= page_size
+            if pool and has_more:
+                pending = pool.submit(fetch, page + 1)
+
+            yield from items
+
+            if not has_more:
+                break
+            page += 1
+    finally:
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+        client.close()
+
+
 def get_dataset_runs(dataset_name: str) -> List[Dict[str, Any]]:
     """
     List all runs for a dataset via REST API.
@@ -112,6 +188,206 @@ def get_dataset_run_items(dataset_id: str, run_name: str) -> List[Dict[str, Any]
         client.close()
 
 
+def get_dataset_run(dataset_name: str, run_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a dataset run's metadata (id, name, description, metadata, createdAt).
+    GET /api/public/datasets/{name}/runs/{runName}
+    """
+    client = _get_httpx_client()
+    if not client:
+        return None
+
+    try:
+        response = client.get(f"/api/public/datasets/{dataset_name}/runs/{run_name}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Error fetching run '{run_name}' of dataset '{dataset_name}': {e}", file=sys.stderr)
+        return None
+    finally:
+        client.close()
+
+
+def iter_dataset_run_items(
+    dataset_id: str,
+    run_name: str,
+    page_size: int = 100,
+    prefetch: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily iterate the items of a dataset run page by page.
+    GET /api/public/dataset-run-items?datasetId={id}&runName={name}&page={n}&limit={size}
+
+    Like iter_dataset_items: one page in memory, the next one prefetched,
+    rate limits and 5xx retried, remaining HTTP errors raised.
+    """
+    yield from _iter_pages(
+        "/api/public/dataset-run-items",
+        {"datasetId": dataset_id, "runName": run_name},
+        page_size=page_size,
+        prefetch=prefetch
+    )
+
+
+def count_dataset_run_items(dataset_id: str, run_name: str) -> Optional[int]:
+    """
+    Number of items in a dataset run without fetching them.
+    GET /api/public/dataset-run-items?datasetId={id}&runName={name}&limit=1
+    """
+    client = _get_httpx_client()
+    if not client:
+        return None
+
+    try:
+        response = client.get(
+            "/api/public/dataset-run-items",
+            params={"datasetId": dataset_id, "runName": run_name, "page": 1, "limit": 1}
+        )
+        response.raise_for_status()
+        return (response.json().get("meta") or {}).get("totalItems")
+    except Exception as e:
+        print(f"Error counting items for run '{run_name}': {e}", file=sys.stderr)
+        return None
+    finally:
+        client.close()
+
+
+def count_scores(from_timestamp: str) -> Optional[int]:
+    """
+    Number of scores in the project with a timestamp at or after from_timestamp.
+    GET /api/public/scores?fromTimestamp={iso}&limit=1
+    """
+    client = _get_httpx_client()
+    if not client:
+        return None
+
+    try:
+        response = client.get("/api/public/scores", params={"fromTimestamp": from_timestamp, "page": 1, "limit": 1})
+        response.raise_for_status()
+        return (response.json().get("meta") or {}).get("totalItems")
+    except Exception as e:
+        print(f"Error counting scores since {from_timestamp}: {e}", file=sys.stderr)
+        return None
+    finally:
+        client.close()
+
+
+def hydrate_run_items(
+    run_items: Iterable[Dict[str, Any]],
+    include_dataset_items: bool = True,
+    max_workers: int = HYDRATION_WORKERS
+) -> Iterator[Dict[str, Any]]:
+    """
+    Attach each run item's trace (with its scores) and, optionally, its
+    dataset item, fetched concurrently over one connection pool.
+    GET /api/public/traces/{traceId}, GET /api/public/dataset-items/{id}
+
+    run_items is consumed lazily with a bounded number of fetches in flight;
+    items are yielded in completion order with `trace` / `datasetItem` keys
+    (None when not found). Rate-limited, 5xx and transport failures are retried.
+    """
+    client = _get_httpx_client(max_connections=max_workers)
+    if not client:
+        return
+
+    def fetch(path: str) -> Optional[Dict[str, Any]]:
+        response = _get_with_retry(client, path)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def hydrate(run_item: Dict[str, Any]) -> Dict[str, Any]:
+        hydrated = dict(run_item)
+        hydrated["trace"] = fetch(f"/api/public/traces/{run_item['traceId']}") if run_item.get("traceId") else None
+        if include_dataset_items and run_item.get("datasetItemId"):
+            hydrated["datasetItem"] = fetch(f"/api/public/dataset-items/{run_item['datasetItemId']}")
+        return hydrated
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        in_flight = set()
+        for run_item in run_items:
+            in_flight.add(pool.submit(hydrate, run_item))
+            if len(in_flight) >= max_workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(in_flight):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        client.close()
+
+
+def iter_dataset_items(
+    dataset_name: str,
+    page_size: int = 100,
+    fields: Optional[Sequence[str]] = None,
+    prefetch: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily iterate dataset items page by page.
+    GET /api/public/dataset-items?datasetName={name}&page={n}&limit={size}
+
+    Only one page is held in memory; with prefetch the next page is fetched
+    in the background while the current one is consumed. `fields` projects
+    each item to the given (camelCase) keys. Rate-limited and 5xx pages are
+    retried; remaining HTTP errors are raised so a partial read is never
+    mistaken for the whole dataset.
+    """
+    items = _iter_pages("/api/public/dataset-items", {"datasetName": dataset_name}, page_size, prefetch)
+    for item in items:
+        yield {k: item.get(k) for k in fields} if fields else item
+
+
+def get_dataset_item(item_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a single dataset item by ID.
+    GET /api/public/dataset-items/{id}
+    """
+    client = _get_httpx_client()
+    if not client:
+        return None
+
+    try:
+        response = client.get(f"/api/public/dataset-items/{item_id}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Error fetching dataset item '{item_id}': {e}", file=sys.stderr)
+        return None
+    finally:
+        client.close()
+
+
+def count_dataset_items(dataset_name: str) -> Optional[int]:
+    """
+    Number of items in a dataset without fetching them.
+    GET /api/public/dataset-items?datasetName={name}&limit=1
+    """
+    client = _get_httpx_client()
+    if not client:
+        return None
+
+    try:
+        response = client.get(
+            "/api/public/dataset-items",
+            params={"datasetName": dataset_name, "page": 1, "limit": 1}
+        )
+        response.raise_for_status()
+        return (response.json().get("meta") or {}).get("totalItems")
+    except Exception as e:
+        print(f"Error counting items for dataset '{dataset_name}': {e}", file=sys.stderr)
+        return None
+    finally:
+        client.close()
+
+
 def get_dataset_by_name(dataset_name: str) -> Optional[Dict[str, Any]]:
     """
     Get dataset metadata to retrieve its ID.
@@ -161,6 +437,53 @@ def update_dataset(dataset_name: str, **kwargs) -> Optional[Dict[str, Any]]:
 
 
 
+def list_traces(
+    limit: int,
+    fields: Optional[str] = "core,io",
+    page_size: int = 100,
+    max_workers: int = 4,
+    name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    The most recent traces, newest first, optionally only those named `name`.
+    GET /api/public/traces?page={n}&limit={size}&fields={groups}&name={name}
+
+    `fields` selects the field groups the server returns (core, io, scores,
+    observations, metrics); the default leaves out scores, observations and
+    metrics. Pages after the first are fetched concurrently and retried like
+    _get_with_retry; remaining HTTP errors are raised so a partial listing is
+    never mistaken for the whole one.
+    """
+    client = _get_httpx_client()
+    if not client:
+        return []
+
+    page_size = max(1, min(page_size, limit))
+    params = {"limit": page_size}
+    if fields:
+        params["fields"] = fields
+    if name:
+        params["name"] = name
+
+    def fetch(page: int) -> Dict[str, Any]:
+        response = _get_with_retry(client, "/api/public/traces", {**params, "page": page})
+        response.raise_for_status()
+        return response.json()
+
+    try:
+        first = fetch(1)
+        traces = list(first.get("data", []))
+        total_pages = (first.get("meta") or {}).get("totalPages", 1)
+        pages = range(2, min(total_pages, -(-limit // page_size)) + 1)
+        if pages and len(traces) >= page_size:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pages)))) as pool:
+                for data in pool.map(fetch, pages):
+                    traces.extend(data.get("data", []))
+        return traces[:limit]
+    finally:
+        client.close()
+
+
 def get_trace(trace_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a single trace by ID, including scores.
@@ -182,3 +505,107 @@ def get_trace(trace_id: str) -> Optional[Dict[str, Any]]:
     finally:
         client.close()
 
+
+
+def ingest_batch(events: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Submit a batch of ingestion events (trace-create, score-create, ...).
+    POST /api/public/ingestion
+
+    The endpoint answers 207 with per-event `successes` and `errors`. Transport
+    errors are raised so callers can decide whether to retry the whole batch.
+    """
+    client = _get_httpx_client()
+    if not client:
+        return None
+
+    try:
+        response = client.post("/api/public/ingestion", json={"batch": events})
+        response.raise_for_status()
+        return response.json()
+    finally:
+        client.close()
+
+
+def create_dataset_run_items(run_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Link traces to dataset items under a run, reusing one connection.
+    POST /api/public/dataset-run-items (once per entry)
+
+    Each entry uses the API's camelCase body: runName, datasetItemId,
+    traceId and optionally runDescription, metadata, observationId.
+    Returns one {"ok": bool, "status": int, "error": str} per entry.
+    """
+    client = _get_httpx_client()
+    if not client:
+        return [{"ok": False, "status": 0, "error": "Missing Langfuse credentials"} for _ in run_items]
+
+    results = []
+    try:
+        for body in run_items:
+            try:
+                response = client.post("/api/public/dataset-run-items", json=body)
+                if response.status_code >= 400:
+                    results.append({"ok": False, "status": response.status_code, "error": response.text[:200]})
+                else:
+                    results.append({"ok": True, "status": response.status_code})
+            except Exception as e:
+                results.append({"ok": False, "status": 0, "error": str(e)})
+        return results
+    finally:
+        client.close()
+
+
+def create_dataset_items(
+    items: Iterable[Dict[str, Any]],
+    max_workers: int = HYDRATION_WORKERS,
+    max_retries: int = MAX_FETCH_RETRIES
+) -> Iterator[Dict[str, Any]]:
+    """
+    Create (or upsert, by id) dataset items concurrently over one connection pool.
+    POST /api/public/dataset-items (once per entry)
+
+    Each entry uses the API's camelCase body: datasetName, input and
+    optionally id, expectedOutput, metadata, sourceTraceId. `items` is
+    consumed lazily with a bounded number of requests in flight. Rate-limited,
+    5xx and transport failures are retried with backoff. Yields one
+    {"item": body, "ok": bool, "status": int, "error": str} per entry, in
+    completion order.
+    """
+    client = _get_httpx_client()
+    if not client:
+        for body in items:
+            yield {"item": body, "ok": False, "status": 0, "error": "Missing Langfuse credentials"}
+        return
+
+    def create(body: Dict[str, Any]) -> Dict[str, Any]:
+        error, status = None, 0
+        for attempt in range(max_retries + 1):
+            if attempt:
+                time.sleep(min(2 ** attempt, 30))
+            try:
+                response = client.post("/api/public/dataset-items", json=body)
+            except httpx.HTTPError as e:
+                error, status = str(e), 0
+                continue
+            if response.status_code < 400:
+                return {"item": body, "ok": True, "status": response.status_code}
+            error, status = response.text[:200], response.status_code
+            if response.status_code != 429 and response.status_code < 500:
+                break
+        return {"item": body, "ok": False, "status": status, "error": error}
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        in_flight = set()
+        for body in items:
+            in_flight.add(pool.submit(create, body))
+            if len(in_flight) >= max_workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(in_flight):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        client.close()
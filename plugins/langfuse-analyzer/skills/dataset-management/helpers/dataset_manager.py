@@ -13,6 +13,11 @@ COMMANDS:
     get         Get items from a dataset
     set-metadata Update dataset metadata (idempotent merge by default)
     describe    Get dataset details including metadata contract fields
+    sample      Draw a reproducible stratified sample (item-ID list or derived dataset)
+    snapshot    Record a content-addressed local snapshot (version) of a dataset
+    versions    List local snapshot versions
+    diff        Diff two versions (or a version against the live dataset)
+    index       Rebuild the local dedupe index and report existing duplicates
 
 EXAMPLES:
     python dataset_manager.py create --name "checkout_regressions" --description "Failing traces"
@@ -22,15 +27,322 @@ EXAMPLES:
 """
 
 import argparse
+import hashlib
 import json
+import math
+import random
+import re
 import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Add parent directory to path for langfuse_client import
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
 from langfuse_client import get_langfuse_client
+import langfuse_rest_client
+
+CHECKPOINT_DIR = Path(".claude") / "dataset-checkpoints"
+DEDUPE_INDEX_DIR = Path(".claude") / "dataset-index"
+DUPLICATE_MODES = ("skip", "flag", "allow")
+SAMPLE_DIR = Path(".claude") / "dataset-samples"
+SNAPSHOT_DIR = Path(".claude") / "dataset-snapshots"
+
+
+# =============================================================================
+# DEDUPLICATION INDEX
+# =============================================================================
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16
+MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_RNG = random.Random(1)
+_MINHASH_COEFFS = [
+    (_MINHASH_RNG.randrange(1, MINHASH_PRIME), _MINHASH_RNG.randrange(0, MINHASH_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def item_content(item_input: Any) -> Any:
+    """
+    The part of an item input that identifies it.
+
+    Inputs built from traces carry the merged trace metadata (session IDs,
+    timestamps, ...); only the original trace input is compared.
+    """
+    if isinstance(item_input, dict) and "_original_input" in item_input:
+        return item_input["_original_input"]
+    return item_input
+
+
+def canonical_json(value: Any) -> str:
+    """Stable JSON encoding: sorted keys, no whitespace."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def content_hash(item_input: Any) -> str:
+    """SHA-256 of the canonical JSON of an item's identifying content."""
+    return hashlib.sha256(canonical_json(item_content(item_input)).encode("utf-8")).hexdigest()
+
+
+def _text_fields(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [text for key in sorted(value) for text in _text_fields(value[key])]
+    if isinstance(value, list):
+        return [text for v in value for text in _text_fields(v)]
+    return []
+
+
+def minhash_signature(item_input: Any, shingle_size: int = 3) -> Optional[List[int]]:
+    """MinHash signature over word shingles of all text fields (None if no text)."""
+    words = re.findall(r"\w+", " ".join(_text_fields(item_content(item_input))).lower())
+    if not words:
+        return None
+    size = min(shingle_size, len(words))
+    shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return [min((a * h + b) % MINHASH_PRIME for h in hashes) for a, b in _MINHASH_COEFFS]
+
+
+def _lsh_bands(signature: List[int]) -> List[str]:
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    return [
+        f"{band}:" + hashlib.md5(repr(signature[band * rows:(band + 1) * rows]).encode()).hexdigest()[:16]
+        for band in range(MINHASH_BANDS)
+    ]
+
+
+def _signature_similarity(a: List[int], b: List[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def dedupe_index_path(dataset_name: str) -> Path:
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in dataset_name)
+    return DEDUPE_INDEX_DIR / f"{safe_name}.json"
+
+
+class DedupeIndex:
+    """
+    Local index of item content hashes for one dataset.
+
+    Built once by paging the dataset's items, then kept current by the
+    inserts this tool makes. Stored at .claude/dataset-index/<dataset>.json.
+    With near_duplicates=True, MinHash signatures over text fields are kept
+    as well and looked up through LSH bands.
+    """
+
+    def __init__(self, dataset_name: str, near_duplicates: bool = False, threshold: float = 0.85):
+        self.dataset_name = dataset_name
+        self.near_duplicates = near_duplicates
+        self.threshold = threshold
+        self.hashes: Dict[str, str] = {}
+        self.signatures: Dict[str, List[int]] = {}
+        self.bands: Dict[str, List[str]] = {}
+        self.duplicates: List[Dict[str, Any]] = []
+        self.built_at: Optional[str] = None
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return dedupe_index_path(self.dataset_name)
+
+    def _add_signature(self, item_id: str, signature: List[int]) -> None:
+        self.signatures[item_id] = signature
+        for band in _lsh_bands(signature):
+            self.bands.setdefault(band, []).append(item_id)
+
+    def _find(self, digest: str, signature: Optional[List[int]]) -> Optional[Tuple[str, str, float]]:
+        if digest in self.hashes:
+            return "exact", self.hashes[digest], 1.0
+        if self.near_duplicates and signature:
+            candidates = {item_id for band in _lsh_bands(signature) for item_id in self.bands.get(band, [])}
+            best = None
+            for item_id in candidates:
+                similarity = _signature_similarity(signature, self.signatures[item_id])
+                if similarity >= self.threshold and (best is None or similarity > best[2]):
+                    best = ("near", item_id, similarity)
+            return best
+        return None
+
+    def _register(self, item_id: str, digest: str, signature: Optional[List[int]]) -> None:
+        self.hashes.setdefault(digest, item_id)
+        if signature:
+            self._add_signature(item_id, signature)
+        self.dirty = True
+
+    def lookup(self, item_input: Any) -> Optional[Tuple[str, str, float]]:
+        """Return (kind, item_id, similarity) of a matching item, or None."""
+        signature = minhash_signature(item_input) if self.near_duplicates else None
+        with self._lock:
+            return self._find(content_hash(item_input), signature)
+
+    def claim(self, item_input: Any, item_id: str) -> Optional[Tuple[str, str, float]]:
+        """
+        Atomically look up an input and register it under item_id if new.
+
+        Returns the existing match instead when the input is a duplicate, so
+        concurrent inserts of the same content cannot both pass the check.
+        """
+        digest = content_hash(item_input)
+        signature = minhash_signature(item_input) if self.near_duplicates else None
+        with self._lock:
+            match = self._find(digest, signature)
+            if match is None:
+                self._register(item_id, digest, signature)
+            return match
+
+    def add(self, item_input: Any, item_id: str) -> None:
+        """Register an inserted item."""
+        digest = content_hash(item_input)
+        signature = minhash_signature(item_input) if self.near_duplicates else None
+        with self._lock:
+            self._register(item_id, digest, signature)
+
+    def discard(self, item_id: str) -> None:
+        """Forget a claimed item whose insert failed."""
+        with self._lock:
+            for digest in [d for d, i in self.hashes.items() if i == item_id]:
+                del self.hashes[digest]
+            signature = self.signatures.pop(item_id, None)
+            if signature:
+                for band in _lsh_bands(signature):
+                    if item_id in self.bands.get(band, []):
+                        self.bands[band].remove(item_id)
+            self.dirty = True
+
+    def build(self) -> None:
+        """(Re)build the index by streaming every item of the dataset."""
+        self.hashes, self.signatures, self.bands, self.duplicates = {}, {}, {}, []
+        for item in langfuse_rest_client.iter_dataset_items(self.dataset_name, fields=["id", "input"]):
+            item_id = item["id"]
+            item_input = item["input"]
+            match = self._find(
+                content_hash(item_input),
+                minhash_signature(item_input) if self.near_duplicates else None
+            )
+            if match:
+                self.duplicates.append({
+                    "item_id": item_id,
+                    "duplicate_of": match[1],
+                    "kind": match[0],
+                    "similarity": round(match[2], 3),
+                })
+            self.add(item_input, item_id)
+        self.built_at = datetime.now().isoformat()
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                "dataset": self.dataset_name,
+                "built_at": self.built_at,
+                "updated_at": datetime.now().isoformat(),
+                "hashes": self.hashes,
+                "signatures": self.signatures,
+                "duplicates": self.duplicates,
+            }
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(self.path)
+        self.dirty = False
+
+    @classmethod
+    def load(
+        cls,
+        dataset_name: str,
+        near_duplicates: bool = False,
+        threshold: float = 0.85,
+        rebuild: bool = False
+    ) -> "DedupeIndex":
+        """
+        Load the index from disk, building it from the dataset on first use.
+
+        Near-duplicate mode needs signatures for existing items, so an index
+        saved without them is rebuilt.
+        """
+        index = cls(dataset_name, near_duplicates=near_duplicates, threshold=threshold)
+        data = None
+        if not rebuild and index.path.exists():
+            try:
+                data = json.loads(index.path.read_text())
+            except (OSError, json.JSONDecodeError):
+                data = None
+        has_signatures = bool(data and data.get("signatures")) or not (data and data.get("hashes"))
+        if data and (has_signatures or not near_duplicates):
+            index.hashes = data.get("hashes") or {}
+            index.duplicates = data.get("duplicates") or []
+            index.built_at = data.get("built_at")
+            if near_duplicates:
+                for item_id, signature in (data.get("signatures") or {}).items():
+                    index._add_signature(item_id, signature)
+            else:
+                index.signatures = data.get("signatures") or {}
+        else:
+            try:
+                index.build()
+                index.save()
+            except Exception as e:
+                print(f"Warning: Could not build dedupe index for '{dataset_name}': {e}", file=sys.stderr)
+        return index
+
+
+def check_duplicate(
+    index: Optional[DedupeIndex],
+    item_input: Any,
+    item_id: str,
+    on_duplicate: str
+) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Apply the duplicate policy to an item about to be inserted.
+
+    Returns (insert, duplicate_info). With "skip" duplicates are not
+    inserted; with "flag" they are inserted and duplicate_info is recorded in
+    the item metadata; "allow" (or no index) disables the check.
+    """
+    if index is None or on_duplicate == "allow":
+        return True, None
+    match = index.claim(item_input, item_id)
+    if match is None:
+        return True, None
+    kind, existing_id, similarity = match
+    if existing_id == item_id:
+        # Same deterministic ID: re-importing the item upserts it
+        return True, None
+    info = {"duplicate_of": existing_id, "duplicate_kind": kind, "similarity": round(similarity, 3)}
+    if on_duplicate == "flag":
+        index.add(item_input, item_id)
+        return True, info
+    return False, info
+
+
+def build_dedupe_index(name: str, near_duplicates: bool = False, similarity: float = 0.85) -> Dict[str, Any]:
+    """Rebuild the dedupe index of a dataset and report duplicates already in it."""
+    index = DedupeIndex(name, near_duplicates=near_duplicates, threshold=similarity)
+    try:
+        index.build()
+        index.save()
+    except Exception as e:
+        return {"error": f"Could not index dataset '{name}': {e}"}
+    return {
+        "name": name,
+        "path": str(index.path),
+        "unique_inputs": len(index.hashes),
+        "near_duplicates": near_duplicates,
+        "duplicates": index.duplicates,
+    }
 
 
 # =============================================================================
@@ -90,23 +402,37 @@ def get_trace_input(trace_id: str) -> Optional[Dict[str, Any]]:
             return None
 
         trace_dict = trace.dict() if hasattr(trace, "dict") else dict(trace)
+        return trace_item_input(trace_dict)
 
-        # Get trace input and metadata
-        trace_input = trace_dict.get("input") or {}
-        metadata = trace_dict.get("metadata") or {}
+    except Exception as e:
+        print(f"Warning: Could not fetch trace {trace_id}: {e}", file=sys.stderr)
+        return None
 
-        # Merge metadata into input (trace_input takes precedence)
-        item_input = {**metadata, **trace_input}
 
-        # Store original for reference if there was input
-        if trace_input:
-            item_input["_original_input"] = trace_input
+def trace_item_input(trace_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a dataset item input from a trace dict (input merged with metadata)."""
+    trace_input = trace_dict.get("input") or {}
+    metadata = trace_dict.get("metadata") or {}
+    if not isinstance(trace_input, dict):
+        trace_input = {"input": trace_input}
 
-        return item_input
+    # Merge metadata into input (trace_input takes precedence)
+    item_input = {**metadata, **trace_input}
 
-    except Exception as e:
-        print(f"Warning: Could not fetch trace {trace_id}: {e}", file=sys.stderr)
-        return None
+    # Store original for reference if there was input
+    if trace_input:
+        item_input["_original_input"] = trace_input
+
+    return item_input
+
+
+def trace_score_value(trace_dict: Dict[str, Any], score_name: str = "quality_score") -> Optional[float]:
+    """Pick a score value from the scores embedded in a full trace."""
+    for score in trace_dict.get("scores") or []:
+        score_dict = score if isinstance(score, dict) else (score.dict() if hasattr(score, "dict") else vars(score))
+        if score_dict.get("name") == score_name:
+            return score_dict.get("value")
+    return None
 
 
 def get_trace_score(trace_id: str, score_name: str = "quality_score") -> Optional[float]:
@@ -129,7 +455,10 @@ def add_trace_to_dataset(
     trace_id: str,
     expected_score: Optional[float] = None,
     expected_output: Optional[Dict[str, Any]] = None,
-    failure_reason: Optional[str] = None
+    failure_reason: Optional[str] = None,
+    on_duplicate: str = "skip",
+    near_duplicates: bool = False,
+    similarity: float = 0.85
 ) -> Dict[str, Any]:
     """
     Add a trace to a dataset as a dataset item.
@@ -140,6 +469,9 @@ def add_trace_to_dataset(
         expected_score: Convenience arg for min_score in expected output
         expected_output: Custom expected output dict (overrides expected_score)
         failure_reason: Optional reason why this trace was added (for regressions)
+        on_duplicate: "skip", "flag" or "allow" items whose input is already in the dataset
+        near_duplicates: Also match near-identical text via MinHash
+        similarity: Estimated Jaccard similarity for a near-duplicate match
 
     Returns:
         Result dict with status
@@ -155,6 +487,20 @@ def add_trace_to_dataset(
             "error": "Could not fetch trace input"
         }
 
+    index = None
+    if on_duplicate != "allow":
+        index = DedupeIndex.load(dataset_name, near_duplicates=near_duplicates, threshold=similarity)
+    item_id = str(uuid.uuid4())
+    insert, duplicate = check_duplicate(index, trace_input, item_id, on_duplicate)
+    if not insert:
+        index.save()
+        return {
+            "trace_id": trace_id,
+            "dataset": dataset_name,
+            "status": "duplicate",
+            **duplicate
+        }
+
     # Get original score for metadata
     original_score = get_trace_score(trace_id)
 
@@ -172,6 +518,8 @@ def add_trace_to_dataset(
         item_metadata["original_score"] = original_score
     if failure_reason:
         item_metadata["failure_reason"] = failure_reason
+    if duplicate:
+        item_metadata.update(duplicate)
 
     try:
         item = client.create_dataset_item(
@@ -179,66 +527,259 @@ def add_trace_to_dataset(
             input=trace_input,
             expected_output=final_expected_output,
             source_trace_id=trace_id,
-            metadata=item_metadata
+            metadata=item_metadata,
+            id=item_id
         )
 
-        return {
+        result = {
             "trace_id": trace_id,
             "dataset": dataset_name,
-            "item_id": item.id if hasattr(item, "id") else None,
+            "item_id": item.id if hasattr(item, "id") else item_id,
             "status": "added",
             "input_fields": [k for k in trace_input.keys() if not k.startswith("_")],
             "original_score": original_score
         }
+        if duplicate:
+            result.update(duplicate)
+        return result
     except Exception as e:
+        if index:
+            index.discard(item_id)
         return {
             "trace_id": trace_id,
             "status": "error",
             "error": str(e)
         }
+    finally:
+        if index:
+            index.save()
+
+
+def dataset_item_id(dataset_name: str, trace_id: str) -> str:
+    """Deterministic item ID so re-importing a trace upserts instead of duplicating."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"langfuse-dataset:{dataset_name}:{trace_id}"))
+
+
+def checkpoint_path(dataset_name: str, trace_file: str) -> Path:
+    """Default checkpoint file for a (dataset, trace file) import."""
+    digest = hashlib.sha1(f"{dataset_name}:{Path(trace_file).resolve()}".encode("utf-8")).hexdigest()[:12]
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in dataset_name)
+    return CHECKPOINT_DIR / f"{safe_name}-{digest}.jsonl"
+
+
+def load_checkpoint(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Read an append-only checkpoint: trace ID -> last recorded result."""
+    done: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn last line from an interrupted run
+                continue
+            if entry.get("trace_id"):
+                done[entry["trace_id"]] = entry
+    return done
+
+
+def _import_trace(
+    dataset_name: str,
+    trace_id: str,
+    expected_output: Dict[str, Any],
+    score_name: str,
+    max_retries: int,
+    index: Optional[DedupeIndex] = None,
+    on_duplicate: str = "skip"
+) -> Dict[str, Any]:
+    """
+    Fetch one trace (input and scores in a single call) and upsert its item.
+
+    Transient failures (429, 5xx, transport errors) are retried with
+    exponential backoff.
+    """
+    client = get_langfuse_client()
+    item_id = dataset_item_id(dataset_name, trace_id)
+    attempt = 0
+    claimed = False
+    while True:
+        try:
+            trace = client.api.trace.get(trace_id)
+            if not trace:
+                return {"trace_id": trace_id, "status": "error", "error": "Trace not found"}
+            trace_dict = trace.dict() if hasattr(trace, "dict") else dict(trace)
+            trace_input = trace_item_input(trace_dict)
+            original_score = trace_score_value(trace_dict, score_name)
+
+            duplicate = None
+            if not claimed:
+                insert, duplicate = check_duplicate(index, trace_input, item_id, on_duplicate)
+                if not insert:
+                    return {"trace_id": trace_id, "dataset": dataset_name, "status": "duplicate", **duplicate}
+                claimed = True
+
+            item_metadata = {
+                "source_trace_id": trace_id,
+                "added_date": datetime.now().strftime("%Y-%m-%d"),
+            }
+            if original_score is not None:
+                item_metadata["original_score"] = original_score
+            if duplicate:
+                item_metadata.update(duplicate)
+
+            item = client.create_dataset_item(
+                dataset_name=dataset_name,
+                input=trace_input,
+                expected_output=dict(expected_output),
+                source_trace_id=trace_id,
+                metadata=item_metadata,
+                id=item_id
+            )
+            result = {
+                "trace_id": trace_id,
+                "dataset": dataset_name,
+                "item_id": item.id if hasattr(item, "id") else item_id,
+                "status": "added",
+                "input_fields": [k for k in trace_input.keys() if not k.startswith("_")],
+                "original_score": original_score
+            }
+            if duplicate:
+                result.update(duplicate)
+            return result
+        except Exception as e:
+            attempt += 1
+            status = getattr(e, "status_code", None)
+            client_error = isinstance(status, int) and 400 <= status < 500 and status != 429
+            if attempt > max_retries or client_error:
+                if claimed and index:
+                    index.discard(item_id)
+                return {"trace_id": trace_id, "status": "error", "error": str(e)}
+            time.sleep(min(2 ** attempt, 30))
 
 
 def add_batch_from_file(
     dataset_name: str,
     trace_file: str,
     expected_score: Optional[float] = None,
-    expected_output: Optional[Dict[str, Any]] = None
+    expected_output: Optional[Dict[str, Any]] = None,
+    concurrency: int = 8,
+    max_retries: int = 3,
+    checkpoint: Optional[str] = None,
+    resume: bool = False,
+    score_name: str = "quality_score",
+    on_duplicate: str = "skip",
+    near_duplicates: bool = False,
+    similarity: float = 0.85
 ) -> Dict[str, Any]:
     """
     Add multiple traces from a file (one trace ID per line).
 
+    Traces are imported through a bounded worker pool; each worker fetches
+    the full trace once (input and scores together) and upserts the item
+    under a deterministic ID. Every finished trace is appended to a JSONL
+    checkpoint, so with resume=True an interrupted import skips traces that
+    were already added. Inputs already present in the dataset are handled
+    per on_duplicate (see check_duplicate).
+
     Returns summary of added/failed items.
     """
     try:
         with open(trace_file, "r") as f:
-            trace_ids = [line.strip() for line in f if line.strip()]
+            trace_ids = list(dict.fromkeys(line.strip() for line in f if line.strip()))
     except Exception as e:
         return {"error": f"Could not read file {trace_file}: {e}"}
 
     if not trace_ids:
         return {"error": "No trace IDs found in file"}
 
+    final_expected_output = dict(expected_output or {})
+    if expected_score is not None and "min_score" not in final_expected_output:
+        final_expected_output["min_score"] = expected_score
+
+    checkpoint_file = Path(checkpoint) if checkpoint else checkpoint_path(dataset_name, trace_file)
+    done = load_checkpoint(checkpoint_file) if resume else {}
+    finished_statuses = ("added", "duplicate")
+    skipped = [tid for tid in trace_ids if done.get(tid, {}).get("status") in finished_statuses]
+    todo = [tid for tid in trace_ids if done.get(tid, {}).get("status") not in finished_statuses]
+
     results = {
         "dataset": dataset_name,
         "total": len(trace_ids),
         "added": 0,
         "failed": 0,
+        "duplicates": 0,
+        "skipped": len(skipped),
+        "checkpoint": str(checkpoint_file),
         "items": []
     }
+    if not todo:
+        return results
 
-    for trace_id in trace_ids:
-        result = add_trace_to_dataset(
-            dataset_name=dataset_name,
-            trace_id=trace_id,
-            expected_score=expected_score,
-            expected_output=expected_output
+    index = None
+    if on_duplicate != "allow":
+        index = DedupeIndex.load(
+            dataset_name, near_duplicates=near_duplicates, threshold=similarity
         )
-        results["items"].append(result)
-        if result.get("status") == "added":
-            results["added"] += 1
-        else:
-            results["failed"] += 1
 
+    checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
+    pending_ids = iter(todo)
+    window = max(1, concurrency) * 4
+
+    with open(checkpoint_file, "a", encoding="utf-8") as journal, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        in_flight = set()
+
+        def submit_next() -> bool:
+            trace_id = next(pending_ids, None)
+            if trace_id is None:
+                return False
+            in_flight.add(pool.submit(
+                _import_trace, dataset_name, trace_id, final_expected_output, score_name, max_retries,
+                index, on_duplicate
+            ))
+            return True
+
+        while len(in_flight) < window and submit_next():
+            pass
+
+        finished = 0
+        while in_flight:
+            completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in completed:
+                in_flight.discard(future)
+                result = future.result()
+                results["items"].append(result)
+                if result.get("status") == "added":
+                    results["added"] += 1
+                elif result.get("status") == "duplicate":
+                    results["duplicates"] += 1
+                else:
+                    results["failed"] += 1
+                journal.write(json.dumps({
+                    "trace_id": result["trace_id"],
+                    "item_id": result.get("item_id"),
+                    "status": result.get("status"),
+                    "error": result.get("error"),
+                }) + "\n")
+                journal.flush()
+                finished += 1
+                submit_next()
+
+            elapsed = time.monotonic() - started
+            rate = finished / elapsed if elapsed > 0 else 0.0
+            eta = (len(todo) - finished) / rate if rate > 0 else 0.0
+            print(
+                f"[{finished}/{len(todo)}] added={results['added']} duplicates={results['duplicates']} "
+                f"failed={results['failed']} {rate:.1f}/s eta {eta:.0f}s",
+                file=sys.stderr
+            )
+            if index and finished % 100 == 0:
+                index.save()
+
+    if index:
+        index.save()
     return results
 
 
@@ -276,25 +817,58 @@ def list_datasets() -> List[Dict[str, Any]]:
     return datasets
 
 
-def get_dataset_items(name: str) -> Dict[str, Any]:
-    """Get all items from a dataset."""
-    client = get_langfuse_client()
+# REST (camelCase) -> output (snake_case) keys of dataset items
+DATASET_ITEM_KEYS = {
+    "id": "id",
+    "input": "input",
+    "expectedOutput": "expected_output",
+    "metadata": "metadata",
+    "status": "status",
+    "sourceTraceId": "source_trace_id",
+    "sourceObservationId": "source_observation_id",
+    "createdAt": "created_at",
+    "updatedAt": "updated_at",
+}
+DEFAULT_ITEM_FIELDS = ["id", "input", "expected_output", "metadata", "status"]
 
+
+def iter_dataset_items(
+    name: str,
+    fields: Optional[List[str]] = None,
+    page_size: int = 100
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream dataset items as dicts with snake_case keys.
+
+    Items are paged through the REST API (next page prefetched), so memory
+    stays flat regardless of dataset size. `fields` selects output keys.
+    """
+    wanted = fields or DEFAULT_ITEM_FIELDS
+    to_api = {snake: camel for camel, snake in DATASET_ITEM_KEYS.items()}
+    unknown = [f for f in wanted if f not in to_api]
+    if unknown:
+        raise ValueError(f"Unknown item fields: {', '.join(unknown)}")
+
+    api_fields = [to_api[f] for f in wanted]
+    for item in langfuse_rest_client.iter_dataset_items(name, page_size=page_size, fields=api_fields):
+        yield {DATASET_ITEM_KEYS[k]: v for k, v in item.items()}
+
+
+def get_dataset_items(
+    name: str,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None
+) -> Dict[str, Any]:
+    """Get items from a dataset (all of them unless limit is set)."""
     try:
-        dataset = client.get_dataset(name)
-        if not dataset:
+        if not langfuse_rest_client.get_dataset_by_name(name):
             return {"error": f"Dataset '{name}' not found"}
 
         items = []
-        for item in dataset.items:
-            item_dict = item.dict() if hasattr(item, "dict") else dict(item)
-            items.append({
-                "id": item_dict.get("id"),
-                "input": item_dict.get("input"),
-                "expected_output": item_dict.get("expected_output"),
-                "metadata": item_dict.get("metadata"),
-                "status": item_dict.get("status")
-            })
+        for item in iter_dataset_items(name, fields=fields):
+            items.append(item)
+            if limit and len(items) >= limit:
+                break
 
         return {
             "name": name,
@@ -306,6 +880,33 @@ def get_dataset_items(name: str) -> Dict[str, Any]:
         return {"error": f"Could not get dataset '{name}': {e}"}
 
 
+def export_dataset_items_jsonl(
+    name: str,
+    output: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None
+) -> Dict[str, Any]:
+    """Stream dataset items as JSON lines to a file (or stdout)."""
+    if not langfuse_rest_client.get_dataset_by_name(name):
+        return {"error": f"Dataset '{name}' not found"}
+
+    handle = open(output, "w", encoding="utf-8") if output else sys.stdout
+    count = 0
+    try:
+        for item in iter_dataset_items(name, fields=fields):
+            handle.write(json.dumps(item, default=str) + "\n")
+            count += 1
+            if limit and count >= limit:
+                break
+    except Exception as e:
+        return {"error": f"Export of '{name}' stopped after {count} items: {e}", "exported": count}
+    finally:
+        if output:
+            handle.close()
+
+    return {"name": name, "exported": count, "output": output}
+
+
 def deep_merge(base: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
     """Deep merge dictionaries recursively."""
     merged = dict(base)
@@ -402,14 +1003,11 @@ def set_dataset_metadata(
 
 def describe_dataset(name: str) -> Dict[str, Any]:
     """Get detailed dataset information including metadata and readiness hints."""
-    client = get_langfuse_client()
-
     try:
-        dataset = client.get_dataset(name)
-        if not dataset:
+        dataset_dict = langfuse_rest_client.get_dataset_by_name(name)
+        if not dataset_dict:
             return {"error": f"Dataset '{name}' not found"}
 
-        dataset_dict = dataset.dict() if hasattr(dataset, "dict") else dict(dataset)
         metadata = dataset_dict.get("metadata") or {}
         status = metadata.get("status") if isinstance(metadata.get("status"), dict) else {}
         dimensions = metadata.get("dimensions") if isinstance(metadata.get("dimensions"), list) else []
@@ -419,7 +1017,7 @@ def describe_dataset(name: str) -> Dict[str, Any]:
             "name": name,
             "id": dataset_dict.get("id"),
             "description": dataset_dict.get("description"),
-            "item_count": dataset_dict.get("items_count"),
+            "item_count": langfuse_rest_client.count_dataset_items(name),
             "schema_version": metadata.get("schema_version"),
             "score_scale": metadata.get("score_scale"),
             "dimensions": dimensions,
@@ -432,6 +1030,485 @@ def describe_dataset(name: str) -> Dict[str, Any]:
         return {"error": f"Could not describe dataset '{name}': {e}"}
 
 
+# =============================================================================
+# SAMPLING
+# =============================================================================
+
+def _sample_rank(seed: int, item_id: str) -> str:
+    """Seeded pseudo-random rank of an item, independent of API order."""
+    return hashlib.sha256(f"{seed}:{item_id}".encode("utf-8")).hexdigest()
+
+
+def _score_bin(value: Any, bins: int) -> str:
+    if not isinstance(value, (int, float)):
+        return "unscored"
+    v = float(value)
+    if v > 1.0:
+        v = v / 10.0
+    v = min(max(v, 0.0), 1.0)
+    b = min(int(v * bins), bins - 1)
+    return f"{b / bins:.2f}-{(b + 1) / bins:.2f}"
+
+
+def sample_stratum(metadata: Dict[str, Any], strata: List[str], score_key: str, score_bins: int) -> str:
+    """Stratum label of an item: metadata slice values plus prior-score bin."""
+    parts = [f"{key}={metadata.get(key, '-')}" for key in strata]
+    if score_bins:
+        parts.append(f"{score_key}={_score_bin(metadata.get(score_key), score_bins)}")
+    return ", ".join(parts) or "all"
+
+
+def allocate_sample(stratum_sizes: Dict[str, int], n: int, min_per_stratum: int = 1) -> Dict[str, int]:
+    """
+    Proportional allocation of n draws across strata (largest remainder).
+
+    Every non-empty stratum gets at least min_per_stratum items (capped at
+    its size) so small slices are never dropped from the sample.
+    """
+    total = sum(stratum_sizes.values())
+    if total == 0:
+        return {}
+    n = min(n, total)
+    alloc = {k: min(size, min_per_stratum) for k, size in stratum_sizes.items()}
+    remaining = n - sum(alloc.values())
+    if remaining <= 0:
+        return alloc
+
+    spare = {k: size - alloc[k] for k, size in stratum_sizes.items()}
+    spare_total = sum(spare.values())
+    quotas = {k: remaining * spare[k] / spare_total for k in spare} if spare_total else {}
+    for k, quota in quotas.items():
+        alloc[k] += int(quota)
+    leftover = n - sum(alloc.values())
+    for k in sorted(quotas, key=lambda k: quotas[k] - int(quotas[k]), reverse=True):
+        if leftover <= 0:
+            break
+        if alloc[k] < stratum_sizes[k]:
+            alloc[k] += 1
+            leftover -= 1
+    return alloc
+
+
+def sample_power(
+    n: int,
+    population: int,
+    sd: float,
+    alpha: float = 0.05,
+    power: float = 0.8
+) -> Dict[str, Any]:
+    """
+    Minimum detectable effect of a paired run comparison on n sampled items.
+
+    Assumes uncorrelated runs (sd of the per-item difference = sd * sqrt(2)),
+    which is conservative, and applies the finite population correction.
+    """
+    from statistics import NormalDist
+
+    z = NormalDist().inv_cdf(1 - alpha / 2) + NormalDist().inv_cdf(power)
+    fpc = (population - n) / (population - 1) if population > 1 else 0.0
+    mde = z * sd * math.sqrt(2) * math.sqrt(fpc) / math.sqrt(n) if n else None
+    return {"alpha": alpha, "power": power, "sd": sd, "mde": mde}
+
+
+def required_sample_size(
+    mde: float,
+    population: int,
+    sd: float,
+    alpha: float = 0.05,
+    power: float = 0.8
+) -> int:
+    """Items needed to detect an effect of size mde (inverse of sample_power)."""
+    from statistics import NormalDist
+
+    z = NormalDist().inv_cdf(1 - alpha / 2) + NormalDist().inv_cdf(power)
+    n0 = (z * sd * math.sqrt(2) / mde) ** 2
+    return min(population, math.ceil(n0 / (1 + (n0 - 1) / population)))
+
+
+def sample_dataset_items(
+    name: str,
+    size: Optional[int] = None,
+    fraction: Optional[float] = None,
+    mde: Optional[float] = None,
+    seed: int = 0,
+    strata: Optional[List[str]] = None,
+    score_key: str = "original_score",
+    score_bins: int = 0,
+    min_per_stratum: int = 1,
+    alpha: float = 0.05,
+    power: float = 0.8,
+    default_sd: float = 0.2
+) -> Dict[str, Any]:
+    """
+    Draw a reproducible stratified sample of dataset item IDs.
+
+    Items are grouped by metadata slices (`strata`) and optionally by bins
+    of a prior score (`score_key`, `score_bins`). Within each stratum, items
+    are ordered by a seeded hash of their ID, so the same seed always selects
+    the same items and a larger sample contains the smaller one. The sample
+    size comes from size, fraction, or the minimum detectable effect `mde`.
+    """
+    strata = strata or []
+    groups: Dict[str, List[Tuple[str, str]]] = {}
+    scores: List[float] = []
+    try:
+        for item in iter_dataset_items(name, fields=["id", "metadata", "status"]):
+            if item.get("status") == "ARCHIVED":
+                continue
+            metadata = item.get("metadata") if isinstance(item.get("metadata"), dict) else {}
+            key = sample_stratum(metadata, strata, score_key, score_bins)
+            groups.setdefault(key, []).append((_sample_rank(seed, item["id"]), item["id"]))
+            value = metadata.get(score_key)
+            if isinstance(value, (int, float)):
+                scores.append(value / 10.0 if value > 1.0 else float(value))
+    except Exception as e:
+        return {"error": f"Could not read dataset '{name}': {e}"}
+
+    population = sum(len(g) for g in groups.values())
+    if population == 0:
+        return {"error": f"Dataset '{name}' has no active items"}
+
+    sd = default_sd
+    if len(scores) >= 2:
+        mean = sum(scores) / len(scores)
+        sd = math.sqrt(sum((v - mean) ** 2 for v in scores) / (len(scores) - 1)) or default_sd
+
+    if size is None and fraction is not None:
+        size = max(1, round(population * fraction))
+    if size is None and mde is not None:
+        if mde <= 0:
+            return {"error": "mde must be positive"}
+        size = required_sample_size(mde, population, sd, alpha=alpha, power=power)
+    if size is None:
+        return {"error": "Provide size, fraction or mde"}
+
+    alloc = allocate_sample({k: len(g) for k, g in groups.items()}, size, min_per_stratum)
+    item_ids: List[str] = []
+    table = []
+    for key in sorted(groups):
+        chosen = [item_id for _, item_id in sorted(groups[key])[:alloc.get(key, 0)]]
+        item_ids.extend(chosen)
+        table.append({"stratum": key, "population": len(groups[key]), "sampled": len(chosen)})
+
+    return {
+        "dataset": name,
+        "seed": seed,
+        "strata": strata,
+        "score_key": score_key if score_bins else None,
+        "score_bins": score_bins,
+        "population": population,
+        "sample_size": len(item_ids),
+        "fraction": len(item_ids) / population,
+        "power": sample_power(len(item_ids), population, sd, alpha=alpha, power=power),
+        "strata_table": table,
+        "item_ids": item_ids,
+    }
+
+
+def write_sample_ids(sample: Dict[str, Any], output: Optional[str] = None) -> str:
+    """Write sampled item IDs (one per line); default path under .claude/dataset-samples/."""
+    if output:
+        path = Path(output)
+    else:
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in sample["dataset"])
+        path = SAMPLE_DIR / f"{safe_name}-seed{sample['seed']}-n{sample['sample_size']}.txt"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(sample["item_ids"]) + "\n")
+    return str(path)
+
+
+def read_sample_ids(path: str) -> List[str]:
+    """Read an item-ID list written by write_sample_ids."""
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def materialize_sample(sample: Dict[str, Any], derived_name: str) -> Dict[str, Any]:
+    """
+    Copy sampled items into a derived dataset.
+
+    Item IDs are derived from the source item ID, so materializing the same
+    sample again updates the derived items instead of duplicating them.
+    """
+    client = get_langfuse_client()
+    wanted = set(sample["item_ids"])
+    sample_info = {
+        key: sample[key] for key in ("dataset", "seed", "strata", "score_key", "score_bins", "sample_size")
+    }
+    try:
+        client.create_dataset(
+            name=derived_name,
+            description=f"Sample of {sample['dataset']} ({sample['sample_size']} items, seed {sample['seed']})",
+            metadata={"derived_from": sample["dataset"], "sample": sample_info}
+        )
+    except Exception as e:
+        if "already exists" not in str(e).lower() and "409" not in str(e):
+            return {"error": f"Could not create dataset '{derived_name}': {e}"}
+
+    copied = 0
+    errors = []
+    fields = ["id", "input", "expected_output", "metadata", "source_trace_id"]
+    for item in iter_dataset_items(sample["dataset"], fields=fields):
+        if item["id"] not in wanted:
+            continue
+        metadata = dict(item.get("metadata") or {})
+        metadata["source_item_id"] = item["id"]
+        try:
+            client.create_dataset_item(
+                dataset_name=derived_name,
+                input=item.get("input"),
+                expected_output=item.get("expected_output"),
+                metadata=metadata,
+                source_trace_id=item.get("source_trace_id"),
+                id=dataset_item_id(derived_name, item["id"])
+            )
+            copied += 1
+        except Exception as e:
+            errors.append({"item_id": item["id"], "error": str(e)})
+
+    return {"derived_dataset": derived_name, "copied": copied, "errors": errors}
+
+
+# =============================================================================
+# VERSIONING
+# =============================================================================
+
+SNAPSHOT_FIELDS = ["id", "input", "expected_output", "metadata", "status", "source_trace_id", "updated_at"]
+
+
+def item_version_hash(item: Dict[str, Any]) -> str:
+    """Content hash of the parts of an item that affect an experiment."""
+    content = {key: item.get(key) for key in ("input", "expected_output", "metadata", "status")}
+    return hashlib.sha256(canonical_json(content).encode("utf-8")).hexdigest()
+
+
+def manifest_version(entries: Dict[str, str]) -> str:
+    """Version ID of a manifest: hash over its sorted (item ID, item hash) pairs."""
+    return hashlib.sha256(canonical_json(sorted(entries.items())).encode("utf-8")).hexdigest()[:12]
+
+
+class SnapshotStore:
+    """
+    Local, content-addressed store of dataset versions.
+
+    Layout under .claude/dataset-snapshots/<dataset>/:
+      objects/<hh>/<hash>.json   item bodies, written once per distinct content
+      manifests/<version>.json   item ID -> item hash for one version
+      versions.json              version log (oldest first)
+    """
+
+    def __init__(self, dataset_name: str):
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in dataset_name)
+        self.dataset_name = dataset_name
+        self.root = SNAPSHOT_DIR / safe_name
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.json"
+
+    def _manifest_path(self, version: str) -> Path:
+        return self.root / "manifests" / f"{version}.json"
+
+    def has_object(self, digest: str) -> bool:
+        return self._object_path(digest).exists()
+
+    def put_object(self, digest: str, item: Dict[str, Any]) -> bool:
+        """
+        Store an item body; returns False if it was already stored.
+
+        Items with identical content share one object, so the body is stored
+        without its ID; manifests map IDs to objects.
+        """
+        path = self._object_path(digest)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({k: v for k, v in item.items() if k != "id"}, default=str))
+        tmp.replace(path)
+        return True
+
+    def get_object(self, digest: str) -> Optional[Dict[str, Any]]:
+        path = self._object_path(digest)
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def versions(self) -> List[Dict[str, Any]]:
+        path = self.root / "versions.json"
+        return json.loads(path.read_text()) if path.exists() else []
+
+    def resolve(self, version: str) -> Optional[str]:
+        """Resolve a version ID, unique prefix, label or "latest"."""
+        versions = self.versions()
+        if not versions:
+            return None
+        if version == "latest":
+            return versions[-1]["version"]
+        for entry in reversed(versions):
+            if entry.get("label") == version:
+                return entry["version"]
+        matches = {e["version"] for e in versions if e["version"].startswith(version)}
+        return matches.pop() if len(matches) == 1 else None
+
+    def load_manifest(self, version: str) -> Optional[Dict[str, Any]]:
+        resolved = self.resolve(version)
+        if not resolved:
+            return None
+        return json.loads(self._manifest_path(resolved).read_text())
+
+    def save_manifest(self, manifest: Dict[str, Any]) -> bool:
+        """Write a manifest and log it; returns False if the version already exists."""
+        path = self._manifest_path(manifest["version"])
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(manifest))
+        versions = self.versions()
+        versions.append({
+            "version": manifest["version"],
+            "parent": manifest.get("parent"),
+            "label": manifest.get("label"),
+            "created_at": manifest["created_at"],
+            "item_count": manifest["item_count"],
+        })
+        (self.root / "versions.json").write_text(json.dumps(versions, indent=2))
+        return True
+
+
+def snapshot_dataset(name: str, label: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Record the current state of a dataset as a local versioned snapshot.
+
+    Items are streamed once and hashed; only item bodies not yet in the
+    store are written. Unchanged content yields the same version ID, so
+    snapshotting twice without edits does not create a new version.
+    """
+    store = SnapshotStore(name)
+    dataset = langfuse_rest_client.get_dataset_by_name(name)
+    if not dataset:
+        return {"error": f"Dataset '{name}' not found"}
+
+    entries: Dict[str, str] = {}
+    written = 0
+    try:
+        for item in iter_dataset_items(name, fields=SNAPSHOT_FIELDS):
+            digest = item_version_hash(item)
+            entries[item["id"]] = digest
+            if store.put_object(digest, item):
+                written += 1
+    except Exception as e:
+        return {"error": f"Could not snapshot dataset '{name}': {e}"}
+
+    versions = store.versions()
+    parent = versions[-1]["version"] if versions else None
+    manifest = {
+        "dataset": name,
+        "dataset_id": dataset.get("id"),
+        "version": manifest_version(entries),
+        "parent": parent,
+        "label": label,
+        "created_at": datetime.now().isoformat(),
+        "metadata_hash": hashlib.sha256(canonical_json(dataset.get("metadata") or {}).encode("utf-8")).hexdigest(),
+        "item_count": len(entries),
+        "items": entries,
+    }
+    created = store.save_manifest(manifest)
+    result = {
+        "dataset": name,
+        "version": manifest["version"],
+        "parent": parent,
+        "label": label,
+        "item_count": len(entries),
+        "objects_written": written,
+        "status": "created" if created else ("unchanged" if manifest["version"] == parent else "exists"),
+    }
+    if parent and parent != manifest["version"]:
+        result["diff"] = diff_manifests(store.load_manifest(parent), manifest)
+    return result
+
+
+def diff_manifests(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Added, removed and changed item IDs between two manifests (hash-set diff)."""
+    old_items = old.get("items", {})
+    new_items = new.get("items", {})
+    old_ids = old_items.keys()
+    new_ids = new_items.keys()
+    common = old_ids & new_ids
+    changed = sorted(i for i in common if old_items[i] != new_items[i])
+    return {
+        "from": old.get("version"),
+        "to": new.get("version"),
+        "added": sorted(new_ids - old_ids),
+        "removed": sorted(old_ids - new_ids),
+        "changed": changed,
+        "unchanged": len(common) - len(changed),
+    }
+
+
+def current_manifest(name: str) -> Dict[str, Any]:
+    """Manifest of the live dataset state without storing anything."""
+    entries = {item["id"]: item_version_hash(item) for item in iter_dataset_items(name, fields=SNAPSHOT_FIELDS)}
+    return {"version": manifest_version(entries), "items": entries}
+
+
+def diff_dataset_versions(name: str, from_version: str, to_version: str = "current") -> Dict[str, Any]:
+    """Diff two snapshots of a dataset; "current" diffs against the live dataset."""
+    store = SnapshotStore(name)
+    manifests = []
+    for version in (from_version, to_version):
+        if version == "current":
+            try:
+                manifests.append(current_manifest(name))
+            except Exception as e:
+                return {"error": f"Could not read dataset '{name}': {e}"}
+        else:
+            manifest = store.load_manifest(version)
+            if manifest is None:
+                return {"error": f"Unknown snapshot version '{version}' for dataset '{name}'"}
+            manifests.append(manifest)
+    return {"dataset": name, **diff_manifests(*manifests)}
+
+
+def load_snapshot_items(name: str, version: str) -> Dict[str, Any]:
+    """
+    Items of a pinned dataset version, read from the local object store.
+
+    Bodies missing locally are fetched individually by item ID; a fetched
+    item whose content no longer matches the pinned hash is reported as
+    unavailable rather than silently substituted.
+    """
+    store = SnapshotStore(name)
+    manifest = store.load_manifest(version)
+    if manifest is None:
+        return {"error": f"Unknown snapshot version '{version}' for dataset '{name}'"}
+
+    items = []
+    fetched = 0
+    unavailable = []
+    for item_id, digest in manifest["items"].items():
+        item = store.get_object(digest)
+        if item is None:
+            remote = langfuse_rest_client.get_dataset_item(item_id)
+            if remote:
+                remote = {DATASET_ITEM_KEYS[k]: v for k, v in remote.items() if k in DATASET_ITEM_KEYS}
+            if remote and item_version_hash(remote) == digest:
+                store.put_object(digest, remote)
+                item = remote
+                fetched += 1
+            else:
+                unavailable.append(item_id)
+                continue
+        # Objects are shared by items with the same content; the ID comes from the manifest
+        items.append({**item, "id": item_id})
+
+    return {
+        "dataset": name,
+        "dataset_id": manifest.get("dataset_id"),
+        "version": manifest["version"],
+        "items": items,
+        "fetched": fetched,
+        "unavailable": unavailable,
+    }
+
+
 # =============================================================================
 # OUTPUT FORMATTING
 # =============================================================================
@@ -462,6 +1539,11 @@ def format_add_result(result: Dict[str, Any]) -> str:
         lines.append(f"**Trace ID:** `{result.get('trace_id')}`")
         lines.append(f"**Status:** error")
         lines.append(f"**Error:** {result.get('error')}")
+    elif result.get("status") == "duplicate":
+        lines.append(f"**Trace ID:** `{result.get('trace_id')}`")
+        lines.append(f"**Dataset:** `{result.get('dataset')}`")
+        lines.append(f"**Status:** skipped ({result.get('duplicate_kind')} duplicate)")
+        lines.append(f"**Duplicate Of:** `{result.get('duplicate_of')}`")
     else:
         lines.append(f"**Trace ID:** `{result.get('trace_id')}`")
         lines.append(f"**Dataset:** `{result.get('dataset')}`")
@@ -471,6 +1553,8 @@ def format_add_result(result: Dict[str, Any]) -> str:
             lines.append(f"**Original Score:** {result['original_score']:.1f}")
         if result.get("input_fields"):
             lines.append(f"**Input Fields:** {', '.join(result['input_fields'])}")
+        if result.get("duplicate_of"):
+            lines.append(f"**Flagged Duplicate Of:** `{result['duplicate_of']}` ({result.get('duplicate_kind')})")
 
     return "\n".join(lines)
 
@@ -487,6 +1571,12 @@ def format_batch_result(result: Dict[str, Any]) -> str:
     lines.append(f"**Total:** {result.get('total', 0)}")
     lines.append(f"**Added:** {result.get('added', 0)}")
     lines.append(f"**Failed:** {result.get('failed', 0)}")
+    if result.get("duplicates"):
+        lines.append(f"**Duplicates Skipped:** {result['duplicates']}")
+    if result.get("skipped"):
+        lines.append(f"**Skipped (already in checkpoint):** {result['skipped']}")
+    if result.get("checkpoint"):
+        lines.append(f"**Checkpoint:** `{result['checkpoint']}`")
     lines.append("")
 
     if result.get("items"):
@@ -497,7 +1587,7 @@ def format_batch_result(result: Dict[str, Any]) -> str:
 
         for item in result["items"]:
             trace_id = item.get("trace_id", "")[:12] + "..."
-            status = "✅" if item.get("status") == "added" else "❌"
+            status = {"added": "✅", "duplicate": "⏭️"}.get(item.get("status"), "❌")
             score = item.get("original_score")
             score_str = f"{score:.1f}" if score is not None else "-"
             lines.append(f"| `{trace_id}` | {status} | {score_str} |")
@@ -505,6 +1595,139 @@ def format_batch_result(result: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def format_index_result(result: Dict[str, Any]) -> str:
+    """Format dedupe index rebuild result as markdown."""
+    lines = ["# Dataset Dedupe Index", ""]
+
+    if "error" in result:
+        lines.append(f"**Error:** {result['error']}")
+        return "\n".join(lines)
+
+    duplicates = result.get("duplicates") or []
+    lines.append(f"**Dataset:** `{result.get('name')}`")
+    lines.append(f"**Index:** `{result.get('path')}`")
+    lines.append(f"**Unique Inputs:** {result.get('unique_inputs', 0)}")
+    lines.append(f"**Near-Duplicate Mode:** {result.get('near_duplicates')}")
+    lines.append(f"**Existing Duplicates:** {len(duplicates)}")
+
+    if duplicates:
+        lines.append("")
+        lines.append("| Item ID | Duplicate Of | Kind | Similarity |")
+        lines.append("|---------|--------------|------|------------|")
+        for dup in duplicates:
+            lines.append(
+                f"| `{dup['item_id']}` | `{dup['duplicate_of']}` | {dup['kind']} | {dup['similarity']:.2f} |"
+            )
+
+    return "\n".join(lines)
+
+
+def format_sample_result(result: Dict[str, Any]) -> str:
+    """Format dataset sample as markdown."""
+    lines = ["# Dataset Sample", ""]
+
+    if "error" in result:
+        lines.append(f"**Error:** {result['error']}")
+        return "\n".join(lines)
+
+    lines.append(f"**Dataset:** `{result['dataset']}`")
+    lines.append(f"**Seed:** {result['seed']}")
+    lines.append(f"**Sample:** {result['sample_size']} of {result['population']} items ({result['fraction']:.1%})")
+    if result.get("ids_file"):
+        lines.append(f"**Item IDs:** `{result['ids_file']}`")
+    if result.get("derived_dataset"):
+        lines.append(f"**Derived Dataset:** `{result['derived_dataset']}` ({result.get('copied', 0)} items)")
+    for error in result.get("errors", [])[:5]:
+        lines.append(f"- copy failed for `{error['item_id']}`: {error['error']}")
+
+    power = result.get("power") or {}
+    if power.get("mde") is not None:
+        lines.append("")
+        lines.append(
+            f"**Minimum detectable effect:** {power['mde']:.3f} on the 0-1 scale "
+            f"(paired runs, alpha={power['alpha']}, power={power['power']}, sd={power['sd']:.3f})"
+        )
+
+    lines.append("")
+    lines.append("| Stratum | Population | Sampled |")
+    lines.append("|---------|------------|---------|")
+    for row in result.get("strata_table", []):
+        lines.append(f"| {row['stratum']} | {row['population']} | {row['sampled']} |")
+
+    return "\n".join(lines)
+
+
+def format_snapshot_result(result: Dict[str, Any]) -> str:
+    """Format snapshot result as markdown."""
+    lines = ["# Dataset Snapshot", ""]
+
+    if "error" in result:
+        lines.append(f"**Error:** {result['error']}")
+        return "\n".join(lines)
+
+    lines.append(f"**Dataset:** `{result['dataset']}`")
+    lines.append(f"**Version:** `{result['version']}`" + (f" ({result['label']})" if result.get("label") else ""))
+    lines.append(f"**Status:** {result['status']}")
+    lines.append(f"**Items:** {result['item_count']}")
+    lines.append(f"**New Objects Stored:** {result['objects_written']}")
+    if result.get("parent"):
+        lines.append(f"**Parent:** `{result['parent']}`")
+    diff = result.get("diff")
+    if diff:
+        lines.append(
+            f"**Since Parent:** +{len(diff['added'])} added, -{len(diff['removed'])} removed, "
+            f"~{len(diff['changed'])} changed"
+        )
+
+    return "\n".join(lines)
+
+
+def format_versions_result(name: str, versions: List[Dict[str, Any]]) -> str:
+    """Format snapshot version log as markdown."""
+    lines = ["# Dataset Versions", "", f"**Dataset:** `{name}`", ""]
+
+    if not versions:
+        lines.append("_No snapshots yet. Run `snapshot` first._")
+        return "\n".join(lines)
+
+    lines.append("| Version | Label | Created | Items |")
+    lines.append("|---------|-------|---------|-------|")
+    for entry in reversed(versions):
+        lines.append(
+            f"| `{entry['version']}` | {entry.get('label') or '-'} | {entry['created_at'][:19]} | {entry['item_count']} |"
+        )
+
+    return "\n".join(lines)
+
+
+def format_diff_result(result: Dict[str, Any], show_ids: int = 20) -> str:
+    """Format dataset version diff as markdown."""
+    lines = ["# Dataset Diff", ""]
+
+    if "error" in result:
+        lines.append(f"**Error:** {result['error']}")
+        return "\n".join(lines)
+
+    lines.append(f"**Dataset:** `{result['dataset']}`")
+    lines.append(f"**From:** `{result['from']}` → **To:** `{result['to']}`")
+    lines.append("")
+    lines.append("| Added | Removed | Changed | Unchanged |")
+    lines.append("|-------|---------|---------|-----------|")
+    lines.append(f"| {len(result['added'])} | {len(result['removed'])} | {len(result['changed'])} | {result['unchanged']} |")
+
+    for key in ("added", "removed", "changed"):
+        ids = result[key]
+        if ids:
+            lines.append("")
+            lines.append(f"## {key.title()}")
+            for item_id in ids[:show_ids]:
+                lines.append(f"- `{item_id}`")
+            if len(ids) > show_ids:
+                lines.append(f"- _...and {len(ids) - show_ids} more_")
+
+    return "\n".join(lines)
+
+
 def format_list_result(datasets: List[Dict[str, Any]]) -> str:
     """Format dataset list as markdown."""
     lines = ["# Langfuse Datasets", ""]
@@ -551,7 +1774,9 @@ def format_get_result(result: Dict[str, Any]) -> str:
         lines.append("")
 
         # Input summary - show first few non-internal fields
-        input_data = item.get("input", {})
+        input_data = item.get("input") or {}
+        if not isinstance(input_data, dict):
+            input_data = {"input": input_data}
         display_fields = {k: v for k, v in input_data.items() if not k.startswith("_")}
 
         # Show up to 5 key fields
@@ -568,13 +1793,13 @@ def format_get_result(result: Dict[str, Any]) -> str:
             lines.append(f"_...and {len(display_fields) - 5} more fields_")
 
         # Expected output
-        expected = item.get("expected_output", {})
-        if expected:
+        expected = item.get("expected_output") or {}
+        if isinstance(expected, dict) and expected:
             exp_str = ", ".join(f"{k}={v}" for k, v in expected.items())
             lines.append(f"**Expected:** {exp_str}")
 
         # Metadata
-        metadata = item.get("metadata", {})
+        metadata = item.get("metadata") or {}
         source_trace = metadata.get("source_trace_id", "")
         if source_trace:
             lines.append(f"**Source Trace:** `{source_trace[:20]}...`")
@@ -660,6 +1885,27 @@ def format_describe_result(result: Dict[str, Any]) -> str:
 # MAIN
 # =============================================================================
 
+def add_dedupe_arguments(parser: argparse.ArgumentParser) -> None:
+    """Duplicate-handling flags shared by add-trace and add-batch."""
+    parser.add_argument(
+        "--on-duplicate",
+        choices=DUPLICATE_MODES,
+        default="skip",
+        help="What to do when the input already exists in the dataset (default: skip)"
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        action="store_true",
+        help="Also treat near-identical text inputs (MinHash) as duplicates"
+    )
+    parser.add_argument(
+        "--similarity",
+        type=float,
+        default=0.85,
+        help="Estimated Jaccard similarity for a near-duplicate (default: 0.85)"
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Manage Langfuse datasets for regression testing",
@@ -673,15 +1919,26 @@ Commands:
   get         Get items from a dataset
   set-metadata Update dataset metadata
   describe    Get dataset details + metadata
+  sample      Draw a reproducible stratified sample
+  snapshot    Record a local versioned snapshot
+  versions    List snapshot versions
+  diff        Diff dataset versions
+  index       Rebuild the local dedupe index
 
 Examples:
   %(prog)s create --name "checkout_regressions" --description "Failing traces"
   %(prog)s add-trace --dataset "checkout_regressions" --trace-id abc123 --expected-score 9.0
   %(prog)s add-batch --dataset "checkout_regressions" --trace-file ids.txt
+  %(prog)s add-batch --dataset "checkout_regressions" --trace-file ids.txt --resume
   %(prog)s list
   %(prog)s get --name "checkout_regressions"
+  %(prog)s get --name "checkout_regressions" --jsonl --output items.jsonl
   %(prog)s set-metadata --name "checkout_regressions" --metadata '{"schema_version":"eval_infra_v1"}'
   %(prog)s describe --name "checkout_regressions"
+  %(prog)s sample --name "checkout_regressions" --fraction 0.1 --strata failure_reason --score-bins 4
+  %(prog)s snapshot --name "checkout_regressions" --label v1
+  %(prog)s diff --name "checkout_regressions" --from v1 --to current
+  %(prog)s index --name "checkout_regressions" --near-duplicates
         """
     )
 
@@ -715,6 +1972,7 @@ Examples:
         "--failure-reason",
         help="Reason why this trace is being added (for regressions)"
     )
+    add_dedupe_arguments(add_parser)
 
     # add-batch subcommand
     batch_parser = subparsers.add_parser("add-batch", help="Add traces from file")
@@ -730,6 +1988,33 @@ Examples:
         type=json.loads,
         help="Custom expected output as JSON"
     )
+    batch_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Parallel trace imports (default: 8)"
+    )
+    batch_parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Retries per trace on transient errors (default: 3)"
+    )
+    batch_parser.add_argument(
+        "--checkpoint",
+        help="Checkpoint JSONL path (default: .claude/dataset-checkpoints/<dataset>-<hash>.jsonl)"
+    )
+    batch_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip traces already added according to the checkpoint"
+    )
+    batch_parser.add_argument(
+        "--score-name",
+        default="quality_score",
+        help="Trace score copied to item metadata as original_score"
+    )
+    add_dedupe_arguments(batch_parser)
 
     # list subcommand
     subparsers.add_parser("list", help="List all datasets")
@@ -737,6 +2022,15 @@ Examples:
     # get subcommand
     get_parser = subparsers.add_parser("get", help="Get dataset items")
     get_parser.add_argument("--name", required=True, help="Dataset name")
+    get_parser.add_argument("--jsonl", action="store_true", help="Stream items as JSON lines")
+    get_parser.add_argument("--output", help="Write JSON lines to this file instead of stdout")
+    get_parser.add_argument(
+        "--fields",
+        nargs="+",
+        choices=list(DATASET_ITEM_KEYS.values()),
+        help="Item fields to include (default: id input expected_output metadata status)"
+    )
+    get_parser.add_argument("--limit", type=int, help="Stop after this many items")
 
     # set-metadata subcommand
     set_meta_parser = subparsers.add_parser("set-metadata", help="Set dataset metadata")
@@ -757,6 +2051,42 @@ Examples:
     describe_parser = subparsers.add_parser("describe", help="Describe dataset + metadata")
     describe_parser.add_argument("--name", required=True, help="Dataset name")
 
+    # sample subcommand
+    sample_parser = subparsers.add_parser("sample", help="Draw a reproducible stratified sample")
+    sample_parser.add_argument("--name", required=True, help="Dataset name")
+    size_group = sample_parser.add_mutually_exclusive_group(required=True)
+    size_group.add_argument("--size", type=int, help="Number of items to sample")
+    size_group.add_argument("--fraction", type=float, help="Fraction of items to sample (e.g. 0.1)")
+    size_group.add_argument("--mde", type=float, help="Size the sample to detect this effect (0-1 scale)")
+    sample_parser.add_argument("--seed", type=int, default=0, help="Sampling seed (default: 0)")
+    sample_parser.add_argument("--strata", nargs="+", help="Metadata keys to stratify by (e.g. failure_reason source)")
+    sample_parser.add_argument("--score-key", default="original_score", help="Metadata key holding the prior score")
+    sample_parser.add_argument("--score-bins", type=int, default=0, help="Also stratify by N bins of the prior score")
+    sample_parser.add_argument("--min-per-stratum", type=int, default=1, help="Minimum items per non-empty stratum")
+    sample_parser.add_argument("--output", help="Item-ID list path (default: .claude/dataset-samples/...)")
+    sample_parser.add_argument("--derived-dataset", help="Also copy sampled items into this dataset")
+
+    # snapshot / versions / diff subcommands
+    snapshot_parser = subparsers.add_parser("snapshot", help="Record a local versioned snapshot")
+    snapshot_parser.add_argument("--name", required=True, help="Dataset name")
+    snapshot_parser.add_argument("--label", help="Optional label (usable instead of the version ID)")
+
+    versions_parser = subparsers.add_parser("versions", help="List local snapshot versions")
+    versions_parser.add_argument("--name", required=True, help="Dataset name")
+
+    diff_parser = subparsers.add_parser("diff", help="Diff two dataset versions")
+    diff_parser.add_argument("--name", required=True, help="Dataset name")
+    diff_parser.add_argument("--from", dest="from_version", default="latest",
+                             help="Version ID, prefix, label or 'latest' (default: latest)")
+    diff_parser.add_argument("--to", dest="to_version", default="current",
+                             help="Version ID, prefix, label or 'current' for the live dataset (default)")
+
+    # index subcommand
+    index_parser = subparsers.add_parser("index", help="Rebuild the local dedupe index")
+    index_parser.add_argument("--name", required=True, help="Dataset name")
+    index_parser.add_argument("--near-duplicates", action="store_true", help="Also index MinHash signatures")
+    index_parser.add_argument("--similarity", type=float, default=0.85, help="Near-duplicate threshold")
+
     args = parser.parse_args()
 
     # Execute command
@@ -774,7 +2104,10 @@ Examples:
             trace_id=args.trace_id,
             expected_score=args.expected_score,
             expected_output=args.expected_output,
-            failure_reason=args.failure_reason
+            failure_reason=args.failure_reason,
+            on_duplicate=args.on_duplicate,
+            near_duplicates=args.near_duplicates,
+            similarity=args.similarity
         )
         print(format_add_result(result))
 
@@ -783,7 +2116,15 @@ Examples:
             dataset_name=args.dataset,
             trace_file=args.trace_file,
             expected_score=args.expected_score,
-            expected_output=args.expected_output
+            expected_output=args.expected_output,
+            concurrency=args.concurrency,
+            max_retries=args.max_retries,
+            checkpoint=args.checkpoint,
+            resume=args.resume,
+            score_name=args.score_name,
+            on_duplicate=args.on_duplicate,
+            near_duplicates=args.near_duplicates,
+            similarity=args.similarity
         )
         print(format_batch_result(result))
 
@@ -792,8 +2133,21 @@ Examples:
         print(format_list_result(datasets))
 
     elif args.command == "get":
-        result = get_dataset_items(name=args.name)
-        print(format_get_result(result))
+        if args.jsonl:
+            result = export_dataset_items_jsonl(
+                name=args.name,
+                output=args.output,
+                fields=args.fields,
+                limit=args.limit
+            )
+            if "error" in result:
+                print(f"Error: {result['error']}", file=sys.stderr)
+                sys.exit(1)
+            if args.output:
+                print(f"Exported {result['exported']} items to {args.output}", file=sys.stderr)
+        else:
+            result = get_dataset_items(name=args.name, fields=args.fields, limit=args.limit)
+            print(format_get_result(result))
 
     elif args.command == "set-metadata":
         result = set_dataset_metadata(
@@ -807,6 +2161,43 @@ Examples:
         result = describe_dataset(name=args.name)
         print(format_describe_result(result))
 
+    elif args.command == "sample":
+        result = sample_dataset_items(
+            name=args.name,
+            size=args.size,
+            fraction=args.fraction,
+            mde=args.mde,
+            seed=args.seed,
+            strata=args.strata,
+            score_key=args.score_key,
+            score_bins=args.score_bins,
+            min_per_stratum=args.min_per_stratum
+        )
+        if "error" not in result:
+            result["ids_file"] = write_sample_ids(result, args.output)
+            if args.derived_dataset:
+                result.update(materialize_sample(result, args.derived_dataset))
+        print(format_sample_result(result))
+
+    elif args.command == "snapshot":
+        result = snapshot_dataset(name=args.name, label=args.label)
+        print(format_snapshot_result(result))
+
+    elif args.command == "versions":
+        print(format_versions_result(args.name, SnapshotStore(args.name).versions()))
+
+    elif args.command == "diff":
+        result = diff_dataset_versions(args.name, args.from_version, args.to_version)
+        print(format_diff_result(result))
+
+    elif args.command == "index":
+        result = build_dedupe_index(
+            name=args.name,
+            near_duplicates=args.near_duplicates,
+            similarity=args.similarity
+        )
+        print(format_index_result(result))
+
 
 if __name__ == "__main__":
     main()
@@ -31,6 +31,10 @@ import langfuse_rest_client
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "langfuse-experiment-runner" / "helpers"))
 from experiment_runner import run_experiment
 
+# Dataset sampling for fast baseline iterations
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "dataset-management" / "helpers"))
+from dataset_manager import sample_dataset_items, write_sample_ids
+
 
 SCHEMA_VERSION = "eval_infra_v1"
 DEFAULT_SCORE_SCALE = "0-1"
@@ -770,6 +774,31 @@ def cmd_baseline(args: argparse.Namespace) -> int:
 
     if args.task_script:
         run_name = args.run_name or f"baseline-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        run_metadata = {"eval_infra": SCHEMA_VERSION, "sample_size_requested": args.sample_size}
+        item_ids = None
+        sample = None
+        if args.sampled:
+            sample = sample_dataset_items(
+                name=args.dataset,
+                size=None if args.sample_fraction else args.sample_size,
+                fraction=args.sample_fraction,
+                seed=args.sample_seed,
+                strata=args.sample_strata,
+                score_bins=args.sample_score_bins,
+            )
+            if "error" in sample:
+                print(f"Error sampling dataset: {sample['error']}", file=sys.stderr)
+                return 1
+            item_ids = sample["item_ids"]
+            run_metadata["sample"] = {
+                "seed": sample["seed"],
+                "strata": sample["strata"],
+                "score_bins": sample["score_bins"],
+                "size": sample["sample_size"],
+                "population": sample["population"],
+                "ids_file": write_sample_ids(sample),
+            }
+
         result = run_experiment(
             dataset_name=args.dataset,
             run_name=run_name,
@@ -778,8 +807,9 @@ def cmd_baseline(args: argparse.Namespace) -> int:
             use_langfuse_judges=True,
             judge_names=None,
             max_concurrency=args.max_concurrency,
-            run_description="Baseline evaluation run",
-            metadata={"eval_infra": SCHEMA_VERSION, "sample_size_requested": args.sample_size},
+            run_description="Sampled baseline evaluation run" if sample else "Baseline evaluation run",
+            metadata=run_metadata,
+            item_ids=item_ids,
         )
 
         if result.get("status") != "completed":
@@ -787,16 +817,27 @@ def cmd_baseline(args: argparse.Namespace) -> int:
             return 1
 
         _, existing_metadata = get_dataset_metadata(args.dataset)
-        patch = {
-            "baseline": {
-                "run_name": run_name,
-                "created_at": utc_now(),
-                "metrics": result.get("score_averages", {}),
-            },
-            "status": {
-                "baseline_ready": True,
-            },
-        }
+        if sample:
+            # A sampled run is an iteration baseline, not the confirmed full-dataset baseline
+            patch = {
+                "sampled_baseline": {
+                    "run_name": run_name,
+                    "created_at": utc_now(),
+                    "metrics": result.get("score_averages", {}),
+                    "sample": run_metadata["sample"],
+                },
+            }
+        else:
+            patch = {
+                "baseline": {
+                    "run_name": run_name,
+                    "created_at": utc_now(),
+                    "metrics": result.get("score_averages", {}),
+                },
+                "status": {
+                    "baseline_ready": True,
+                },
+            }
         update_result = update_dataset_metadata(args.dataset, patch)
 
         print("# Baseline Run")
@@ -807,9 +848,16 @@ def cmd_baseline(args: argparse.Namespace) -> int:
         print(f"**Score Scale:** `{result.get('score_scale', DEFAULT_SCORE_SCALE)}`")
         print(f"**Metadata Update:** {update_result.get('status')}")
 
-        if args.sample_size:
+        if sample:
+            mde = sample["power"].get("mde")
+            print(f"**Sample:** {sample['sample_size']} of {sample['population']} items (seed {sample['seed']})")
+            if mde is not None:
+                print(f"**Minimum Detectable Effect:** {mde:.3f} (alpha=0.05, power=0.8)")
+            print("")
+            print("_Note: sampled baselines are stored under `sampled_baseline`; run without --sampled to confirm on the full dataset._")
+        elif args.sample_size:
             print("")
-            print("_Note: sample-size is recorded for traceability; full dataset run is currently used by the SDK helper._")
+            print("_Note: sample-size is recorded for traceability; pass --sampled to run on a stratified sample._")
 
         return 0
 
@@ -869,7 +917,12 @@ def build_parser() -> argparse.ArgumentParser:
     baseline.add_argument("--dataset", required=True, help="Dataset name")
     baseline.add_argument("--task-script", help="Task script path for executing baseline")
     baseline.add_argument("--run-name", help="Optional baseline run name")
-    baseline.add_argument("--sample-size", type=int, default=5, help="Requested sample size metadata")
+    baseline.add_argument("--sample-size", type=int, default=5, help="Requested sample size (used with --sampled)")
+    baseline.add_argument("--sampled", action="store_true", help="Run on a reproducible stratified sample")
+    baseline.add_argument("--sample-fraction", type=float, help="Sample this fraction instead of --sample-size")
+    baseline.add_argument("--sample-seed", type=int, default=0, help="Sampling seed")
+    baseline.add_argument("--sample-strata", nargs="+", help="Metadata keys to stratify the sample by")
+    baseline.add_argument("--sample-score-bins", type=int, default=0, help="Also stratify by prior-score bins")
     baseline.add_argument("--max-concurrency", type=int, default=3, help="Experiment concurrency")
 
     export = sub.add_parser("export", help="Export infra snapshots")
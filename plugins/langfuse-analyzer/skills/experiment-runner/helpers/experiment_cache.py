@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Experiment Result Caches
+
+Local caches that let experiment reruns skip work whose inputs have not changed.
+
+TaskOutputCache stores task outputs under .claude/experiment-cache/task-outputs/.
+Entries are grouped by a task fingerprint: the task script's content hash plus
+any environment variables and extra config the caller declares as relevant.
+Within a fingerprint, each entry is keyed by the dataset item ID and a hash of
+the item's input. Editing the task script, changing a declared env var or
+editing the item all produce a miss.
+
+JudgeResponseCache stores raw LLM-judge responses under
+.claude/experiment-cache/judge-responses/. Each entry is keyed by the judge
+prompt name and version, the model settings and a hash of the filled prompt.
+A rerun over unchanged items therefore costs no judge calls. Entries are
+evicted by age and, least recently used first, by count.
+
+RunCache stores fetched experiment runs under .claude/experiment-cache/runs/,
+one JSONL file per (dataset, run name): a header line followed by one line
+per run item with its scores and, if fetched, its payloads. get-run, compare
+and analyze read it instead of re-fetching every trace.
+
+LiveDatasetIndex records, under .claude/experiment-cache/live-datasets/,
+which ephemeral live-mode dataset was built from which set of traces, keyed
+by a hash of the trace IDs, so the same traces are not materialized twice.
+
+Used by experiment_runner.py; not a standalone CLI.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "dataset-management" / "helpers"))
+from dataset_manager import canonical_json
+
+CACHE_DIR = Path(".claude/experiment-cache")
+TASK_CACHE_DIR = CACHE_DIR / "task-outputs"
+JUDGE_CACHE_DIR = CACHE_DIR / "judge-responses"
+RUN_CACHE_DIR = CACHE_DIR / "runs"
+LIVE_DATASET_DIR = CACHE_DIR / "live-datasets"
+JUDGE_CACHE_MAX_ENTRIES = 50000
+JUDGE_CACHE_MAX_AGE_DAYS = 30
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, payload: Dict[str, Any]) -> None:
+    """Write JSON via a temp file + rename so concurrent readers never see partial files."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def task_fingerprint(
+    task_script: str,
+    env_names: Sequence[str] = (),
+    config: Optional[Dict[str, Any]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fingerprint of everything outside the item that determines a task's output.
+
+    Returns (fingerprint, description); env var values are hashed, never stored.
+    """
+    script_hash = hashlib.sha256(Path(task_script).resolve().read_bytes()).hexdigest()
+    env = {name: os.getenv(name) for name in sorted(set(env_names))}
+    fingerprint = _sha256(canonical_json({
+        "script": script_hash,
+        "env": env,
+        "config": config or {},
+    }))[:16]
+    description = {
+        "task_script": str(Path(task_script).resolve()),
+        "script_hash": script_hash,
+        "env_names": sorted(env),
+        "config": config or {},
+    }
+    return fingerprint, description
+
+
+class TaskOutputCache:
+    """
+    Task outputs for one task fingerprint, one JSON file per item.
+
+    `read` enables replaying cached outputs; `write` stores fresh ones.
+    Only JSON-serializable outputs are cached, so a replayed output is
+    identical to what evaluators saw originally. Safe to share between
+    threads; entries are written atomically.
+    """
+
+    def __init__(
+        self,
+        task_script: str,
+        env_names: Sequence[str] = (),
+        config: Optional[Dict[str, Any]] = None,
+        read: bool = True,
+        write: bool = True,
+        root: Path = TASK_CACHE_DIR
+    ):
+        self.fingerprint, self.description = task_fingerprint(task_script, env_names, config)
+        self.read = read
+        self.write = write
+        self.dir = root / self.fingerprint
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "uncacheable": 0}
+        if write:
+            manifest = self.dir / "fingerprint.json"
+            if not manifest.exists():
+                _write_atomic(manifest, {**self.description, "created_at": datetime.now(timezone.utc).isoformat()})
+
+    @staticmethod
+    def input_hash(item: Any) -> str:
+        return _sha256(canonical_json(getattr(item, "input", None)))
+
+    def _path(self, item: Any) -> Path:
+        key = _sha256(canonical_json([getattr(item, "id", None), self.input_hash(item)]))
+        return self.dir / key[:2] / f"{key}.json"
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, item: Any) -> Tuple[bool, Any]:
+        """Return (hit, output) for an item."""
+        if not self.read:
+            return False, None
+        path = self._path(item)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._count("misses")
+            return False, None
+        self._count("hits")
+        return True, entry.get("output")
+
+    def put(self, item: Any, output: Any) -> bool:
+        """Store an output; returns False if it is not JSON-serializable."""
+        if not self.write:
+            return False
+        try:
+            json.dumps(output)
+        except (TypeError, ValueError):
+            self._count("uncacheable")
+            return False
+        _write_atomic(self._path(item), {
+            "item_id": getattr(item, "id", None),
+            "input_hash": self.input_hash(item),
+            "fingerprint": self.fingerprint,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "output": output,
+        })
+        self._count("stored")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["fingerprint"] = self.fingerprint
+        return stats
+
+
+class JudgeResponseCache:
+    """
+    Raw judge responses, one JSON file per (prompt, version, model settings,
+    filled prompt). Only the response text is cached, so parsing changes apply
+    to cached responses too. Hits refresh the file's mtime, which drives
+    least-recently-used eviction in prune(). Safe to share between threads.
+    """
+
+    def __init__(self, root: Path = JUDGE_CACHE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0}
+
+    @staticmethod
+    def key(
+        prompt_name: str,
+        prompt_version: Any,
+        model: str,
+        temperature: Any,
+        max_tokens: Any,
+        filled_prompt: str
+    ) -> str:
+        return _sha256(canonical_json({
+            "prompt": prompt_name,
+            "version": prompt_version,
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "filled_prompt": _sha256(filled_prompt),
+        }))
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response text, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, json.JSONDecodeError):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return entry.get("response")
+
+    def put(self, key: str, response: str, prompt_name: str, prompt_version: Any, model: str) -> None:
+        _write_atomic(self._path(key), {
+            "prompt": prompt_name,
+            "version": prompt_version,
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "response": response,
+        })
+        self._count("stored")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def prune(
+        self,
+        max_entries: int = JUDGE_CACHE_MAX_ENTRIES,
+        max_age_days: float = JUDGE_CACHE_MAX_AGE_DAYS
+    ) -> Dict[str, int]:
+        """Drop entries unused for max_age_days, then the least recently used beyond max_entries."""
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        cutoff = time.time() - max_age_days * 86400
+        expired = [path for mtime, path in entries if mtime < cutoff]
+        fresh = sorted((e for e in entries if e[0] >= cutoff), reverse=True)
+        evicted = [path for _, path in fresh[max_entries:]]
+        for path in expired + evicted:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        return {"expired": len(expired), "evicted": len(evicted), "remaining": len(fresh) - len(evicted)}
+
+
+class RunCache:
+    """
+    Fetched experiment runs, one JSONL file per dataset and run name.
+
+    The header records the run's metadata, item count, fetch time and whether item
+    payloads (input, output, expected output) were fetched. Files are
+    written to a temp file while the run streams in and renamed into place
+    only once complete, so an interrupted fetch never leaves a partial entry.
+    """
+
+    def __init__(self, root: Path = RUN_CACHE_DIR):
+        self.root = root
+
+    def _path(self, dataset_name: str, run_name: str) -> Path:
+        safe = lambda name: re.sub(r"[^A-Za-z0-9._-]+", "_", name) + "-" + _sha256(name)[:8]
+        return self.root / safe(dataset_name) / f"{safe(run_name)}.jsonl"
+
+    def header(self, dataset_name: str, run_name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(dataset_name, run_name)) as f:
+                return json.loads(f.readline())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def records(self, dataset_name: str, run_name: str) -> Iterator[Dict[str, Any]]:
+        """Stream the cached item records (the header line is skipped)."""
+        with open(self._path(dataset_name, run_name)) as f:
+            f.readline()
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def write(
+        self,
+        dataset_name: str,
+        run_name: str,
+        header: Dict[str, Any],
+        records: Iterator[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Pass records through while writing them; the entry is committed when
+        the stream is exhausted. Header fields "item_count" and "cached_at"
+        are filled in at commit time.
+        """
+        path = self._path(dataset_name, run_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        count = 0
+        try:
+            with open(tmp, "w") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                    count += 1
+                    yield record
+            header = {**header, "item_count": count, "cached_at": datetime.now(timezone.utc).isoformat()}
+            with open(tmp) as src, open(path.with_name(path.name + ".new"), "w") as dst:
+                dst.write(json.dumps(header, ensure_ascii=False, default=str) + "\n")
+                shutil.copyfileobj(src, dst)
+            os.replace(path.with_name(path.name + ".new"), path)
+        finally:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def invalidate(self, dataset_name: str, run_name: str) -> None:
+        try:
+            self._path(dataset_name, run_name).unlink()
+        except OSError:
+            pass
+
+
+def trace_set_hash(trace_ids: Sequence[str]) -> str:
+    """Order-independent hash of a set of trace IDs."""
+    return _sha256("\n".join(sorted(set(trace_ids))))[:16]
+
+
+class LiveDatasetIndex:
+    """Live-mode datasets by the hash of the trace IDs they were built from."""
+
+    def __init__(self, root: Path = LIVE_DATASET_DIR):
+        self.root = root
+
+    def get(self, trace_set: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.root / f"{trace_set}.json") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, trace_set: str, dataset_name: str, trace_count: int, item_count: int) -> None:
+        _write_atomic(self.root / f"{trace_set}.json", {
+            "dataset": dataset_name,
+            "traces": trace_count,
+            "items": item_count,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+    def discard(self, trace_set: str) -> None:
+        try:
+            (self.root / f"{trace_set}.json").unlink()
+        except OSError:
+            pass
+
+
+def cache_summary(root: Path = CACHE_DIR) -> Dict[str, Any]:
+    """Entry counts and disk usage of the local experiment caches."""
+    summary = {}
+    caches = (
+        ("task-outputs", root / TASK_CACHE_DIR.name, "*.json"),
+        ("judge-responses", root / JUDGE_CACHE_DIR.name, "*.json"),
+        ("runs", root / RUN_CACHE_DIR.name, "*.jsonl"),
+        ("live-datasets", root / LIVE_DATASET_DIR.name, "*.json"),
+    )
+    for name, directory, pattern in caches:
+        files = [p for p in directory.rglob(pattern) if p.name != "fingerprint.json"] if directory.exists() else []
+        mtimes = [p.stat().st_mtime for p in files]
+        summary[name] = {
+            "path": str(directory),
+            "entries": len(files),
+            "bytes": sum(p.stat().st_size for p in files),
+            "oldest": datetime.fromtimestamp(min(mtimes), timezone.utc).isoformat() if mtimes else None,
+            "newest": datetime.fromtimestamp(max(mtimes), timezone.utc).isoformat() if mtimes else None,
+        }
+        if name == "task-outputs" and directory.exists():
+            summary[name]["fingerprints"] = sum(1 for p in directory.iterdir() if p.is_dir())
+    return summary
+
+
+def clear_cache(which: str, root: Path = CACHE_DIR) -> List[str]:
+    """Delete one cache ("task-outputs", "judge-responses", "runs", "live-datasets") or "all"; returns removed paths."""
+    names = [TASK_CACHE_DIR.name, JUDGE_CACHE_DIR.name, RUN_CACHE_DIR.name, LIVE_DATASET_DIR.name] if which == "all" else [which]
+    removed = []
+    for name in names:
+        directory = root / name
+        if directory.exists():
+            shutil.rmtree(directory)
+            removed.append(str(directory))
+    return removed
+
+
+def parse_cache_env(names: Optional[List[str]]) -> List[str]:
+    """Accept repeated or comma-separated env var names."""
+    return [n.strip() for name in (names or []) for n in name.split(",") if n.strip()]
@@ -0,0 +1,1126 @@
+#!/usr/bin/env python3
+"""
+Native Experiment Executor
+
+Runs a task and its evaluators over streamed dataset items without the SDK's
+run_experiment. Items flow through a bounded queue into a thread pool, or an
+asyncio loop when the task is a coroutine function. Evaluators for an item run
+concurrently. Traces, scores and dataset run links are buffered and flushed to
+Langfuse in batches, and progress, throughput and ETA are reported on stderr
+while the run is in flight.
+
+For CPU-bound scripts, ProcessExecutor runs the task and script evaluators
+in worker processes instead, dispatching items in chunks.
+
+AdaptiveConcurrency optionally replaces the fixed concurrency of thread and
+async runs with an AIMD limit driven by item latency and overload errors.
+
+Used by experiment_runner.py; not a standalone CLI.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import pickle
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
+import langfuse_rest_client
+
+INGEST_BATCH_SIZE = 100
+FLUSH_INTERVAL = 2.0
+PROGRESS_INTERVAL = 1.0
+MAX_FLUSH_RETRIES = 3
+DEFAULT_CHUNK_SIZE = 4
+TRACE_NAME = "experiment-item-run"
+ADAPTIVE_MAX_CONCURRENCY = 64
+LATENCY_TOLERANCE = 2.0
+OVERLOAD_BACKOFF = 0.5
+LATENCY_BACKOFF = 0.75
+MAX_TIMELINE_ENTRIES = 100
+OVERLOAD_PATTERN = re.compile(
+    r"\b429\b|\b50[34]\b|\b529\b|rate.?limit|too many requests|overloaded|timed? ?out|timeout",
+    re.IGNORECASE
+)
+
+_DONE = object()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def to_jsonable(value: Any) -> Any:
+    """Return value unchanged if it serializes to JSON, else a str-coerced copy."""
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return json.loads(json.dumps(value, default=str))
+
+
+def is_async_callable(fn: Callable) -> bool:
+    """True for coroutine functions and objects with an async __call__."""
+    return inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(getattr(fn, "__call__", None))
+
+
+def callable_name(fn: Callable) -> str:
+    return getattr(fn, "__name__", None) or type(fn).__name__
+
+
+def accepts_kwarg(fn: Callable, name: str) -> bool:
+    """Whether fn can be called with keyword `name` (explicitly or via **kwargs)."""
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == name or p.kind == inspect.Parameter.VAR_KEYWORD for p in params)
+
+
+def as_evaluations(result: Any) -> List[Dict[str, Any]]:
+    """
+    Normalize an evaluator's return value to [{"name", "value", "comment"}].
+
+    Accepts an Evaluation-like object, a dict with name/value, or a list of
+    either; None means the evaluator abstained.
+    """
+    if result is None:
+        return []
+    if isinstance(result, (list, tuple)):
+        return [e for r in result for e in as_evaluations(r)]
+    if isinstance(result, dict):
+        if "name" not in result or "value" not in result:
+            return []
+        return [{"name": result["name"], "value": result["value"], "comment": result.get("comment")}]
+    if hasattr(result, "name") and hasattr(result, "value"):
+        return [{"name": result.name, "value": result.value, "comment": getattr(result, "comment", None)}]
+    return []
+
+
+def from_judge_cache(outcome: Any) -> bool:
+    """True if an evaluator's result was served from stored responses (Evaluations marked `cached`)."""
+    if isinstance(outcome, (list, tuple)):
+        return bool(outcome) and all(from_judge_cache(o) for o in outcome)
+    return getattr(outcome, "cached", False) is True
+
+
+class ItemResult:
+    """Outcome of running the task and evaluators on one dataset item."""
+
+    def __init__(self, item: Any, trace_id: str):
+        self.item = item
+        self.trace_id = trace_id
+        self.output: Any = None
+        self.evaluations: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.evaluator_errors: Dict[str, str] = {}
+        self.duration = 0.0
+        self.cached = False
+        # Every evaluator answered from the judge cache, so duration is not a real latency
+        self.judges_cached = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# =============================================================================
+# PROGRESS
+# =============================================================================
+
+class ProgressReporter:
+    """Thread-safe progress line with throughput and ETA, throttled to stderr."""
+
+    def __init__(self, total: Optional[int], label: str = "items", interval: float = PROGRESS_INTERVAL):
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.concurrency: Optional[int] = None
+        self._last = 0.0
+        self._printed = 0
+        self._lock = threading.Lock()
+        self._tty = sys.stderr.isatty()
+
+    def update(self, ok: bool = True) -> None:
+        with self._lock:
+            self.done += 1
+            if not ok:
+                self.failed += 1
+            now = time.monotonic()
+            if now - self._last >= self.interval or self.done == self.total:
+                self._last = now
+                self._print(now)
+
+    def _print(self, now: float) -> None:
+        self._printed = self.done
+        elapsed = max(now - self.started, 1e-9)
+        rate = self.done / elapsed
+        line = f"[{self.done}/{self.total if self.total is not None else '?'}]"
+        if self.total:
+            line += f" {self.done / self.total:.0%}"
+        line += f" | ok {self.done - self.failed} | failed {self.failed} | {rate:.1f} {self.label}/s"
+        if self.total and rate > 0:
+            line += f" | ETA {_format_duration((self.total - self.done) / rate)}"
+        if self.concurrency is not None:
+            line += f" | concurrency {self.concurrency}"
+        if self._tty:
+            print(f"\r{line}\033[K", end="", file=sys.stderr, flush=True)
+        else:
+            print(line, file=sys.stderr)
+
+    def finish(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            if self.done != self._printed:
+                self._print(now)
+            if self._tty and self.done:
+                print(file=sys.stderr)
+            elapsed = now - self.started
+            return {
+                "elapsed_seconds": round(elapsed, 2),
+                "throughput": round(self.done / elapsed, 2) if elapsed > 0 else 0.0,
+            }
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+# =============================================================================
+# RESULT SINK
+# =============================================================================
+
+def _score_body(trace_id: str, evaluation: Dict[str, Any], score_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Build a score-create body; values that are not numbers, bools or strings are dropped."""
+    value = evaluation["value"]
+    body = {"id": score_id or str(uuid.uuid4()), "traceId": trace_id, "name": evaluation["name"]}
+    if isinstance(value, bool):
+        body.update(value=1 if value else 0, dataType="BOOLEAN")
+    elif isinstance(value, (int, float)):
+        body.update(value=value, dataType="NUMERIC")
+    elif isinstance(value, str):
+        body.update(value=value, dataType="CATEGORICAL")
+    else:
+        return None
+    if evaluation.get("comment"):
+        body["comment"] = str(evaluation["comment"])
+    return body
+
+
+class ResultSink:
+    """
+    Buffers trace and score events plus dataset run links for finished items
+    and flushes them from a background thread, every `batch_size` events or
+    `flush_interval` seconds. Run links for a batch are posted after the
+    batch's traces are ingested. Failed items are not written.
+
+    on_linked, if given, is called from the flush thread with each run link
+    that was created for an item whose trace and scores were all ingested,
+    i.e. once the item is durably in Langfuse.
+    """
+
+    def __init__(
+        self,
+        run_name: str,
+        run_description: Optional[str] = None,
+        run_metadata: Optional[Dict[str, Any]] = None,
+        batch_size: int = INGEST_BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_retries: int = MAX_FLUSH_RETRIES,
+        on_linked: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.run_name = run_name
+        self.on_linked = on_linked
+        self.run_description = run_description
+        self.run_metadata = to_jsonable(run_metadata or {})
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+
+        self._events: List[Dict[str, Any]] = []
+        self._run_items: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {"events_sent": 0, "events_failed": 0, "run_items_linked": 0, "run_items_failed": 0}
+        self._errors: List[str] = []
+        self._failed_traces: set = set()
+        self._thread = threading.Thread(target=self._flush_loop, name="result-sink", daemon=True)
+        self._thread.start()
+
+    def add(self, result: ItemResult) -> None:
+        if not result.ok:
+            return
+        item = result.item
+        trace = {
+            "id": result.trace_id,
+            "timestamp": _now(),
+            "name": TRACE_NAME,
+            "input": to_jsonable(getattr(item, "input", None)),
+            "output": to_jsonable(result.output),
+            "metadata": {
+                "experiment_name": self.run_name,
+                "dataset_id": getattr(item, "dataset_id", None),
+                "dataset_item_id": getattr(item, "id", None),
+            },
+        }
+        events = [{"type": "trace-create", "body": trace}]
+        for evaluation in result.evaluations:
+            body = _score_body(result.trace_id, evaluation)
+            if body:
+                events.append({"type": "score-create", "body": body})
+
+        run_item = None
+        if getattr(item, "id", None):
+            run_item = {
+                "runName": self.run_name,
+                "datasetItemId": item.id,
+                "traceId": result.trace_id,
+                "metadata": self.run_metadata,
+            }
+            if self.run_description:
+                run_item["runDescription"] = self.run_description
+
+        with self._cond:
+            self._events.extend(events)
+            if run_item:
+                self._run_items.append(run_item)
+            if len(self._events) >= self.batch_size:
+                self._cond.notify()
+
+    def add_scores(self, trace_id: str, evaluations: List[Dict[str, Any]], id_seed: Optional[str] = None) -> None:
+        """
+        Queue scores for an existing trace, e.g. judge results that arrive
+        after the run. With id_seed the score IDs are derived from it, so
+        writing the same results again updates instead of duplicating.
+        """
+        events = []
+        for evaluation in evaluations:
+            score_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{id_seed}:{evaluation['name']}")) if id_seed else None
+            body = _score_body(trace_id, evaluation, score_id)
+            if body:
+                events.append({"type": "score-create", "body": body})
+        with self._cond:
+            self._events.extend(events)
+            if len(self._events) >= self.batch_size:
+                self._cond.notify()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._events) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                events, self._events = self._events, []
+                closed = self._closed
+                # The newest link waits for close, so the final run metadata is always sent
+                cut = len(self._run_items) if closed else len(self._run_items) - 1
+                run_items, self._run_items = self._run_items[:max(cut, 0)], self._run_items[max(cut, 0):]
+            for start in range(0, len(events), self.batch_size):
+                self._send_events(events[start:start + self.batch_size])
+            if run_items:
+                self._send_run_items(run_items)
+            if closed and not events and not run_items:
+                return
+
+    def _send_events(self, bodies: List[Dict[str, Any]]) -> None:
+        """Ingest one batch; only events failing with 429/5xx or transport errors are resent."""
+        pending = bodies
+        attempt = 0
+        while pending:
+            events = [
+                {"id": str(uuid.uuid4()), "timestamp": _now(), "type": e["type"], "body": e["body"]}
+                for e in pending
+            ]
+            by_event = dict(zip((e["id"] for e in events), pending))
+            retry: List[Dict[str, Any]] = []
+            try:
+                response = langfuse_rest_client.ingest_batch(events)
+                if response is None:
+                    self._fail(pending, "Missing Langfuse credentials")
+                    return
+                self.stats["events_sent"] += len(response.get("successes", []))
+                for error in response.get("errors", []):
+                    event = by_event.get(error.get("id"))
+                    if not event:
+                        continue
+                    status = error.get("status", 0)
+                    if status == 429 or status >= 500:
+                        retry.append(event)
+                    else:
+                        self._fail([event], error.get("message") or str(error.get("error")))
+                last_error = "Retryable ingestion error"
+            except Exception as e:
+                retry = pending
+                last_error = str(e)
+
+            attempt += 1
+            if retry and attempt > self.max_retries:
+                self._fail(retry, last_error)
+                return
+            if retry:
+                time.sleep(min(2 ** attempt, 30))
+            pending = retry
+
+    def update_metadata(self, fields: Dict[str, Any]) -> None:
+        """Merge fields into the run metadata sent with run links from now on."""
+        with self._cond:
+            self.run_metadata = {**self.run_metadata, **to_jsonable(fields)}
+
+    def _send_run_items(self, run_items: List[Dict[str, Any]]) -> None:
+        # Langfuse upserts run metadata with every link, so send the latest
+        metadata = self.run_metadata
+        for run_item in run_items:
+            run_item["metadata"] = metadata
+        outcomes = langfuse_rest_client.create_dataset_run_items(run_items)
+        for run_item, outcome in zip(run_items, outcomes):
+            if outcome["ok"]:
+                self.stats["run_items_linked"] += 1
+                if self.on_linked and run_item["traceId"] not in self._failed_traces:
+                    self.on_linked(run_item)
+            else:
+                self.stats["run_items_failed"] += 1
+                self._note_error(f"run item: {outcome.get('error')}")
+
+    def _fail(self, events: List[Dict[str, Any]], error: str) -> None:
+        self.stats["events_failed"] += len(events)
+        for event in events:
+            body = event["body"]
+            self._failed_traces.add(body.get("traceId") or body.get("id"))
+        self._note_error(error)
+
+    def _note_error(self, error: str) -> None:
+        if error not in self._errors:
+            self._errors.append(error)
+            print(f"Warning: Failed to write results to Langfuse: {error}", file=sys.stderr)
+
+    def close(self) -> Dict[str, Any]:
+        """Flush everything still buffered and return write statistics."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        return dict(self.stats)
+
+
+# =============================================================================
+# ADAPTIVE CONCURRENCY
+# =============================================================================
+
+def is_overload(result: ItemResult) -> bool:
+    """Whether an item failed (or had an evaluator fail) on a rate limit, overload or timeout."""
+    messages = [result.error or ""] + list(result.evaluator_errors.values())
+    messages += [
+        str(e.get("comment") or "") for e in result.evaluations
+        if str(e.get("comment") or "").startswith("Error:")
+    ]
+    return any(OVERLOAD_PATTERN.search(message) for message in messages if message)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on how many items are processed at once.
+
+    Completions are grouped into windows of `limit` items, roughly one round
+    of in-flight work. After a clean window whose median latency stays within
+    `latency_tolerance` of the baseline (the best median since the last
+    latency backoff), the limit grows by one. A rising median shrinks it by
+    LATENCY_BACKOFF and re-anchors the baseline to that median, so one fast
+    early window cannot hold the limit down for the rest of the run. Items
+    whose output or judge responses came from a cache are not timed. A 429, overload or
+    timeout shrinks it by OVERLOAD_BACKOFF, but not again until the items
+    that were in flight at the last change have finished, so one burst of
+    errors is not punished repeatedly. Every change is appended to
+    `timeline` with the elapsed time and the reason.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int = ADAPTIVE_MAX_CONCURRENCY,
+        minimum: int = 1,
+        latency_tolerance: float = LATENCY_TOLERANCE
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.latency_tolerance = latency_tolerance
+        self._active = 0
+        self._cond = threading.Condition()
+        self._window: List[float] = []
+        self._since_change = 0
+        self._cooldown = 0
+        self._best_latency: Optional[float] = None
+        self._started = time.monotonic()
+        self.changes = 0
+        self.backoffs = 0
+        self.peak = self.limit
+        self.timeline: List[Dict[str, Any]] = []
+        self._record("start")
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+
+    async def acquire_async(self) -> None:
+        while True:
+            with self._cond:
+                if self._active < self.limit:
+                    self._active += 1
+                    return
+            await asyncio.sleep(0.02)
+
+    def release(self) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def observe(self, result: ItemResult) -> bool:
+        """Feed one finished item; returns True if the limit changed."""
+        with self._cond:
+            self._since_change += 1
+            if is_overload(result):
+                if self._since_change >= self._cooldown:
+                    return self._set(int(self.limit * OVERLOAD_BACKOFF), "overload")
+                return False
+            if result.cached or result.judges_cached:
+                return False
+            self._window.append(result.duration)
+            if len(self._window) < self.limit:
+                return False
+            median = sorted(self._window)[len(self._window) // 2]
+            self._window = []
+            if self._best_latency is None or median < self._best_latency:
+                self._best_latency = median
+            if median > self._best_latency * self.latency_tolerance:
+                self._best_latency = median
+                return self._set(int(self.limit * LATENCY_BACKOFF), "latency")
+            return self._set(self.limit + 1, "increase")
+
+    def _set(self, limit: int, reason: str) -> bool:
+        limit = min(max(limit, self.minimum), self.maximum)
+        self._since_change = 0
+        # Items already in flight started under the old limit; their errors say nothing new
+        self._cooldown = self._active
+        self._window = []
+        if limit == self.limit:
+            return False
+        self.limit = limit
+        self.changes += 1
+        self.backoffs += reason != "increase"
+        self.peak = max(self.peak, limit)
+        self._record(reason)
+        self._cond.notify_all()
+        return True
+
+    def _record(self, reason: str) -> None:
+        self.timeline.append({
+            "t": round(time.monotonic() - self._started, 1),
+            "concurrency": self.limit,
+            "reason": reason,
+        })
+        if len(self.timeline) > MAX_TIMELINE_ENTRIES:
+            # Keep the starting point and the most recent changes
+            del self.timeline[1]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "final": self.limit,
+                "peak": self.peak,
+                "changes": self.changes,
+                "backoffs": self.backoffs,
+                "timeline": list(self.timeline),
+            }
+
+
+# =============================================================================
+# EXECUTOR
+# =============================================================================
+
+class ExperimentExecutor:
+    """
+    Runs `task_fn(item=item)` and every evaluator over a stream of items.
+
+    The task runs on `max_concurrency` worker threads, or as that many asyncio
+    workers if it is a coroutine function. Items are pulled through a bounded
+    queue so the source is consumed lazily. The task also receives `trace_id`
+    if it accepts it, so it can attach its own spans to the item's trace.
+    Evaluators get input, output, expected_output and metadata as keywords;
+    sync and async evaluators can be mixed. In async mode, an evaluator's
+    `acall` coroutine method (if it has one) is used instead of calling it.
+
+    `on_result(ItemResult)` is called once per item, serialized under a lock.
+
+    With an `output_cache` (see experiment_cache.TaskOutputCache), cached
+    outputs replace the task call and fresh outputs are stored.
+
+    With `adaptive` (an AdaptiveConcurrency), the number of items in flight
+    follows its limit instead of staying at max_concurrency, and the limit's
+    timeline is written to the run metadata as it changes.
+    """
+
+    def __init__(
+        self,
+        task_fn: Callable,
+        evaluators: Optional[List[Callable]] = None,
+        max_concurrency: int = 5,
+        sink: Optional[ResultSink] = None,
+        on_result: Optional[Callable[[ItemResult], None]] = None,
+        progress: bool = True,
+        output_cache: Optional[Any] = None,
+        adaptive: Optional[AdaptiveConcurrency] = None
+    ):
+        self.task_fn = task_fn
+        self.output_cache = output_cache
+        self.evaluators = list(evaluators or [])
+        self.adaptive = adaptive
+        # With an adaptive limit, start enough workers for its ceiling; the limit gates them
+        self.max_concurrency = adaptive.maximum if adaptive else max(1, max_concurrency)
+        self.sink = sink
+        self.on_result = on_result
+        self.progress = progress
+        self.mode = "async" if is_async_callable(task_fn) else "thread"
+        self._pass_trace_id = accepts_kwarg(task_fn, "trace_id")
+        self._result_lock = threading.Lock()
+        self._warned: set = set()
+        self._reporter: Optional[ProgressReporter] = None
+
+    def run(self, items: Iterable[Any], total: Optional[int] = None) -> Dict[str, Any]:
+        """Process all items; returns counts, mode, elapsed time and throughput."""
+        self._reporter = ProgressReporter(total) if self.progress else None
+        if self._reporter and self.adaptive:
+            self._reporter.concurrency = self.adaptive.limit
+        self._counts = {"processed": 0, "successful": 0, "failed": 0, "cached": 0}
+        # Sync evaluators (and, in thread mode, the tasks' evaluator fan-out) run here
+        eval_workers = self.max_concurrency * max(1, len(self.evaluators))
+        with ThreadPoolExecutor(max_workers=eval_workers, thread_name_prefix="evaluator") as eval_pool:
+            self._eval_pool = eval_pool
+            self._execute(items)
+        timing = self._reporter.finish() if self._reporter else {}
+        execution = {**self._counts, "mode": self.mode, **timing}
+        if self.adaptive:
+            execution["concurrency"] = self.adaptive.summary()
+        return execution
+
+    def evaluator_names(self) -> List[str]:
+        return [callable_name(e) for e in self.evaluators]
+
+    def _execute(self, items: Iterable[Any]) -> None:
+        if self.mode == "async":
+            asyncio.run(self._run_async(items))
+        else:
+            self._run_threads(items)
+
+    # -- shared ---------------------------------------------------------------
+
+    def _task_kwargs(self, item: Any, trace_id: str) -> Dict[str, Any]:
+        kwargs = {"item": item}
+        if self._pass_trace_id:
+            kwargs["trace_id"] = trace_id
+        return kwargs
+
+    @staticmethod
+    def _eval_kwargs(item: Any, output: Any) -> Dict[str, Any]:
+        return {
+            "input": getattr(item, "input", None),
+            "output": output,
+            "expected_output": getattr(item, "expected_output", None),
+            "metadata": getattr(item, "metadata", None),
+        }
+
+    def _record_evaluator_error(self, result: ItemResult, name: str, error: Any) -> None:
+        result.evaluator_errors[name] = str(error)
+        if name not in self._warned:
+            self._warned.add(name)
+            print(f"Warning: Evaluator '{name}' failed: {error}", file=sys.stderr)
+
+    def _adapt(self, result: ItemResult) -> None:
+        """Report a finished item to the adaptive limit (before it is written, so metadata is current)."""
+        self.adaptive.release()
+        if self.adaptive.observe(result):
+            if self.sink:
+                self.sink.update_metadata({"concurrency_timeline": self.adaptive.timeline})
+            if self._reporter:
+                self._reporter.concurrency = self.adaptive.limit
+
+    def _complete(self, result: ItemResult) -> None:
+        if self.adaptive:
+            self._adapt(result)
+        with self._result_lock:
+            self._counts["processed"] += 1
+            self._counts["successful" if result.ok else "failed"] += 1
+            if result.cached:
+                self._counts["cached"] += 1
+            if self.on_result:
+                self.on_result(result)
+        if self.sink:
+            self.sink.add(result)
+        if self._reporter:
+            self._reporter.update(result.ok)
+
+    # -- thread mode ----------------------------------------------------------
+
+    def _run_threads(self, items: Iterable[Any]) -> None:
+        work: "queue.Queue" = queue.Queue(maxsize=self.max_concurrency * 2)
+        stop = threading.Event()
+        source_errors: List[BaseException] = []
+        worker_errors: List[BaseException] = []
+
+        def put(value: Any) -> bool:
+            """Queue value unless the run stops first (workers may be gone, leaving the queue full)."""
+            while not stop.is_set():
+                try:
+                    work.put(value, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for item in items:
+                    if not put(item):
+                        return
+            except BaseException as e:
+                source_errors.append(e)
+            finally:
+                for _ in range(self.max_concurrency):
+                    if not put(_DONE):
+                        break
+
+        def consume():
+            while not stop.is_set():
+                try:
+                    item = work.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    return
+                if self.adaptive:
+                    self.adaptive.acquire()
+                try:
+                    self._complete(self._process_sync(item))
+                except BaseException as e:
+                    # Task and evaluator errors are caught per item; this is a result
+                    # handler / sink failure, so stop the run instead of losing items silently
+                    worker_errors.append(e)
+                    stop.set()
+                    return
+
+        producer = threading.Thread(target=produce, name="item-producer", daemon=True)
+        producer.start()
+        workers = [
+            threading.Thread(target=consume, name=f"task-worker-{i}", daemon=True)
+            for i in range(self.max_concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            raise
+        # Workers can only exit early through a stop; release the producer too
+        stop.set()
+        producer.join()
+        if worker_errors:
+            raise worker_errors[0]
+        if source_errors:
+            raise source_errors[0]
+
+    def _cached_output(self, result: ItemResult) -> bool:
+        if not self.output_cache:
+            return False
+        hit, output = self.output_cache.get(result.item)
+        if hit:
+            result.output = output
+            result.cached = True
+        return hit
+
+    def _process_sync(self, item: Any) -> ItemResult:
+        result = ItemResult(item, uuid.uuid4().hex)
+        started = time.monotonic()
+        if not self._cached_output(result):
+            try:
+                output = self.task_fn(**self._task_kwargs(item, result.trace_id))
+                if inspect.isawaitable(output):
+                    output = asyncio.run(_await(output))
+                result.output = output
+            except Exception as e:
+                result.error = str(e)
+                result.duration = time.monotonic() - started
+                return result
+            if self.output_cache:
+                self.output_cache.put(item, result.output)
+
+        self._evaluate_sync(result, self.evaluators)
+        result.duration = time.monotonic() - started
+        return result
+
+    def _evaluate_sync(self, result: ItemResult, evaluators: List[Callable]) -> None:
+        """Run evaluators concurrently on the evaluator pool and collect their scores."""
+        kwargs = self._eval_kwargs(result.item, result.output)
+        futures = {self._eval_pool.submit(_call_sync, evaluator, kwargs): evaluator for evaluator in evaluators}
+        wait(futures)
+        judges_cached = bool(futures)
+        for future, evaluator in futures.items():
+            try:
+                outcome = future.result()
+            except Exception as e:
+                self._record_evaluator_error(result, callable_name(evaluator), e)
+                judges_cached = False
+                continue
+            result.evaluations.extend(as_evaluations(outcome))
+            judges_cached = judges_cached and from_judge_cache(outcome)
+        result.judges_cached = judges_cached
+
+    # -- async mode -----------------------------------------------------------
+
+    async def _run_async(self, items: Iterable[Any]) -> None:
+        loop = asyncio.get_running_loop()
+        work: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        iterator = iter(items)
+
+        async def produce():
+            try:
+                while True:
+                    # The source may block on network paging; keep the loop free
+                    item = await loop.run_in_executor(None, next, iterator, _DONE)
+                    if item is _DONE:
+                        return
+                    await work.put(item)
+            finally:
+                for _ in range(self.max_concurrency):
+                    await work.put(_DONE)
+
+        async def consume():
+            while True:
+                item = await work.get()
+                if item is _DONE:
+                    return
+                if self.adaptive:
+                    await self.adaptive.acquire_async()
+                self._complete(await self._process_async(item))
+
+        await asyncio.gather(produce(), *(consume() for _ in range(self.max_concurrency)))
+
+    async def _process_async(self, item: Any) -> ItemResult:
+        loop = asyncio.get_running_loop()
+        result = ItemResult(item, uuid.uuid4().hex)
+        started = time.monotonic()
+        if not self._cached_output(result):
+            try:
+                result.output = await self.task_fn(**self._task_kwargs(item, result.trace_id))
+            except Exception as e:
+                result.error = str(e)
+                result.duration = time.monotonic() - started
+                return result
+            if self.output_cache:
+                self.output_cache.put(item, result.output)
+
+        kwargs = self._eval_kwargs(item, result.output)
+        calls = [
+            evaluator.acall(**kwargs) if hasattr(evaluator, "acall")
+            else evaluator(**kwargs) if is_async_callable(evaluator)
+            else loop.run_in_executor(self._eval_pool, _call_sync, evaluator, kwargs)
+            for evaluator in self.evaluators
+        ]
+        outcomes = await asyncio.gather(*calls, return_exceptions=True)
+        result.judges_cached = bool(outcomes) and all(from_judge_cache(o) for o in outcomes)
+        for evaluator, outcome in zip(self.evaluators, outcomes):
+            if isinstance(outcome, Exception):
+                self._record_evaluator_error(result, callable_name(evaluator), outcome)
+            else:
+                result.evaluations.extend(as_evaluations(outcome))
+        result.duration = time.monotonic() - started
+        return result
+
+
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
+
+
+def _call_sync(fn: Callable, kwargs: Dict[str, Any]) -> Any:
+    """Call an evaluator from a worker thread, driving it to completion if async."""
+    value = fn(**kwargs)
+    if inspect.isawaitable(value):
+        value = asyncio.run(_await(value))
+    return value
+
+
+# =============================================================================
+# PROCESS POOL
+# =============================================================================
+
+ITEM_FIELDS = ("id", "dataset_id", "input", "expected_output", "metadata")
+
+# Set once per worker process by _init_worker
+_worker_task: Optional[Callable] = None
+_worker_evaluators: List[Callable] = []
+
+
+class WorkerItem:
+    """Picklable stand-in for a dataset item inside worker processes."""
+
+    def __init__(self, fields: Dict[str, Any]):
+        for name in ITEM_FIELDS:
+            setattr(self, name, fields.get(name))
+
+
+def _init_worker(loader: Callable, loader_args: Tuple) -> None:
+    """Process initializer: import the task and evaluator scripts once."""
+    global _worker_task, _worker_evaluators
+    _worker_task, _worker_evaluators = loader(*loader_args)
+
+
+def _picklable(value: Any) -> Tuple[Any, bool]:
+    """Return (value, False) if it pickles, else (repr(value), True)."""
+    try:
+        pickle.dumps(value)
+        return value, False
+    except Exception:
+        return repr(value), True
+
+
+def _run_chunk(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Worker entry point: run the task and script evaluators on a chunk of items."""
+    names = [callable_name(e) for e in _worker_evaluators]
+    pass_trace_id = accepts_kwarg(_worker_task, "trace_id")
+    entries = []
+    for payload in payloads:
+        item = WorkerItem(payload["item"])
+        entry = {
+            "output": None,
+            "output_repr": False,
+            "cached": "cached_output" in payload,
+            "evaluations": [],
+            "error": None,
+            "evaluator_errors": {},
+            "evaluators": names,
+            "pid": os.getpid(),
+        }
+        started = time.monotonic()
+        try:
+            if entry["cached"]:
+                output = payload["cached_output"]
+            else:
+                kwargs = {"item": item, "trace_id": payload["trace_id"]} if pass_trace_id else {"item": item}
+                output = _call_sync(_worker_task, kwargs)
+        except Exception as e:
+            entry["error"] = str(e)
+        else:
+            eval_kwargs = ExperimentExecutor._eval_kwargs(item, output)
+            for evaluator in _worker_evaluators:
+                try:
+                    for evaluation in as_evaluations(_call_sync(evaluator, eval_kwargs)):
+                        entry["evaluations"].append({
+                            "name": str(evaluation["name"]),
+                            "value": _picklable(evaluation["value"])[0],
+                            "comment": None if evaluation.get("comment") is None else str(evaluation["comment"]),
+                        })
+                except Exception as e:
+                    entry["evaluator_errors"][callable_name(evaluator)] = str(e)
+            entry["output"], entry["output_repr"] = _picklable(output)
+        entry["duration"] = time.monotonic() - started
+        entries.append(entry)
+    return entries
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Tuple[Any, str]]]:
+    chunk: List[Tuple[Any, str]] = []
+    for item in items:
+        chunk.append((item, uuid.uuid4().hex))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ProcessExecutor(ExperimentExecutor):
+    """
+    Runs the task and script evaluators in `workers` processes.
+
+    `loader(*loader_args)` must return (task_fn, evaluators) and be importable
+    at module level; each worker calls it once at startup. Items are sent in
+    chunks of `chunk_size`. Outputs that cannot be pickled come back as
+    repr() strings. `parent_evaluators` (e.g. LLM judges, which are I/O bound
+    and need the Langfuse client) run in this process on each returned item.
+
+    A crashing worker breaks the whole pool. The pool is then rebuilt and
+    the items that were in flight are retried one at a time, so only the
+    item that kills a worker is marked failed.
+    """
+
+    def __init__(
+        self,
+        loader: Callable,
+        loader_args: Tuple,
+        workers: int,
+        parent_evaluators: Optional[List[Callable]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sink: Optional[ResultSink] = None,
+        on_result: Optional[Callable[[ItemResult], None]] = None,
+        progress: bool = True,
+        output_cache: Optional[Any] = None
+    ):
+        super().__init__(
+            task_fn=None,
+            evaluators=parent_evaluators,
+            max_concurrency=workers,
+            sink=sink,
+            on_result=on_result,
+            progress=progress,
+            output_cache=output_cache
+        )
+        self.mode = "process"
+        self.loader = loader
+        self.loader_args = loader_args
+        self.chunk_size = max(1, chunk_size)
+        self._worker_evaluator_names: List[str] = []
+
+    def evaluator_names(self) -> List[str]:
+        return self._worker_evaluator_names + super().evaluator_names()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_concurrency,
+            initializer=_init_worker,
+            initargs=(self.loader, self.loader_args)
+        )
+
+    def _payload(self, item: Any, trace_id: str) -> Dict[str, Any]:
+        payload = {"item": {name: getattr(item, name, None) for name in ITEM_FIELDS}, "trace_id": trace_id}
+        if self.output_cache:
+            hit, output = self.output_cache.get(item)
+            if hit:
+                payload["cached_output"] = output
+        return payload
+
+    def _submit(self, pool: ProcessPoolExecutor, chunk: List[Tuple[Any, str]]):
+        return pool.submit(_run_chunk, [self._payload(item, trace_id) for item, trace_id in chunk])
+
+    def _execute(self, items: Iterable[Any]) -> None:
+        # Bounds how many returned items may wait for parent-side evaluators
+        self._finishing = threading.BoundedSemaphore(self.max_concurrency * self.chunk_size * 2)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="finisher") as finisher:
+            self._finisher = finisher
+            pool = self._new_pool()
+            try:
+                # Fail fast if the scripts cannot be loaded in a worker
+                pool.submit(_ping).result()
+            except BrokenProcessPool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise RuntimeError("Worker processes failed to start; check that the task and evaluator scripts load")
+            in_flight: Dict[Any, List[Tuple[Any, str]]] = {}
+            try:
+                for chunk in _chunks(items, self.chunk_size):
+                    while len(in_flight) >= self.max_concurrency * 2:
+                        pool = self._drain(pool, in_flight)
+                    in_flight[self._submit(pool, chunk)] = chunk
+                while in_flight:
+                    pool = self._drain(pool, in_flight)
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def _drain(self, pool: ProcessPoolExecutor, in_flight: Dict[Any, List[Tuple[Any, str]]]) -> ProcessPoolExecutor:
+        """Collect at least one finished chunk; rebuild the pool if a worker died."""
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        crashed: List[Tuple[Any, str]] = []
+        for future in done:
+            self._collect(future, in_flight.pop(future), crashed)
+        if crashed:
+            # The other in-flight chunks went down with the pool
+            for future in list(in_flight):
+                wait([future])
+                self._collect(future, in_flight.pop(future), crashed)
+            pool = self._recover(pool, crashed)
+        return pool
+
+    def _collect(self, future, chunk: List[Tuple[Any, str]], crashed: List[Tuple[Any, str]]) -> None:
+        try:
+            entries = future.result()
+        except BrokenProcessPool:
+            crashed.extend(chunk)
+            return
+        except Exception as e:
+            for item, trace_id in chunk:
+                self._accept(item, trace_id, {"error": f"Worker error: {e}"})
+            return
+        for (item, trace_id), entry in zip(chunk, entries):
+            self._accept(item, trace_id, entry)
+
+    def _recover(self, pool: ProcessPoolExecutor, crashed: List[Tuple[Any, str]]) -> ProcessPoolExecutor:
+        pool.shutdown(wait=False, cancel_futures=True)
+        print(f"Warning: A worker process crashed; retrying {len(crashed)} items one at a time", file=sys.stderr)
+        pool = self._new_pool()
+        for item, trace_id in crashed:
+            future = self._submit(pool, [(item, trace_id)])
+            try:
+                entries = future.result()
+            except BrokenProcessPool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._accept(item, trace_id, {"error": "Worker process crashed"})
+                pool = self._new_pool()
+                continue
+            except Exception as e:
+                self._accept(item, trace_id, {"error": f"Worker error: {e}"})
+                continue
+            self._accept(item, trace_id, entries[0])
+        return pool
+
+    def _accept(self, item: Any, trace_id: str, entry: Dict[str, Any]) -> None:
+        if not self._worker_evaluator_names and entry.get("evaluators"):
+            self._worker_evaluator_names = list(entry["evaluators"])
+        result = ItemResult(item, trace_id)
+        result.output = entry.get("output")
+        result.error = entry.get("error")
+        result.evaluations = list(entry.get("evaluations", []))
+        result.duration = entry.get("duration", 0.0)
+        result.cached = bool(entry.get("cached"))
+        if self.output_cache and result.ok and not result.cached and not entry.get("output_repr"):
+            self.output_cache.put(item, result.output)
+        for name, error in entry.get("evaluator_errors", {}).items():
+            self._record_evaluator_error(result, name, error)
+        if entry.get("output_repr") and "output_repr" not in self._warned:
+            self._warned.add("output_repr")
+            print("Warning: Task output could not be pickled; recording its repr() instead", file=sys.stderr)
+
+        if result.ok and self.evaluators:
+            self._finishing.acquire()
+            self._finisher.submit(self._finish, result)
+        else:
+            self._complete(result)
+
+    def _finish(self, result: ItemResult) -> None:
+        try:
+            self._evaluate_sync(result, self.evaluators)
+            self._complete(result)
+        finally:
+            self._finishing.release()
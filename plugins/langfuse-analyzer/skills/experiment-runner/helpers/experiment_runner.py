@@ -13,28 +13,87 @@ USAGE:
     python experiment_runner.py run --dataset "my-tests" --run-name "v1" --task-script task.py --use-langfuse-judges
     python experiment_runner.py run --dataset "my-tests" --run-name "v1" --task-script task.py --judges judge-accuracy judge-helpfulness
 
+    # Continue an interrupted run where it stopped
+    python experiment_runner.py run --resume "v1"
+
     # Other commands
     python experiment_runner.py list-runs --dataset "my-tests"
     python experiment_runner.py get-run --dataset "my-tests" --run-name "v1"
     python experiment_runner.py compare --dataset "my-tests" --runs "v1" "v2"
     python experiment_runner.py analyze --dataset "my-tests" --run-name "v1" --show-failures
+    python experiment_runner.py judge-batch --run-name "v1" --wait
+    python experiment_runner.py cache --prune
 """
 
 import argparse
+import asyncio
 import importlib.util
+import itertools
 import json
-import re
+import random
 import sys
+import threading
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Callable
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Add parent directories to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
 from langfuse_client import get_langfuse_client
 import langfuse_rest_client
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "dataset-management" / "helpers"))
+from dataset_manager import (
+    DedupeIndex,
+    check_duplicate,
+    dataset_item_id,
+    item_version_hash,
+    load_snapshot_items,
+    manifest_version,
+    read_sample_ids,
+)
+from experiment_cache import (
+    JUDGE_CACHE_MAX_AGE_DAYS,
+    JUDGE_CACHE_MAX_ENTRIES,
+    JudgeResponseCache,
+    LiveDatasetIndex,
+    RunCache,
+    TaskOutputCache,
+    cache_summary,
+    clear_cache,
+    parse_cache_env,
+    trace_set_hash,
+)
+from llm_pool import configure_rate_limits, estimate_tokens, get_async_openai_client, get_openai_client, get_rate_limiter
+from experiment_executor import (
+    ADAPTIVE_MAX_CONCURRENCY,
+    DEFAULT_CHUNK_SIZE,
+    AdaptiveConcurrency,
+    ExperimentExecutor,
+    ItemResult,
+    ProcessExecutor,
+    ResultSink,
+    as_evaluations,
+    to_jsonable,
+)
+from judge_batch import DEFAULT_POLL_INTERVAL, JudgeBatch
+from run_checkpoint import RunCheckpoint
+from run_stats import CONFIDENCE, HAS_NUMPY, SequentialComparison, compare_item_scores
+from judge_template import (
+    JudgeTemplate,
+    message_text,
+    parse_json_response,
+    parse_judge_response,
+    template_values,
+)
+
 CANONICAL_SCORE_SCALE = "0-1"
+ANALYZE_MAX_ITEMS = 20
+EARLY_STOP_MIN_PAIRS = 20
+EARLY_STOP_ALPHA = 0.05
+LIVE_DATASET_WORKERS = 8
+LIVE_TRACE_FIELDS = "core,io"
+LIVE_TRACE_KEYS = ("id", "input", "output")
 
 
 def normalize_score(value: Any) -> float:
@@ -59,681 +118,487 @@ def normalize_score(value: Any) -> float:
     return 1.0
 
 
-def format_score_dual(normalized_value: float) -> str:
-    """Format score as '0.85 (8.5/10)'."""
-    return f"{normalized_value:.3f} ({normalized_value * 10:.1f}/10)"
-
-
-class Evaluation:
-    """Value object for an evaluation result."""
-    def __init__(self, name: str, value: float, comment: Optional[str] = None):
-        self.name = name
-        self.value = value
-        self.comment = comment
-
-
-def create_langfuse_judge_evaluator(prompt_name: str, client) -> Callable:
-    """
-    Create an evaluator function from a Langfuse prompt.
-    The prompt is expected to have {{input}}, {{output}}, and optional {{expected_output}} variables.
-    It should return JSON with "score" and "reasoning".
-    """
-    def evaluator(*, output, expected_output=None, **kwargs) -> Evaluation:
-        # Get the compiled prompt
-        # We need the 'production' version or latest
-        try:
-            prompt = client.get_prompt(prompt_name)
-        except Exception:
-            # Fallback for old SDK or missing prompt
-            try:
-                prompt = client.get_prompt(prompt_name, label="production")
-            except Exception as e:
-                return Evaluation(name=prompt_name, value=0.0, comment=f"Prompt not found: {e}")
-
-        # Extract config
-        config = prompt.config if hasattr(prompt, 'config') else {}
-        model = config.get("model", "gpt-4o")
-        temperature = config.get("temperature", 0)
-        max_tokens = config.get("max_tokens", 256) # Increased for reasoning
-
-        # Compile prompt
-        # Map kwargs to variables expected by prompt
-        # Standard variables: input, output, expected_output
-        compile_kwargs = {
-            "output": output,
-            "expected_output": expected_output or ""
-        }
-        # Add input from kwargs if present (usually passed as 'input' or inside 'item')
-        if "input" in kwargs:
-            compile_kwargs["input"] = kwargs["input"]
-        elif "item" in kwargs and hasattr(kwargs["item"], "input"):
-             compile_kwargs["input"] = kwargs["item"].input
-        elif "item" in kwargs and isinstance(kwargs["item"], dict):
-             compile_kwargs["input"] = kwargs["item"].get("input", "")
-
-        try:
-            filled_prompt = prompt.compile(**compile_kwargs)
-        except Exception as e:
-            return Evaluation(name=prompt_name, value=0.0, comment=f"Prompt compilation failed: {e}")
-
-        # Execute LLM call
-        # We use the client's openai adapter or just direct openai call if available?
-        # Langfuse client doesn't expose generic chat completion easily, but we can usage the one from the prompt if using new SDK,
-        # or we might need a separate OpenAI client.
-        # For simplicity/robustness in this plugin, we assume OPENAI_API_KEY is set and use standard client.
-        
-        # Checking if we can use the langfuse prompt's chat methods (newer SDK)
-        # If not, fall back to OpenAI
-        
-        # We'll use a standard OpenAI client approach for now, assuming env var is present.
-        import os
-        from openai import OpenAI
-        
-        if not os.getenv("OPENAI_API_KEY"):
-             return Evaluation(name=prompt_name, value=0.0, comment="OPENAI_API_KEY not set")
-
-        openai_client = OpenAI()
-        
-        # Score name derived from prompt name (dataset.judge-accuracy -> accuracy)
-        score_name = prompt_name.split("-")[-1] if "-" in prompt_name else "score"
-
-        # Handle potential {{expected_output}} logic in prompt text if compiler didn't handle it (some older SDKs)
-        # But compile() should handle it.
-        
-        # Ensure we don't have None values in prompt
-        # (Already handled by compile_kwargs defaults)
-        
-        try:
-            messages = [
-                {"role": "system", "content": "You are an evaluation judge. Follow the instructions exactly."},
-                {"role": "user", "content": filled_prompt}
-            ]
-            
-            # If the prompt itself is a list of messages (chat prompt), use that
-            # The SDK compile returns a string for text prompts, but for chat prompts?
-            # Assuming text prompt for now as per `ensure_judge_prompts`.
-            
-            response = openai_client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-
-            result_text = response.choices[0].message.content.strip()
-
-            # Try to parse JSON response
-            try:
-                # Find JSON in response
-                json_match = re.search(r'\{[^}]+\}', result_text)
-                if json_match:
-                    result = json.loads(json_match.group())
-                    raw_score = result.get("score", 0)
-                    score = normalize_score(raw_score)
-                    reasoning = result.get("reasoning", "")
-                    comment = f"raw_score={raw_score}; normalized={score:.3f}; {reasoning}".strip("; ")
-                    return Evaluation(name=score_name, value=score, comment=comment)
-            except (json.JSONDecodeError, ValueError):
-                pass
-
-            # Fallback: try to extract just a number
-            numbers = re.findall(r'\b(\d+(?:\.\d+)?)\b', result_text)
-            if numbers:
-                raw_score = float(numbers[0])
-                score = normalize_score(raw_score)
-                return Evaluation(
-                    name=score_name,
-                    value=score,
-                    comment=f"raw_score={raw_score}; normalized={score:.3f}; {result_text[:100]}"
-                )
-
-            # If all parsing fails, return 0
-            return Evaluation(name=score_name, value=0.0, comment=f"Failed to parse: {result_text[:100]}")
+class RunningStats:
+    """Mean, variance, min and max of a stream of values (Welford's algorithm), in constant memory."""
 
-        except Exception as e:
-            return Evaluation(name=score_name, value=0.0, comment=f"Error: {str(e)[:100]}")
+    __slots__ = ("count", "mean", "_m2", "min", "max")
 
-    # Set a meaningful name for the function
-    evaluator.__name__ = f"judge_{prompt_name.split('-')[-1]}"
-    evaluator.__doc__ = f"Evaluator generated from Langfuse prompt: {prompt_name}"
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
 
-    return evaluator
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
 
+    @property
+    def std(self) -> float:
+        return (self._m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
 
-def load_langfuse_judges(
-    client,
-    judge_names: Optional[List[str]] = None,
-    dataset_name: Optional[str] = None
-) -> List[Callable]:
-    """
-    Load judge evaluators from Langfuse prompts.
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mean": self.mean, "min": self.min, "max": self.max, "count": self.count, "std": self.std}
 
-    If judge_names is provided, load those specific judges.
-    If dataset_name is provided, try to get judge names from dataset metadata.
-    Otherwise, auto-discover prompts starting with "judge-".
-    """
-    evaluators = []
 
-    # Option 1: Explicit judge names provided
-    if judge_names:
-        for name in judge_names:
-            try:
-                evaluator = create_langfuse_judge_evaluator(name, client)
-                evaluators.append(evaluator)
-                print(f"Loaded judge: {name}", file=sys.stderr)
-            except Exception as e:
-                print(f"Warning: Failed to load judge '{name}': {e}", file=sys.stderr)
-        return evaluators
-
-    # Option 2: Get from dataset metadata
-    if dataset_name:
-        try:
-            dataset = client.get_dataset(dataset_name)
-            if dataset and hasattr(dataset, 'metadata') and dataset.metadata:
-                metadata = dataset.metadata
-                if 'judge_prompts' in metadata:
-                    for name in metadata['judge_prompts']:
-                        try:
-                            evaluator = create_langfuse_judge_evaluator(name, client)
-                            evaluators.append(evaluator)
-                            print(f"Loaded judge from dataset metadata: {name}", file=sys.stderr)
-                        except Exception as e:
-                            print(f"Warning: Failed to load judge '{name}': {e}", file=sys.stderr)
-                    if evaluators:
-                        return evaluators
-        except Exception as e:
-            print(f"Warning: Could not read dataset metadata: {e}", file=sys.stderr)
+class ScoreAggregator:
+    """RunningStats per score name, updated as each item's scores arrive."""
 
-    # Option 3: Auto-discover judge prompts
-    # List all prompts and find ones starting with "judge-"
-    try:
-        prompts = client.get_prompts()
-        if prompts:
-            for prompt in prompts:
-                name = prompt.name if hasattr(prompt, 'name') else str(prompt)
-                if name.startswith("judge-"):
-                    try:
-                        evaluator = create_langfuse_judge_evaluator(name, client)
-                        evaluators.append(evaluator)
-                        print(f"Auto-discovered judge: {name}", file=sys.stderr)
-                    except Exception as e:
-                        print(f"Warning: Failed to load judge '{name}': {e}", file=sys.stderr)
-    except Exception as e:
-        print(f"Warning: Could not auto-discover judges: {e}", file=sys.stderr)
+    def __init__(self):
+        self.scores: Dict[str, RunningStats] = {}
 
-    if not evaluators:
-        print("Warning: No Langfuse judges found. Create prompts starting with 'judge-'.", file=sys.stderr)
+    def add(self, name: str, value: Any) -> None:
+        """Record a score; non-numeric values are ignored."""
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return
+        stats = self.scores.get(name)
+        if stats is None:
+            stats = self.scores[name] = RunningStats()
+        stats.add(normalize_score(value))
 
-    return evaluators
+    def averages(self) -> Dict[str, float]:
+        return {name: stats.mean for name, stats in self.scores.items() if stats.count}
 
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in self.scores.items() if stats.count}
 
-def load_module_from_path(script_path: str, module_name: str):
-    """Load a Python module from a file path."""
-    path = Path(script_path).resolve()
-    if not path.exists():
-        raise FileNotFoundError(f"Script not found: {script_path}")
 
-    spec = importlib.util.spec_from_file_location(module_name, path)
-    if spec is None or spec.loader is None:
-        raise ImportError(f"Cannot load module from: {script_path}")
+def format_score_dual(value: float) -> str:
+    """Format score with canonical and human-readable equivalents."""
+    return f"{value:.3f} ({value * 10:.1f}/10)"
 
-    module = importlib.util.module_from_spec(spec)
-    sys.modules[module_name] = module
-    spec.loader.exec_module(module)
-    return module
 
+class Evaluation:
+    """Value object for an evaluation result."""
+    def __init__(self, name: str, value: float, comment: Optional[str] = None):
+        self.name = name
+        self.value = value
+        self.comment = comment
 
-def load_task(task_script_path: str) -> Callable:
-    """Load task function from a script file.
 
-    The script must define a `task` function with signature:
-        def task(*, item, **kwargs) -> Any
+class LangfuseJudge:
     """
-    module = load_module_from_path(task_script_path, "task_module")
-
-    if not hasattr(module, "task"):
-        raise AttributeError(f"Script must define a 'task' function: {task_script_path}")
-
-    return module.task
-
-
-def load_evaluators(evaluator_script_path: str) -> List[Callable]:
-    """Load evaluator functions from a script file.
-
-    The script must define EVALUATORS list or individual evaluator functions.
-    Each evaluator function should have signature:
-        def evaluator(*, output, expected_output, **kwargs) -> Evaluation
+    LLM-as-judge evaluator built from a Langfuse prompt.
+
+    Calling the judge fills the template, gets a response (from judge_cache
+    or the pooled OpenAI client, through the shared rate limiter) and parses
+    it into an Evaluation. `acall` is the async equivalent; the executor uses
+    it in async mode so all judges for an item run concurrently on the loop.
+    Evaluations answered from judge_cache are marked `cached = True`, so
+    adaptive concurrency does not take them for fast model calls.
     """
-    module = load_module_from_path(evaluator_script_path, "evaluator_module")
-
-    # Check for EVALUATORS list first
-    if hasattr(module, "EVALUATORS"):
-        evaluators = module.EVALUATORS
-        if isinstance(evaluators, list):
-            return evaluators
 
-    # Fall back to finding all functions that look like evaluators
-    evaluators = []
-    for name in dir(module):
-        if name.startswith("_"):
-            continue
-        obj = getattr(module, name)
-        if callable(obj) and name not in ("task", "load_module_from_path"):
-            evaluators.append(obj)
+    SYSTEM_PROMPT = "You are an evaluation judge. Follow the instructions exactly."
+
+    def __init__(
+        self,
+        prompt_name: str,
+        template: str,
+        version: Any = None,
+        config: Optional[Dict[str, Any]] = None,
+        judge_cache: Optional[JudgeResponseCache] = None
+    ):
+        config = config or {}
+        self.prompt_name = prompt_name
+        self.template = template
+        self.compiled = JudgeTemplate(template)
+        self.version = version
+        self.model = config.get("model", "gpt-4o")
+        self.temperature = config.get("temperature", 0)
+        self.max_tokens = config.get("max_tokens", 150)
+        self.judge_cache = judge_cache
+        # Extract score name from prompt name (e.g., "judge-accuracy" -> "accuracy")
+        self.score_name = prompt_name.replace("judge-", "").replace("_", "-")
+        # Set a meaningful name for the evaluator
+        self.__name__ = f"judge_{self.score_name}"
+        self.__doc__ = f"Evaluator generated from Langfuse prompt: {prompt_name}"
+
+    def fill(self, input: Any, output: Any, expected_output: Any = None) -> str:
+        return self.compiled.render(template_values(input, output, expected_output))
+
+    def request(self, filled_prompt: str) -> Dict[str, Any]:
+        """Chat completion parameters for a filled prompt."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": filled_prompt}
+            ],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
 
-    if not evaluators:
-        raise AttributeError(
-            f"Script must define EVALUATORS list or evaluator functions: {evaluator_script_path}"
+    def cached_response(self, filled_prompt: str) -> tuple:
+        """(cache key, cached response text or None)."""
+        if not self.judge_cache:
+            return None, None
+        key = self.judge_cache.key(
+            self.prompt_name, self.version, self.model, self.temperature, self.max_tokens, filled_prompt
         )
+        return key, self.judge_cache.get(key)
+
+    def store_response(self, key: Optional[str], result_text: str) -> None:
+        if self.judge_cache and key:
+            self.judge_cache.put(key, result_text, self.prompt_name, self.version, self.model)
+
+    def complete(self, filled_prompt: str) -> tuple:
+        """(response text, whether it came from judge_cache)."""
+        key, result_text = self.cached_response(filled_prompt)
+        if result_text is not None:
+            return result_text, True
+        limiter = get_rate_limiter()
+        estimated = estimate_tokens(self.SYSTEM_PROMPT + filled_prompt, self.max_tokens)
+        limiter.acquire(estimated)
+        response = get_openai_client().chat.completions.create(**self.request(filled_prompt))
+        limiter.settle(estimated, getattr(getattr(response, "usage", None), "total_tokens", None))
+        result_text = message_text(response.choices[0].message)
+        self.store_response(key, result_text)
+        return result_text, False
+
+    async def acomplete(self, filled_prompt: str) -> tuple:
+        key, result_text = self.cached_response(filled_prompt)
+        if result_text is not None:
+            return result_text, True
+        limiter = get_rate_limiter()
+        estimated = estimate_tokens(self.SYSTEM_PROMPT + filled_prompt, self.max_tokens)
+        await limiter.acquire_async(estimated)
+        response = await get_async_openai_client().chat.completions.create(**self.request(filled_prompt))
+        limiter.settle(estimated, getattr(getattr(response, "usage", None), "total_tokens", None))
+        result_text = message_text(response.choices[0].message)
+        self.store_response(key, result_text)
+        return result_text, False
+
+    @staticmethod
+    def mark_cached(evaluations: Any, cached: bool) -> Any:
+        for evaluation in evaluations if isinstance(evaluations, list) else [evaluations]:
+            evaluation.cached = cached
+        return evaluations
+
+    def parse(self, result_text: str) -> "Evaluation":
+        """Turn a judge response into an Evaluation on the canonical 0-1 scale."""
+        from langfuse import Evaluation
 
-    return evaluators
-
-
-def prepare_live_dataset(client, run_name: str, limit: int, agent_name: Optional[str] = None) -> str:
-    """Fetch recent traces and create an ephemeral dataset for the experiment."""
-    # 1. Fetch recent traces
-    # We use a loose filter (just last N) or filter by agent if possible (via tags/metadata?)
-    # For now, simplest approach: last N traces globally or simplistic filter
-    
-    # Try to fetch traces
-    try:
-        # We can try to use tags if agent_name provided, but for now we just get global last N
-        # assuming the workspace is relevant.
-        traces = client.api.trace.list(limit=limit)
-        if not traces.data:
-            raise ValueError("No live traces found to bootstrap experiment")
-    except Exception as e:
-        raise ValueError(f"Failed to fetch live traces: {e}")
+        parsed = parse_judge_response(result_text)
+        if parsed is None:
+            return Evaluation(name=self.score_name, value=0.0, comment=f"Failed to parse: {result_text[:100]}")
+        raw_score, reasoning = parsed
+        score = normalize_score(raw_score)
+        comment = f"raw_score={raw_score}; normalized={score:.3f}; {reasoning}".strip("; ")
+        return Evaluation(name=self.score_name, value=score, comment=comment)
 
-    # 2. Create Dataset
-    dataset_name = f"live-{run_name}"
-    try:
-        client.create_dataset(name=dataset_name, description=f"Ephemeral dataset from live traces for run {run_name}")
-    except Exception:
-        # Ignore if exists (might retry run)
-        pass
-
-    # 3. Populate Dataset
-    mapped_count = 0
-    for trace in traces.data:
-        t_dict = trace.dict() if hasattr(trace, 'dict') else dict(trace)
-        
-        # Heuristic: use trace input/output
-        # input might be string or dict.
-        existing_input = t_dict.get("input")
-        existing_output = t_dict.get("output")
-        
-        if existing_input is None:
-            continue
+    def _error(self, error: Exception) -> "Evaluation":
+        from langfuse import Evaluation
+        return Evaluation(name=self.score_name, value=0.0, comment=f"Error: {str(error)[:100]}")
 
+    def __call__(self, *, input, output, expected_output=None, **kwargs) -> "Evaluation":
         try:
-            client.create_dataset_item(
-                dataset_name=dataset_name,
-                input=existing_input,
-                expected_output=existing_output, # Optional: treat past output as expected? Or just reference?
-                metadata={
-                    "source_trace_id": t_dict.get("id"),
-                    "source": "live-capture"
-                }
-            )
-            mapped_count += 1
-        except Exception:
-            pass
-            
-    if mapped_count == 0:
-        raise ValueError("Could not map any traces to dataset items (missing inputs?)")
-        
-    return dataset_name
-
+            result_text, cached = self.complete(self.fill(input, output, expected_output))
+            return self.mark_cached(self.parse(result_text), cached)
+        except Exception as e:
+            return self._error(e)
 
-def run_experiment(
-    dataset_name: str,
-    run_name: str,
-    task_script: str,
-    evaluator_script: Optional[str] = None,
-    use_langfuse_judges: bool = False,
-    judge_names: Optional[List[str]] = None,
-    max_concurrency: int = 5,
-    run_description: Optional[str] = None,
-    metadata: Optional[Dict[str, Any]] = None,
-    # New args for live mode
-    source_type: str = "dataset",
-    sample_size: int = 10,
-    agent_name: Optional[str] = None,
-) -> Dict[str, Any]:
-    """Run an experiment on a dataset with custom task and evaluators.
+    async def acall(self, *, input, output, expected_output=None, **kwargs) -> "Evaluation":
+        try:
+            result_text, cached = await self.acomplete(self.fill(input, output, expected_output))
+            return self.mark_cached(self.parse(result_text), cached)
+        except Exception as e:
+            return self._error(e)
 
-    Evaluators can come from:
-    1. Local script file (--evaluator-script)
-    2. Langfuse prompts (--use-langfuse-judges or --judges)
 
-    Langfuse judges are prompts named 'judge-*' that define LLM-as-judge evaluation.
+class CombinedJudge(LangfuseJudge):
     """
-    client = get_langfuse_client()
-
-    try:
-        # Handle Live Mode
-        if source_type == "live":
-            print(f"Fetching last {sample_size} traces for live dataset...", file=sys.stderr)
-            dataset_name = prepare_live_dataset(client, run_name, sample_size, agent_name)
-            print(f"Created ephemeral dataset: {dataset_name}", file=sys.stderr)
-        # Load task function
-        task_fn = load_task(task_script)
-
-        # Load evaluators
-        evaluators = []
-
-        # Option 1: Load from local script
-        if evaluator_script:
-            evaluators = load_evaluators(evaluator_script)
-            print(f"Loaded {len(evaluators)} evaluators from script", file=sys.stderr)
-
-        # Option 2: Load from Langfuse judge prompts
-        if use_langfuse_judges or judge_names:
-            langfuse_evaluators = load_langfuse_judges(
-                client,
-                judge_names=judge_names,
-                dataset_name=dataset_name
-            )
-            evaluators.extend(langfuse_evaluators)
-            print(f"Loaded {len(langfuse_evaluators)} Langfuse judges", file=sys.stderr)
+    Several judges that share a model, scored in one structured-output call.
 
-        # Get dataset
-        dataset = client.get_dataset(dataset_name)
-        if not dataset:
-            print(f"Dataset '{dataset_name}' not found", file=sys.stderr)
-            return {"status": "error", "message": f"Dataset not found: {dataset_name}"}
+    The input, output and expected output are sent once; each judge's
+    template follows as a dimension section that refers back to them. The
+    model answers with one JSON object keyed by score name. Any dimension
+    that is missing or unparseable, or all of them if the call fails, falls
+    back to that judge's own call.
+    """
 
-        # Prepare run metadata
-        run_metadata = metadata or {}
-        run_metadata["task_script"] = task_script
-        if evaluator_script:
-            run_metadata["evaluator_script"] = evaluator_script
-        run_metadata["max_concurrency"] = max_concurrency
-
-        # Run experiment using Langfuse SDK
-        results = dataset.run_experiment(
-            name=run_name,
-            run_description=run_description,
-            run_metadata=run_metadata,
-            experiment_task=task_fn,
-            evaluators=evaluators if evaluators else None,
-            max_concurrency=max_concurrency
+    def __init__(self, judges: List[LangfuseJudge], judge_cache: Optional[JudgeResponseCache] = None):
+        first = judges[0]
+        super().__init__(
+            "combined:" + "+".join(j.prompt_name for j in judges),
+            "",
+            version=[j.version for j in judges],
+            config={
+                "model": first.model,
+                "temperature": first.temperature,
+                "max_tokens": sum(j.max_tokens for j in judges),
+            },
+            judge_cache=judge_cache
         )
-
-        # Collect summary statistics
-        total_items = 0
-        successful = 0
-        failed = 0
-        scores = {}
-
-        for item_result in results:
-            total_items += 1
-            if hasattr(item_result, 'error') and item_result.error:
-                failed += 1
-            else:
-                successful += 1
-
-            # Aggregate scores
-            if hasattr(item_result, 'scores') and item_result.scores:
-                for score in item_result.scores:
-                    name = score.name if hasattr(score, 'name') else str(score)
-                    value = score.value if hasattr(score, 'value') else score
-                    if name not in scores:
-                        scores[name] = []
-                    if isinstance(value, (int, float)):
-                        scores[name].append(normalize_score(value))
-
-        # Calculate averages
-        score_averages = {}
-        for name, values in scores.items():
-            if values:
-                score_averages[name] = sum(values) / len(values)
-
-        return {
-            "status": "completed",
-            "dataset": dataset_name,
-            "run_name": run_name,
-            "total_items": total_items,
-            "successful": successful,
-            "failed": failed,
-            "score_averages": score_averages,
-            "evaluators_used": [e.__name__ for e in evaluators] if evaluators else [],
-            "score_scale": CANONICAL_SCORE_SCALE,
-            "score_scale_note": "Canonical 0-1 scale. 0-10 values are normalized before aggregation.",
+        self.judges = judges
+        self.__name__ = f"judges_combined[{','.join(j.score_name for j in judges)}]"
+        self.__doc__ = f"Combined evaluator for: {', '.join(j.prompt_name for j in judges)}"
+        self.fallbacks = 0
+        self._fallback_lock = threading.Lock()
+        # Everything but the item itself is fixed, so build it once
+        references = {
+            "input": "the INPUT above",
+            "output": "the OUTPUT above",
+            "expected_output": "the EXPECTED OUTPUT above",
         }
+        keys = ", ".join(f'"{j.score_name}": {{"score": <number>, "reasoning": "<explanation>"}}' for j in judges)
+        self._preamble = (
+            f"Score the OUTPUT below on {len(judges)} independent dimensions. "
+            "Apply each dimension's instructions on their own; do not let one dimension influence another."
+        )
+        self._dimensions = "\n\n".join(
+            [f"## Dimension: {j.score_name}\n{j.compiled.render(references)}" for j in judges]
+            + [f"Respond with a single JSON object with exactly these keys: {{{keys}}}"]
+        )
 
-    except FileNotFoundError as e:
-        print(f"Error: {e}", file=sys.stderr)
-        return {"status": "error", "message": str(e)}
-    except Exception as e:
-        print(f"Error running experiment: {e}", file=sys.stderr)
-        return {"status": "error", "message": str(e)}
-
-
-def list_runs(dataset_name: str) -> List[Dict[str, Any]]:
-    """List all experiment runs for a dataset using REST API."""
-    try:
-        raw_runs = langfuse_rest_client.get_dataset_runs(dataset_name)
-        runs = []
-        for r in raw_runs:
-             runs.append({
-                 "name": r.get("name"),
-                 "created_at": r.get("createdAt"), # API uses camelCase
-                 "description": r.get("description"),
-                 "metadata": r.get("metadata", {})
-             })
-        return runs
-    except Exception as e:
-        print(f"Error listing runs: {e}", file=sys.stderr)
-        return []
-
-
-def get_run(dataset_name: str, run_name: str) -> Optional[Dict[str, Any]]:
-    """Get details of a specific experiment run using REST API."""
-    try:
-        # 1. Get run metadata from list
-        runs = langfuse_rest_client.get_dataset_runs(dataset_name)
-        run_info = next((r for r in runs if r.get("name") == run_name), None)
-        
-        if not run_info:
-            print(f"Run '{run_name}' not found in dataset '{dataset_name}'", file=sys.stderr)
-            return None
-
-        # 2. Get dataset ID for item fetch
-        dataset = langfuse_rest_client.get_dataset_by_name(dataset_name)
-        if not dataset:
-            print(f"Dataset '{dataset_name}' not found", file=sys.stderr)
-            return None
-        dataset_id = dataset.get("id")
-
-        # 3. Get items
-        raw_items = langfuse_rest_client.get_dataset_run_items(dataset_id, run_name)
-        
-        items = []
-        scores_summary = {}
+    def fill(self, input: Any, output: Any, expected_output: Any = None) -> str:
+        values = template_values(input, output, expected_output)
+        return "\n\n".join([
+            self._preamble,
+            f"## INPUT\n{values['input']}",
+            f"## OUTPUT\n{values['output']}",
+            f"## EXPECTED OUTPUT\n{values['expected_output']}",
+            self._dimensions,
+        ])
+
+    def request(self, filled_prompt: str) -> Dict[str, Any]:
+        params = super().request(filled_prompt)
+        params["response_format"] = {"type": "json_object"}
+        return params
+
+    def split(self, result_text: str) -> tuple:
+        """Per-dimension Evaluations from a combined response, plus the judges that need a fallback."""
+        from langfuse import Evaluation
 
-        for item in raw_items:
-            # Map camelCase from API to snake_case for internal use
-            item_dict = {
-                "id": item.get("id"),
-                "input": item.get("input"),
-                "output": item.get("output"),
-                "expected_output": item.get("expectedOutput"),
-            }
+        parsed = parse_json_response(result_text) or {}
+        evaluations, missing = [], []
+        for judge in self.judges:
+            entry = parsed.get(judge.score_name, parsed.get(judge.prompt_name))
+            raw_score = entry.get("score") if isinstance(entry, dict) else entry
+            if isinstance(raw_score, bool) or not isinstance(raw_score, (int, float, str)):
+                missing.append(judge)
+                continue
+            try:
+                score = normalize_score(float(raw_score))
+            except ValueError:
+                missing.append(judge)
+                continue
+            reasoning = entry.get("reasoning", "") if isinstance(entry, dict) else ""
+            comment = f"raw_score={raw_score}; normalized={score:.3f}; {reasoning}".strip("; ")
+            evaluations.append(Evaluation(name=judge.score_name, value=score, comment=comment))
+        return evaluations, missing
+
+    def _note_fallbacks(self, count: int) -> None:
+        if count:
+            with self._fallback_lock:
+                self.fallbacks += count
+
+    def __call__(self, *, input, output, expected_output=None, **kwargs) -> List["Evaluation"]:
+        try:
+            result_text, cached = self.complete(self.fill(input, output, expected_output))
+            evaluations, missing = self.split(result_text)
+            self.mark_cached(evaluations, cached)
+        except Exception:
+            evaluations, missing = [], list(self.judges)
+        self._note_fallbacks(len(missing))
+        for judge in missing:
+            evaluations.append(judge(input=input, output=output, expected_output=expected_output))
+        return evaluations
 
-            # Process scores
-            if item.get("scores"):
-                item_dict["scores"] = {}
-                for score in item.get("scores", []):
-                    # Score keys in API: name, value, ...
-                    name = score.get("name", "score")
-                    raw_value = score.get("value")
-                    value = normalize_score(raw_value) if isinstance(raw_value, (int, float)) else raw_value
-                    item_dict["scores"][name] = value
-
-                    if name not in scores_summary:
-                        scores_summary[name] = []
-                    if isinstance(value, (int, float)):
-                        scores_summary[name].append(value)
+    async def acall(self, *, input, output, expected_output=None, **kwargs) -> List["Evaluation"]:
+        try:
+            result_text, cached = await self.acomplete(self.fill(input, output, expected_output))
+            evaluations, missing = self.split(result_text)
+            self.mark_cached(evaluations, cached)
+        except Exception:
+            evaluations, missing = [], list(self.judges)
+        self._note_fallbacks(len(missing))
+        fallback = await asyncio.gather(*(
+            judge.acall(input=input, output=output, expected_output=expected_output) for judge in missing
+        ))
+        return evaluations + list(fallback)
+
+
+def combine_judges(evaluators: List[Callable], judge_cache: Optional[JudgeResponseCache] = None) -> List[Callable]:
+    """Merge Langfuse judges that share model and temperature into CombinedJudges; others pass through."""
+    groups: Dict[tuple, List[LangfuseJudge]] = {}
+    combined: List[Callable] = []
+    for evaluator in evaluators:
+        if type(evaluator) is LangfuseJudge:
+            groups.setdefault((evaluator.model, evaluator.temperature), []).append(evaluator)
+        else:
+            combined.append(evaluator)
+    for judges in groups.values():
+        combined.append(CombinedJudge(judges, judge_cache) if len(judges) > 1 else judges[0])
+    return combined
 
-            items.append(item_dict)
 
-        # Calculate score statistics
-        score_stats = {}
-        for name, values in scores_summary.items():
-            if values:
-                score_stats[name] = {
-                    "mean": sum(values) / len(values),
-                    "min": min(values),
-                    "max": max(values),
-                    "count": len(values)
-                }
+def judge_evaluations(judge: LangfuseJudge, result_text: str) -> tuple:
+    """(Evaluations, number of unparsed dimensions) for a judge response."""
+    if isinstance(judge, CombinedJudge):
+        evaluations, missing = judge.split(result_text)
+        return evaluations, len(missing)
+    return [judge.parse(result_text)], 0
 
-        return {
-            "name": run_name,
-            "dataset": dataset_name,
-            "created_at": run_info.get("createdAt"),
-            "description": run_info.get("description"),
-            "metadata": run_info.get("metadata", {}),
-            "item_count": len(items),
-            "score_stats": score_stats,
-            "items": items
-        }
 
-    except Exception as e:
-        print(f"Error getting run: {e}", file=sys.stderr)
-        return None
+def judge_descriptor(judge: LangfuseJudge) -> Dict[str, Any]:
+    """What a batch needs to parse this judge's responses later."""
+    descriptor = {"prompt_name": judge.prompt_name, "version": judge.version, "model": judge.model}
+    if isinstance(judge, CombinedJudge):
+        descriptor["members"] = [j.prompt_name for j in judge.judges]
+    return descriptor
 
-def format_score_dual(value: float) -> str:
-    """Format score with canonical and human-readable equivalents."""
-    return f"{value:.3f} ({value * 10:.1f}/10)"
 
-CANONICAL_SCORE_SCALE = "0-1"
+def judge_from_descriptor(descriptor: Dict[str, Any]) -> LangfuseJudge:
+    """Rebuild a judge for parsing only (the template is not needed after submission)."""
+    config = {"model": descriptor.get("model")}
+    if descriptor.get("members"):
+        return CombinedJudge([LangfuseJudge(name, "", config=config) for name in descriptor["members"]])
+    return LangfuseJudge(descriptor["prompt_name"], "", version=descriptor.get("version"), config=config)
 
 
-def normalize_score(value: Any) -> float:
+def queue_batch_judging(batch: JudgeBatch, judges: List[LangfuseJudge], item_result: ItemResult) -> List[Any]:
     """
-    Normalize raw score values to canonical 0-1 scale.
-
-    Accepted inputs:
-    - 0-1 (already normalized)
-    - 0-10 (converted to 0-1)
+    Queue an item's judge requests on the batch; judges with a cached
+    response are parsed right away and their Evaluations returned.
     """
-    try:
-        v = float(value)
-    except (TypeError, ValueError):
-        return 0.0
+    item = item_result.item
+    evaluations = []
+    for judge in judges:
+        filled_prompt = judge.fill(item.input, item_result.output, item.expected_output)
+        key, cached = judge.cached_response(filled_prompt)
+        if cached is not None:
+            evaluations.extend(judge_evaluations(judge, cached)[0])
+        else:
+            batch.add(item_result.trace_id, judge.__name__, judge.request(filled_prompt), {"cache_key": key})
+    return evaluations
 
-    if v < 0:
-        return 0.0
-    if v <= 1.0:
-        return v
-    if v <= 10.0:
-        return v / 10.0
-    return 1.0
 
+def apply_judge_batch(
+    batch: JudgeBatch,
+    judges: Dict[str, LangfuseJudge],
+    judge_cache: Optional[JudgeResponseCache] = None,
+    scores: Optional[ScoreAggregator] = None
+) -> Dict[str, Any]:
+    """
+    Parse finished batch responses and write them to the run's traces as
+    scores in bulk. Score IDs derive from the request, so applying a batch
+    twice updates rather than duplicates. Requests that got no result count
+    as failed; if a job ended failed, expired or cancelled the status is
+    "partial" and the incomplete jobs are listed.
+    """
+    openai_client = get_openai_client()
+    sink = ResultSink(batch.run_name)
+    summary = {"scored": 0, "failed": 0, "unparsed_dimensions": 0}
+    errors: Dict[str, int] = {}
+    for info, result_text, error in batch.results(openai_client):
+        judge = judges.get(info["judge"])
+        if result_text is None or judge is None:
+            summary["failed"] += 1
+            errors[error or "Unknown judge"] = errors.get(error or "Unknown judge", 0) + 1
+            continue
+        if judge_cache and info.get("cache_key"):
+            judge_cache.put(info["cache_key"], result_text, judge.prompt_name, judge.version, judge.model)
+        evaluations, unparsed = judge_evaluations(judge, result_text)
+        summary["unparsed_dimensions"] += unparsed
+        evaluations = as_evaluations(evaluations)
+        sink.add_scores(info["trace_id"], evaluations, id_seed=info["custom_id"])
+        summary["scored"] += 1
+        if scores is not None:
+            for evaluation in evaluations:
+                scores.add(evaluation["name"], evaluation["value"])
+    summary.update(sink.close())
+    if errors:
+        summary["errors"] = errors
+    if batch.state.get("dataset"):
+        RunCache().invalidate(batch.state["dataset"], batch.run_name)
+    incomplete = batch.incomplete_jobs
+    if incomplete:
+        summary["incomplete_jobs"] = [
+            {"id": job["id"], "status": job["status"], "errors": job.get("errors", [])} for job in incomplete
+        ]
+    summary["status"] = batch.mark_applied(summary)
+    return summary
+
+
+def collect_judge_batch(
+    run_name: str,
+    wait: bool = False,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    force: bool = False
+) -> Dict[str, Any]:
+    """Check a submitted judge batch and, once finished, write its scores."""
+    batch = JudgeBatch.load(run_name)
+    if not batch:
+        return {"error": f"No judge batch found for run '{run_name}'"}
+    if batch.state["status"] in ("applied", "partial") and not force:
+        return {"run_name": run_name, "status": batch.state["status"], **batch.state.get("applied", {})}
+    if not batch.state["batches"]:
+        return {"error": f"Judge batch for run '{run_name}' was never submitted"}
+
+    openai_client = get_openai_client()
+    if wait:
+        batch.wait(openai_client, interval=poll_interval)
+    else:
+        counts = batch.refresh(openai_client)
+        if not batch.done:
+            return {
+                "run_name": run_name,
+                "status": "pending",
+                "batches": [{"id": b["id"], "status": b["status"]} for b in batch.state["batches"]],
+                "request_counts": counts,
+            }
 
-def format_score_dual(value: float) -> str:
-    """Format score with canonical and human-readable equivalents."""
-    return f"{value:.3f} ({value * 10:.1f}/10)"
+    judges = {key: judge_from_descriptor(d) for key, d in batch.state["judges"].items()}
+    scores = ScoreAggregator()
+    summary = apply_judge_batch(batch, judges, JudgeResponseCache(), scores)
+    return {
+        "run_name": run_name,
+        **summary,
+        "score_averages": scores.averages(),
+    }
 
 
-def create_langfuse_judge_evaluator(prompt_name: str, client) -> Callable:
+def create_langfuse_judge_evaluator(
+    prompt_name: str,
+    client,
+    judge_cache: Optional[JudgeResponseCache] = None
+) -> LangfuseJudge:
     """
-    Create an evaluator function from a Langfuse prompt.
+    Create an evaluator from a Langfuse prompt.
 
     The prompt should use {{input}}, {{output}}, and optionally {{expected_output}} placeholders.
     It should return JSON with {"score": <0-10>, "reasoning": "<explanation>"}.
-    """
-    try:
-        from langfuse import Evaluation
-        from openai import OpenAI
-    except ImportError as e:
-        raise ImportError(f"Required packages not installed: {e}")
 
+    With a judge_cache, responses are reused for the same prompt version,
+    model settings and filled prompt instead of calling the model again.
+    """
     # Fetch the prompt from Langfuse
     prompt_obj = client.get_prompt(prompt_name, label="production")
     if not prompt_obj:
         raise ValueError(f"Judge prompt '{prompt_name}' not found in Langfuse")
 
-    prompt_template = prompt_obj.prompt
-    config = prompt_obj.config or {}
-    model = config.get("model", "gpt-4o")
-    temperature = config.get("temperature", 0)
-    max_tokens = config.get("max_tokens", 150)
-
-    # Extract score name from prompt name (e.g., "judge-accuracy" -> "accuracy")
-    score_name = prompt_name.replace("judge-", "").replace("_", "-")
-
-    def evaluator(*, input, output, expected_output=None, **kwargs) -> "Evaluation":
-        """Evaluator generated from Langfuse prompt: {prompt_name}"""
-        openai_client = OpenAI()
-
-        # Fill in the template
-        filled_prompt = prompt_template
-        filled_prompt = filled_prompt.replace("{{input}}", str(input) if input else "")
-        filled_prompt = filled_prompt.replace("{{output}}", str(output) if output else "")
-        filled_prompt = filled_prompt.replace(
-            "{{expected_output}}",
-            str(expected_output) if expected_output else "Not provided"
-        )
-
-        try:
-            response = openai_client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are an evaluation judge. Follow the instructions exactly."},
-                    {"role": "user", "content": filled_prompt}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-
-            result_text = response.choices[0].message.content.strip()
-
-            # Try to parse JSON response
-            try:
-                # Find JSON in response
-                json_match = re.search(r'\{[^}]+\}', result_text)
-                if json_match:
-                    result = json.loads(json_match.group())
-                    raw_score = result.get("score", 0)
-                    score = normalize_score(raw_score)
-                    reasoning = result.get("reasoning", "")
-                    comment = f"raw_score={raw_score}; normalized={score:.3f}; {reasoning}".strip("; ")
-                    return Evaluation(name=score_name, value=score, comment=comment)
-            except (json.JSONDecodeError, ValueError):
-                pass
-
-            # Fallback: try to extract just a number
-            numbers = re.findall(r'\b(\d+(?:\.\d+)?)\b', result_text)
-            if numbers:
-                raw_score = float(numbers[0])
-                score = normalize_score(raw_score)
-                return Evaluation(
-                    name=score_name,
-                    value=score,
-                    comment=f"raw_score={raw_score}; normalized={score:.3f}; {result_text[:100]}"
-                )
-
-            # If all parsing fails, return 0
-            return Evaluation(name=score_name, value=0.0, comment=f"Failed to parse: {result_text[:100]}")
-
-        except Exception as e:
-            return Evaluation(name=score_name, value=0.0, comment=f"Error: {str(e)[:100]}")
-
-    # Set a meaningful name for the function
-    evaluator.__name__ = f"judge_{score_name}"
-    evaluator.__doc__ = f"Evaluator generated from Langfuse prompt: {prompt_name}"
-
-    return evaluator
+    judge = LangfuseJudge(
+        prompt_name,
+        prompt_obj.prompt,
+        version=getattr(prompt_obj, "version", None),
+        config=prompt_obj.config or {},
+        judge_cache=judge_cache
+    )
+    for problem in judge.compiled.problems():
+        print(f"Warning: judge prompt '{prompt_name}' has {problem}", file=sys.stderr)
+    return judge
 
 
 def load_langfuse_judges(
     client,
     judge_names: Optional[List[str]] = None,
-    dataset_name: Optional[str] = None
+    dataset_name: Optional[str] = None,
+    judge_cache: Optional[JudgeResponseCache] = None
 ) -> List[Callable]:
     """
     Load judge evaluators from Langfuse prompts.
@@ -748,7 +613,7 @@ def load_langfuse_judges(
     if judge_names:
         for name in judge_names:
             try:
-                evaluator = create_langfuse_judge_evaluator(name, client)
+                evaluator = create_langfuse_judge_evaluator(name, client, judge_cache)
                 evaluators.append(evaluator)
                 print(f"Loaded judge: {name}", file=sys.stderr)
             except Exception as e:
@@ -758,13 +623,13 @@ def load_langfuse_judges(
     # Option 2: Get from dataset metadata
     if dataset_name:
         try:
-            dataset = client.get_dataset(dataset_name)
-            if dataset and hasattr(dataset, 'metadata') and dataset.metadata:
-                metadata = dataset.metadata
+            dataset = langfuse_rest_client.get_dataset_by_name(dataset_name)
+            if dataset and dataset.get("metadata"):
+                metadata = dataset["metadata"]
                 if 'judge_prompts' in metadata:
                     for name in metadata['judge_prompts']:
                         try:
-                            evaluator = create_langfuse_judge_evaluator(name, client)
+                            evaluator = create_langfuse_judge_evaluator(name, client, judge_cache)
                             evaluators.append(evaluator)
                             print(f"Loaded judge from dataset metadata: {name}", file=sys.stderr)
                         except Exception as e:
@@ -783,7 +648,7 @@ def load_langfuse_judges(
                 name = prompt.name if hasattr(prompt, 'name') else str(prompt)
                 if name.startswith("judge-"):
                     try:
-                        evaluator = create_langfuse_judge_evaluator(name, client)
+                        evaluator = create_langfuse_judge_evaluator(name, client, judge_cache)
                         evaluators.append(evaluator)
                         print(f"Auto-discovered judge: {name}", file=sys.stderr)
                     except Exception as e:
@@ -859,61 +724,227 @@ def load_evaluators(evaluator_script_path: str) -> List[Callable]:
     return evaluators
 
 
-def prepare_live_dataset(client, run_name: str, limit: int, agent_name: Optional[str] = None) -> str:
-    """Fetch recent traces and create an ephemeral dataset for the experiment."""
-    # 1. Fetch recent traces
-    # We use a loose filter (just last N) or filter by agent if possible (via tags/metadata?)
-    # For now, simplest approach: last N traces globally or simplistic filter
-    
-    # Try to fetch traces
+def load_worker_functions(task_script: str, evaluator_script: Optional[str] = None):
+    """Loader run once in each worker process; returns (task_fn, evaluators)."""
+    return load_task(task_script), load_evaluators(evaluator_script) if evaluator_script else []
+
+
+def parse_workers(spec: Optional[str], default_count: int) -> tuple:
+    """Parse a --workers spec ("thread", "thread:8", "process:4") into (kind, count)."""
+    if not spec:
+        return "thread", default_count
+    kind, _, count = spec.partition(":")
+    if kind not in ("thread", "process"):
+        raise ValueError(f"Invalid --workers '{spec}': expected thread[:N] or process[:N]")
     try:
-        # We can try to use tags if agent_name provided, but for now we just get global last N
-        # assuming the workspace is relevant.
-        traces = client.api.trace.list(limit=limit)
-        if not traces.data:
-            raise ValueError("No live traces found to bootstrap experiment")
+        n = int(count) if count else default_count
+    except ValueError:
+        raise ValueError(f"Invalid worker count in --workers '{spec}'")
+    if n < 1:
+        raise ValueError(f"Worker count must be at least 1: '{spec}'")
+    return kind, n
+
+
+def prepare_live_dataset(
+    client,
+    run_name: str,
+    limit: int,
+    agent_name: Optional[str] = None,
+    on_duplicate: str = "skip",
+    near_duplicates: bool = False,
+    concurrency: int = LIVE_DATASET_WORKERS
+) -> Dict[str, Any]:
+    """Fetch recent traces and materialize them as an ephemeral dataset for the experiment.
+
+    Traces are listed with only their core and input/output fields, limited
+    to traces named `agent_name` when one is given. If the
+    same set of traces was already materialized (LiveDatasetIndex, keyed by
+    a hash of the trace IDs) and that dataset still has its items, it is
+    reused. Otherwise items are created concurrently under deterministic IDs,
+    so retries and reruns upsert; transient failures are retried. Traces
+    whose input is already in the dataset (or repeats within the fetched
+    batch) are skipped via the dataset dedupe index.
+
+    Returns a report with the dataset name, whether it was reused, the
+    created / duplicate / failed counts and one entry per failed item.
+    """
+    try:
+        traces = [
+            {key: trace.get(key) for key in LIVE_TRACE_KEYS}
+            for trace in langfuse_rest_client.list_traces(limit, fields=LIVE_TRACE_FIELDS, name=agent_name)
+        ]
     except Exception as e:
         raise ValueError(f"Failed to fetch live traces: {e}")
-
-    # 2. Create Dataset
-    dataset_name = f"live-{run_name}"
+    if not traces:
+        scope = f" named '{agent_name}'" if agent_name else ""
+        raise ValueError(f"No live traces{scope} found to bootstrap experiment")
+
+    trace_set = trace_set_hash([trace["id"] for trace in traces])
+    report = {
+        "dataset": f"live-{run_name}",
+        "trace_set": trace_set,
+        "traces": len(traces),
+        "reused": False,
+        "created": 0,
+        "duplicates": 0,
+        "without_input": 0,
+        "failed": 0,
+        "failures": [],
+    }
+    live_index = LiveDatasetIndex()
+    previous = live_index.get(trace_set)
+    if previous:
+        if langfuse_rest_client.count_dataset_items(previous["dataset"]) == previous["items"]:
+            print(f"Reusing live dataset '{previous['dataset']}' (same {len(traces)} traces)", file=sys.stderr)
+            return {**report, "dataset": previous["dataset"], "reused": True}
+        live_index.discard(trace_set)
+
+    dataset_name = report["dataset"]
+    dataset_metadata = {"source": "live-capture", "trace_set": trace_set, "traces": len(traces)}
+    if agent_name:
+        dataset_metadata["agent_name"] = agent_name
     try:
-        client.create_dataset(name=dataset_name, description=f"Ephemeral dataset from live traces for run {run_name}")
-    except Exception:
-        # Ignore if exists (might retry run)
-        pass
-
-    # 3. Populate Dataset
-    mapped_count = 0
-    for trace in traces.data:
-        t_dict = trace.dict() if hasattr(trace, 'dict') else dict(trace)
-        
-        # Heuristic: use trace input/output
-        # input might be string or dict.
-        existing_input = t_dict.get("input")
-        existing_output = t_dict.get("output")
-        
-        if existing_input is None:
-            continue
+        client.create_dataset(
+            name=dataset_name,
+            description=f"Ephemeral dataset from live traces for run {run_name}",
+            metadata=dataset_metadata
+        )
+    except Exception as e:
+        # A rerun under the same run name finds the dataset already there
+        if not langfuse_rest_client.get_dataset_by_name(dataset_name):
+            raise ValueError(f"Could not create live dataset '{dataset_name}': {e}")
+
+    index = None
+    if on_duplicate != "allow":
+        index = DedupeIndex.load(dataset_name, near_duplicates=near_duplicates)
+
+    def item_bodies():
+        # Runs lazily while earlier items are being created
+        for trace in traces:
+            if trace["input"] is None:
+                report["without_input"] += 1
+                continue
+            item_id = dataset_item_id(dataset_name, trace["id"])
+            insert, duplicate = check_duplicate(index, trace["input"], item_id, on_duplicate)
+            if not insert:
+                report["duplicates"] += 1
+                continue
+            item_metadata = {"source_trace_id": trace["id"], "source": "live-capture"}
+            if duplicate:
+                item_metadata.update(duplicate)
+            yield {
+                "datasetName": dataset_name,
+                "id": item_id,
+                "input": trace["input"],
+                "expectedOutput": trace["output"],
+                "metadata": item_metadata,
+                "sourceTraceId": trace["id"],
+            }
 
-        try:
-            client.create_dataset_item(
-                dataset_name=dataset_name,
-                input=existing_input,
-                expected_output=existing_output, # Optional: treat past output as expected? Or just reference?
-                metadata={
-                    "source_trace_id": t_dict.get("id"),
-                    "source": "live-capture"
-                }
-            )
-            mapped_count += 1
-        except Exception:
-            pass
-            
-    if mapped_count == 0:
+    for outcome in langfuse_rest_client.create_dataset_items(item_bodies(), max_workers=concurrency):
+        if outcome["ok"]:
+            report["created"] += 1
+            continue
+        report["failed"] += 1
+        report["failures"].append({
+            "trace_id": outcome["item"]["sourceTraceId"],
+            "item_id": outcome["item"]["id"],
+            "status": outcome["status"],
+            "error": outcome["error"],
+        })
+        if index:
+            index.discard(outcome["item"]["id"])
+
+    if index:
+        index.save()
+    if report["duplicates"]:
+        print(f"Skipped {report['duplicates']} duplicate live inputs", file=sys.stderr)
+    if report["failed"]:
+        print(f"Warning: {report['failed']} live items could not be created:", file=sys.stderr)
+        for failure in report["failures"][:5]:
+            print(f"  trace {failure['trace_id']}: HTTP {failure['status']} {failure['error']}", file=sys.stderr)
+
+    if report["created"] == 0 and report["duplicates"] == 0:
         raise ValueError("Could not map any traces to dataset items (missing inputs?)")
-        
-    return dataset_name
+    if report["created"] and not report["failed"]:
+        item_count = langfuse_rest_client.count_dataset_items(dataset_name)
+        if item_count is not None:
+            live_index.put(trace_set, dataset_name, len(traces), item_count)
+    return report
+
+
+class DatasetItemStream:
+    """
+    Dataset items streamed page by page from the REST reader.
+
+    Every item, archived ones included (matching dataset_manager snapshots),
+    is hashed as it passes, so only (ID, hash) pairs stay in memory and the
+    dataset version is available once the stream has been consumed.
+    Archived items, items outside `wanted` and items in `skip` are not yielded.
+    """
+
+    def __init__(self, dataset_name: str, wanted: Optional[set] = None):
+        self.dataset_name = dataset_name
+        self.wanted = wanted
+        self.skip: set = set()
+        self.count = 0
+        self._entries: Dict[str, str] = {}
+
+    def __iter__(self):
+        for data in langfuse_rest_client.iter_dataset_items(self.dataset_name, fields=DatasetItem.FIELDS):
+            item = DatasetItem(data)
+            self._entries[item.id] = item.version_hash()
+            if item.status == "ARCHIVED" or item.id in self.skip:
+                continue
+            if self.wanted is not None and item.id not in self.wanted:
+                continue
+            self.count += 1
+            yield item
+
+    @property
+    def version(self) -> str:
+        return manifest_version(self._entries)
+
+
+class DatasetItem:
+    """Lightweight dataset item built from a streamed REST item.
+
+    Carries the attributes the executor and evaluators read (id, dataset_id,
+    input, expected_output, metadata), so runs stay linked to the dataset
+    without loading it through client.get_dataset().
+    """
+
+    FIELDS = ["id", "datasetId", "input", "expectedOutput", "metadata", "sourceTraceId", "status"]
+
+    def __init__(self, data: Dict[str, Any]):
+        self.id = data.get("id")
+        self.dataset_id = data.get("datasetId")
+        self.input = data.get("input")
+        self.expected_output = data.get("expectedOutput")
+        self.metadata = data.get("metadata")
+        self.source_trace_id = data.get("sourceTraceId")
+        self.status = data.get("status")
+
+    @classmethod
+    def from_snapshot(cls, item: Dict[str, Any], dataset_id: Optional[str]) -> "DatasetItem":
+        """Build from a snapshot body (snake_case keys)."""
+        return cls({
+            "id": item.get("id"),
+            "datasetId": dataset_id,
+            "input": item.get("input"),
+            "expectedOutput": item.get("expected_output"),
+            "metadata": item.get("metadata"),
+            "sourceTraceId": item.get("source_trace_id"),
+            "status": item.get("status"),
+        })
+
+    def version_hash(self) -> str:
+        return item_version_hash({
+            "input": self.input,
+            "expected_output": self.expected_output,
+            "metadata": self.metadata,
+            "status": self.status,
+        })
 
 
 def run_experiment(
@@ -930,6 +961,29 @@ def run_experiment(
     source_type: str = "dataset",
     sample_size: int = 10,
     agent_name: Optional[str] = None,
+    item_ids: Optional[List[str]] = None,
+    dataset_version: Optional[str] = None,
+    workers: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache_outputs: bool = False,
+    reuse_outputs: bool = False,
+    cache_env: Optional[List[str]] = None,
+    cache_key: Optional[str] = None,
+    judge_cache: bool = True,
+    judge_rpm: Optional[float] = None,
+    judge_tpm: Optional[float] = None,
+    combine: bool = False,
+    judge_mode: str = "inline",
+    batch_wait: bool = True,
+    batch_poll_interval: float = DEFAULT_POLL_INTERVAL,
+    baseline_run: Optional[str] = None,
+    early_stop_score: Optional[str] = None,
+    early_stop_alpha: float = EARLY_STOP_ALPHA,
+    early_stop_min_items: int = EARLY_STOP_MIN_PAIRS,
+    seed: Optional[int] = None,
+    adaptive_concurrency: bool = False,
+    concurrency_ceiling: int = ADAPTIVE_MAX_CONCURRENCY,
+    resume: bool = False,
 ) -> Dict[str, Any]:
     """Run an experiment on a dataset with custom task and evaluators.
 
@@ -938,97 +992,373 @@ def run_experiment(
     2. Langfuse prompts (--use-langfuse-judges or --judges)
 
     Langfuse judges are prompts named 'judge-*' that define LLM-as-judge evaluation.
+
+    item_ids restricts the run to a subset of items, e.g. a sample drawn with
+    `dataset_manager.py sample`. dataset_version pins the run to a local
+    snapshot (`dataset_manager.py snapshot`) instead of the live items; the
+    version the run used is always recorded in the run metadata.
+
+    workers selects the execution mode: "thread[:N]" (default) or
+    "process[:N]" for CPU-bound task/evaluator scripts; N defaults to
+    max_concurrency.
+
+    cache_outputs stores task outputs locally; reuse_outputs also replays
+    them, so only items whose output is not cached run the task. Entries are
+    keyed by item ID, input hash, the task script's content and the values of
+    the cache_env variables (plus an optional free-form cache_key).
+    judge_cache reuses stored Langfuse-judge responses (see JudgeResponseCache).
+    judge_rpm / judge_tpm cap judge requests and tokens per minute across all
+    judges and concurrent items. combine scores judges that share a model in
+    a single call per item (see CombinedJudge).
+
+    judge_mode="batch" sends Langfuse judge requests through the OpenAI Batch
+    API after the task has run, instead of calling judges inline. With
+    batch_wait the run polls until the batch finishes and writes the scores;
+    otherwise it returns after submitting and `judge-batch` collects later.
+
+    With a baseline_run the run is a sequential test: items run in a
+    random order (seed), each finished item's score is paired with the
+    baseline's score for the same dataset item, and the run stops early
+    once an always-valid confidence sequence shows the candidate is
+    better or worse (see run_stats.SequentialComparison).
+
+    adaptive_concurrency starts thread/async runs at max_concurrency and
+    lets an AIMD controller move it between 1 and concurrency_ceiling: up
+    while latency holds, down on 429s, overloads, timeouts or rising
+    latency (see AdaptiveConcurrency). The chosen concurrency over time is
+    recorded in the run metadata as concurrency_timeline.
+
+    Every run journals its finished items (see RunCheckpoint). With resume
+    the items already in the journal are skipped and their scores counted
+    from the journal, so a crashed run only executes the remainder.
     """
+    # Snapshot of the arguments for the checkpoint, before anything mutates them
+    arguments = json.loads(json.dumps({k: v for k, v in locals().items() if k != "resume"}, default=str))
     client = get_langfuse_client()
 
     try:
         # Handle Live Mode
+        live_dataset = None
         if source_type == "live":
             print(f"Fetching last {sample_size} traces for live dataset...", file=sys.stderr)
-            dataset_name = prepare_live_dataset(client, run_name, sample_size, agent_name)
-            print(f"Created ephemeral dataset: {dataset_name}", file=sys.stderr)
-        # Load task function
-        task_fn = load_task(task_script)
-
-        # Load evaluators
+            live_dataset = prepare_live_dataset(client, run_name, sample_size, agent_name)
+            dataset_name = live_dataset["dataset"]
+            if not live_dataset["reused"]:
+                print(f"Created ephemeral dataset: {dataset_name}", file=sys.stderr)
+        # A cached copy of this run is stale once new items and scores arrive
+        RunCache().invalidate(dataset_name, run_name)
+        worker_kind, worker_count = parse_workers(workers, max_concurrency)
+
+        # Load task function and evaluators (in process mode each worker loads them)
         evaluators = []
+        if worker_kind == "process":
+            for script in filter(None, [task_script, evaluator_script]):
+                if not Path(script).resolve().exists():
+                    raise FileNotFoundError(f"Script not found: {script}")
+        else:
+            task_fn = load_task(task_script)
 
-        # Option 1: Load from local script
-        if evaluator_script:
-            evaluators = load_evaluators(evaluator_script)
-            print(f"Loaded {len(evaluators)} evaluators from script", file=sys.stderr)
+            # Option 1: Load from local script
+            if evaluator_script:
+                evaluators = load_evaluators(evaluator_script)
+                print(f"Loaded {len(evaluators)} evaluators from script", file=sys.stderr)
 
         # Option 2: Load from Langfuse judge prompts
+        response_cache = None
+        batch_judges: List[LangfuseJudge] = []
+        limiter = configure_rate_limits(judge_rpm, judge_tpm)
         if use_langfuse_judges or judge_names:
+            response_cache = JudgeResponseCache() if judge_cache else None
             langfuse_evaluators = load_langfuse_judges(
                 client,
                 judge_names=judge_names,
-                dataset_name=dataset_name
+                dataset_name=dataset_name,
+                judge_cache=response_cache
             )
-            evaluators.extend(langfuse_evaluators)
             print(f"Loaded {len(langfuse_evaluators)} Langfuse judges", file=sys.stderr)
+            if combine:
+                langfuse_evaluators = combine_judges(langfuse_evaluators, response_cache)
+                for judge in langfuse_evaluators:
+                    if isinstance(judge, CombinedJudge):
+                        print(f"Combined {len(judge.judges)} judges on {judge.model} into one call", file=sys.stderr)
+            if judge_mode == "batch":
+                batch_judges = langfuse_evaluators
+            else:
+                evaluators.extend(langfuse_evaluators)
 
-        # Get dataset
-        dataset = client.get_dataset(dataset_name)
-        if not dataset:
+        # Stream dataset items (paged REST reads instead of client.get_dataset)
+        if not langfuse_rest_client.get_dataset_by_name(dataset_name):
             print(f"Dataset '{dataset_name}' not found", file=sys.stderr)
             return {"status": "error", "message": f"Dataset not found: {dataset_name}"}
+        wanted = set(item_ids) if item_ids is not None else None
+        stream = None
+        if dataset_version:
+            snapshot = load_snapshot_items(dataset_name, dataset_version)
+            if "error" in snapshot:
+                return {"status": "error", "message": snapshot["error"]}
+            if snapshot["unavailable"]:
+                print(
+                    f"Warning: {len(snapshot['unavailable'])} pinned items are no longer available and are skipped",
+                    file=sys.stderr
+                )
+            items = [
+                DatasetItem.from_snapshot(item, snapshot["dataset_id"])
+                for item in snapshot["items"]
+                if item.get("status") != "ARCHIVED" and (wanted is None or item["id"] in wanted)
+            ]
+            item_count = len(items)
+            resolved_version = snapshot["version"]
+            print(f"Pinned dataset version {resolved_version} ({snapshot['fetched']} items fetched)", file=sys.stderr)
+        else:
+            # Items stream into the executor; the version is known once the stream is consumed
+            items = stream = DatasetItemStream(dataset_name, wanted)
+            item_count = len(wanted) if wanted is not None else langfuse_rest_client.count_dataset_items(dataset_name)
+            resolved_version = None
+        if stream is not None:
+            print(f"Streaming {item_count if item_count is not None else 'all'} dataset items", file=sys.stderr)
+        elif wanted is not None:
+            print(f"Running on {item_count} of {len(wanted)} sampled items", file=sys.stderr)
+        else:
+            print(f"Loaded {item_count} dataset items", file=sys.stderr)
 
         # Prepare run metadata
         run_metadata = metadata or {}
         run_metadata["task_script"] = task_script
         if evaluator_script:
             run_metadata["evaluator_script"] = evaluator_script
-        run_metadata["max_concurrency"] = max_concurrency
-
-        # Run experiment using Langfuse SDK
-        results = dataset.run_experiment(
-            name=run_name,
-            run_description=run_description,
-            run_metadata=run_metadata,
-            experiment_task=task_fn,
-            evaluators=evaluators if evaluators else None,
-            max_concurrency=max_concurrency
-        )
+        run_metadata["max_concurrency"] = worker_count
+        run_metadata["workers"] = worker_kind
+        adaptive = None
+        if adaptive_concurrency:
+            if worker_kind == "process":
+                print("Note: --adaptive-concurrency applies to thread/async runs; process workers stay fixed",
+                      file=sys.stderr)
+            else:
+                adaptive = AdaptiveConcurrency(worker_count, maximum=concurrency_ceiling)
+                run_metadata["concurrency"] = "adaptive"
+                run_metadata["concurrency_ceiling"] = adaptive.maximum
+        if item_ids is not None:
+            run_metadata["sampled_items"] = item_count
+        run_metadata["dataset_version"] = resolved_version
+        run_metadata["dataset_version_pinned"] = bool(dataset_version)
+        if live_dataset:
+            run_metadata["live_trace_set"] = live_dataset["trace_set"]
+
+        output_cache = None
+        if cache_outputs or reuse_outputs:
+            output_cache = TaskOutputCache(
+                task_script,
+                env_names=cache_env or [],
+                config={"key": cache_key} if cache_key else None,
+                read=reuse_outputs
+            )
+            run_metadata["task_cache"] = {"fingerprint": output_cache.fingerprint, "reused_outputs": reuse_outputs}
+            print(f"Task output cache {output_cache.fingerprint} ({'reuse' if reuse_outputs else 'write-only'})", file=sys.stderr)
+
+        batch = None
+        if batch_judges:
+            batch = JudgeBatch(run_name, dataset_name)
+            for judge in batch_judges:
+                batch.add_judge(judge.__name__, judge_descriptor(judge))
+            run_metadata["judge_mode"] = "batch"
+
+        sequential = None
+        stopped = threading.Event()
+        if baseline_run:
+            if batch_judges:
+                raise ValueError("Early stopping needs scores as items finish; it cannot be used with --judge-mode batch")
+            baseline = get_run(dataset_name, baseline_run, summary_only=True, with_item_scores=True)
+            if not baseline:
+                raise ValueError(f"Baseline run '{baseline_run}' not found in dataset '{dataset_name}'")
+            sequential = SequentialComparison(
+                baseline["item_scores"], early_stop_score, alpha=early_stop_alpha, min_pairs=early_stop_min_items
+            )
+            # A random order makes every prefix of the run a fair sample (this needs all bodies)
+            items = list(items)
+            item_count = len(items)
+            random.Random(seed).shuffle(items)
+            run_metadata["sequential"] = {"baseline_run": baseline_run, "alpha": early_stop_alpha, "seed": seed}
+            print(
+                f"Sequential test against '{baseline_run}' ({len(baseline['item_scores'])} baseline items)",
+                file=sys.stderr
+            )
 
-        # Collect summary statistics
-        total_items = 0
-        successful = 0
-        failed = 0
-        scores = {}
+        checkpoint = RunCheckpoint(run_name)
+        completed: Dict[str, Dict[str, Any]] = {}
+        if resume:
+            if batch_judges:
+                raise ValueError("A run with --judge-mode batch cannot be resumed; its queued judge requests are lost")
+            completed = checkpoint.completed()
+            if stream is items:
+                stream.skip = set(completed)
+                if item_count is not None:
+                    item_count = max(0, item_count - len(completed))
+            else:
+                items = [item for item in items if item.id not in completed]
+                item_count = len(items)
+            checkpoint.mark(resumed_at=datetime.now().isoformat())
+            run_metadata["resumed_items"] = len(completed)
+            print(f"Resuming '{run_name}': {len(completed)} items already done, {item_count} left", file=sys.stderr)
+        else:
+            # Live runs resume against the dataset they materialized
+            checkpoint.start({**arguments, "dataset_name": dataset_name, "source_type": "dataset"})
+
+        # Run natively: streamed work queue, concurrent evaluators, batched writes
+        scores = ScoreAggregator()
+        pending_records: Dict[str, Dict[str, Any]] = {}
+
+        def numeric_scores(evaluations: List[Dict[str, Any]]) -> Dict[str, float]:
+            return {
+                e["name"]: normalize_score(e["value"])
+                for e in evaluations
+                if isinstance(e["value"], (int, float)) and not isinstance(e["value"], bool)
+            }
 
-        for item_result in results:
-            total_items += 1
-            if hasattr(item_result, 'error') and item_result.error:
-                failed += 1
+        for record in completed.values():
+            for evaluation in record["scores"]:
+                scores.add(evaluation["name"], evaluation["value"])
+            if sequential is not None and not sequential.decision:
+                sequential.observe(record["item_id"], numeric_scores(record["scores"]))
+        if sequential is not None and sequential.decision:
+            stopped.set()
+
+        def collect(item_result: ItemResult) -> None:
+            if batch is not None and item_result.ok:
+                item_result.evaluations.extend(as_evaluations(queue_batch_judging(batch, batch_judges, item_result)))
+            for evaluation in item_result.evaluations:
+                scores.add(evaluation["name"], evaluation["value"])
+            if item_result.ok:
+                # Journaled once the sink has written the item (see journal)
+                pending_records[item_result.trace_id] = {
+                    "item_id": item_result.item.id,
+                    "trace_id": item_result.trace_id,
+                    "output": item_result.output,
+                    "scores": [{"name": e["name"], "value": e["value"]} for e in item_result.evaluations],
+                }
+            if sequential is not None and item_result.ok and not stopped.is_set():
+                decision = sequential.observe(item_result.item.id, numeric_scores(item_result.evaluations))
+                if decision:
+                    stopped.set()
+                    print(
+                        f"\nEarly stop: candidate is {decision} than '{baseline_run}' on {sequential.score_name} "
+                        f"after {sequential.decided_at} paired items",
+                        file=sys.stderr
+                    )
+
+        def journal(run_item: Dict[str, Any]) -> None:
+            record = pending_records.pop(run_item["traceId"], None)
+            if record:
+                checkpoint.append({**record, "output": to_jsonable(record["output"])})
+
+        sink = ResultSink(run_name, run_description=run_description, run_metadata=run_metadata, on_linked=journal)
+        if worker_kind == "process":
+            # Script evaluators run in the workers; Langfuse judges stay here
+            executor = ProcessExecutor(
+                load_worker_functions,
+                (task_script, evaluator_script),
+                workers=worker_count,
+                parent_evaluators=evaluators,
+                chunk_size=chunk_size,
+                sink=sink,
+                on_result=collect,
+                output_cache=output_cache
+            )
+        else:
+            executor = ExperimentExecutor(
+                task_fn,
+                evaluators,
+                max_concurrency=worker_count,
+                sink=sink,
+                on_result=collect,
+                output_cache=output_cache,
+                adaptive=adaptive
+            )
+        concurrency = f"adaptive concurrency {adaptive.limit}-{adaptive.maximum}" if adaptive else f"concurrency {worker_count}"
+        shown = item_count if item_count is not None else "?"
+        print(f"Running {shown} items ({executor.mode} mode, {concurrency})", file=sys.stderr)
+        try:
+            source = itertools.takewhile(lambda _: not stopped.is_set(), items) if sequential else items
+            execution = executor.run(source, total=item_count)
+            if stream is not None:
+                resolved_version = stream.version
+                fields = {"dataset_version": resolved_version}
+                if stream is items:
+                    item_count = stream.count
+                    if item_ids is not None:
+                        fields["sampled_items"] = item_count + len(completed)
+                sink.update_metadata(fields)
+        finally:
+            writes = sink.close()
+            checkpoint.close()
+
+        judge_batch_summary = None
+        if batch is not None:
+            judge_batch_summary = {"requests": batch.request_count, "state_dir": str(batch.dir)}
+            if batch.request_count:
+                openai_client = get_openai_client()
+                judge_batch_summary["batch_ids"] = batch.submit(openai_client)
+                judge_batch_summary["status"] = "submitted"
+                if batch_wait:
+                    batch.wait(openai_client, interval=batch_poll_interval)
+                    judges_by_key = {judge.__name__: judge for judge in batch_judges}
+                    judge_batch_summary.update(apply_judge_batch(batch, judges_by_key, response_cache, scores))
             else:
-                successful += 1
-
-            # Aggregate scores
-            if hasattr(item_result, 'scores') and item_result.scores:
-                for score in item_result.scores:
-                    name = score.name if hasattr(score, 'name') else str(score)
-                    value = score.value if hasattr(score, 'value') else score
-                    if name not in scores:
-                        scores[name] = []
-                    if isinstance(value, (int, float)):
-                        scores[name].append(normalize_score(value))
-
-        # Calculate averages
-        score_averages = {}
-        for name, values in scores.items():
-            if values:
-                score_averages[name] = sum(values) / len(values)
+                batch.close()
+                judge_batch_summary["status"] = "cached"
+
+        judge_cache_stats = None
+        if response_cache:
+            judge_cache_stats = response_cache.stats()
+            if judge_cache_stats["stored"]:
+                judge_cache_stats["pruned"] = response_cache.prune()
+
+        combined_stats = None
+        combined = [e for e in evaluators + batch_judges if isinstance(e, CombinedJudge)]
+        if combined:
+            combined_stats = {
+                "groups": [[j.score_name for j in judge.judges] for judge in combined],
+                "fallback_calls": sum(judge.fallbacks for judge in combined),
+            }
+
+        checkpoint.mark(status="completed", completed_at=datetime.now().isoformat(), journaled=len(completed) + checkpoint.appended)
+        total_items = item_count + len(completed)
+        successful = execution["successful"] + len(completed)
+        failed = execution["failed"]
 
         return {
             "status": "completed",
             "dataset": dataset_name,
             "run_name": run_name,
+            "sampled": item_ids is not None,
+            "dataset_version": resolved_version,
             "total_items": total_items,
             "successful": successful,
             "failed": failed,
-            "score_averages": score_averages,
-            "evaluators_used": [e.__name__ for e in evaluators] if evaluators else [],
+            "score_averages": scores.averages(),
+            "score_stats": scores.stats(),
+            "evaluators_used": executor.evaluator_names() + [judge.__name__ for judge in batch_judges],
+            "execution": {**execution, **writes},
+            "task_cache": output_cache.stats() if output_cache else None,
+            "judge_cache": judge_cache_stats,
+            "combined_judges": combined_stats,
+            "judge_batch": judge_batch_summary,
+            "live_dataset": live_dataset,
+            "checkpoint": {
+                "journal": str(checkpoint.journal_path),
+                "resumed_items": len(completed) if resume else None,
+                "journaled": len(completed) + checkpoint.appended,
+            },
+            "early_stop": {
+                **sequential.summary(),
+                "baseline_run": baseline_run,
+                "processed": execution["processed"] + len(completed),
+                "skipped": total_items - execution["processed"] - len(completed),
+            } if sequential else None,
+            "judge_rate_limit": {
+                "rpm": judge_rpm,
+                "tpm": judge_tpm,
+                "waited_seconds": round(limiter.waited_seconds, 1),
+            } if limiter.enabled else None,
             "score_scale": CANONICAL_SCORE_SCALE,
             "score_scale_note": "Canonical 0-1 scale. 0-10 values are normalized before aggregation.",
         }
@@ -1068,90 +1398,172 @@ def list_runs(dataset_name: str) -> List[Dict[str, Any]]:
         return []
 
 
-def get_run(dataset_name: str, run_name: str) -> Optional[Dict[str, Any]]:
-    """Get details of a specific experiment run."""
-    client = get_langfuse_client()
+def run_item_record(hydrated: Dict[str, Any], payloads: bool) -> Dict[str, Any]:
+    """Compact cacheable record of a hydrated run item: raw scores and, optionally, payloads."""
+    trace = hydrated.get("trace") or {}
+    scores = {}
+    for score in trace.get("scores") or []:
+        value = score.get("stringValue") if score.get("dataType") == "CATEGORICAL" else score.get("value")
+        scores[score.get("name") or "score"] = value
+    record = {
+        "id": hydrated.get("datasetItemId"),
+        "trace_id": hydrated.get("traceId"),
+        "trace_found": bool(trace),
+        "scores": scores,
+    }
+    if payloads:
+        dataset_item = hydrated.get("datasetItem") or {}
+        record["input"] = dataset_item.get("input", trace.get("input"))
+        record["output"] = trace.get("output")
+        record["expected_output"] = dataset_item.get("expectedOutput")
+    return record
+
+
+def run_records(
+    dataset_name: str,
+    run_name: str,
+    payloads: bool,
+    refresh: bool = False
+) -> Optional[tuple]:
+    """
+    (run header, record iterator) for a run, from the local run cache when
+    it is still current, otherwise fetched over REST and cached on the way.
+
+    A cached run is current if it has payloads when they are needed, its
+    item count still matches the server and no score has been written in
+    the project since the fetch began (item count alone misses scores added
+    later by judges or annotators). Run items are paged in and their traces
+    (and dataset items, for payloads) hydrated concurrently.
+    """
+    run_cache = RunCache()
+    header = None if refresh else run_cache.header(dataset_name, run_name)
+    if header and (header.get("payloads") or not payloads):
+        # When the server cannot be asked, the cache is used as is
+        count = langfuse_rest_client.count_dataset_run_items(header["dataset_id"], run_name)
+        current = count is None or count == header.get("item_count")
+        if current and count is not None:
+            since = header.get("fetched_at") or header.get("cached_at")
+            current = langfuse_rest_client.count_scores(since) in (0, None)
+        if current:
+            return {**header, "from_cache": True}, run_cache.records(dataset_name, run_name)
+
+    dataset = langfuse_rest_client.get_dataset_by_name(dataset_name)
+    if not dataset:
+        print(f"Dataset '{dataset_name}' not found", file=sys.stderr)
+        return None
+    run = langfuse_rest_client.get_dataset_run(dataset_name, run_name)
+    if not run:
+        print(f"Run '{run_name}' not found in dataset '{dataset_name}'", file=sys.stderr)
+        return None
 
-    try:
-        dataset = client.get_dataset(dataset_name)
-        if not dataset:
-            print(f"Dataset '{dataset_name}' not found", file=sys.stderr)
-            return None
+    header = {
+        "dataset_id": dataset["id"],
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "created_at": run.get("createdAt"),
+        "description": run.get("description"),
+        "metadata": run.get("metadata") or {},
+        "payloads": payloads,
+    }
+    hydrated = langfuse_rest_client.hydrate_run_items(
+        langfuse_rest_client.iter_dataset_run_items(dataset["id"], run_name),
+        include_dataset_items=payloads
+    )
+    records = (run_item_record(entry, payloads) for entry in hydrated)
+    return {**header, "from_cache": False}, run_cache.write(dataset_name, run_name, header, records)
 
-        # Find the run
-        run = None
-        if hasattr(dataset, 'runs') and dataset.runs:
-            for r in dataset.runs:
-                if hasattr(r, 'name') and r.name == run_name:
-                    run = r
-                    break
 
-        if not run:
-            print(f"Run '{run_name}' not found in dataset '{dataset_name}'", file=sys.stderr)
+def get_run(
+    dataset_name: str,
+    run_name: str,
+    summary_only: bool = False,
+    item_filter: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    max_items: Optional[int] = None,
+    refresh: bool = False,
+    with_item_scores: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Get details of a specific experiment run.
+
+    Run items come from the REST API (the SDK's dataset.runs is not
+    populated) or the local run cache; see run_records. Score statistics are
+    aggregated while items stream past. With summary_only no item payloads
+    (input, output, expected output) are fetched or kept. item_filter
+    receives each item's normalized scores and decides whether the item is
+    kept; max_items caps how many kept items are materialized, while
+    `matched_count` still counts every match. with_item_scores adds
+    `item_scores`, the numeric scores of every item keyed by dataset item ID
+    (for paired comparisons).
+    """
+    try:
+        fetched = run_records(dataset_name, run_name, payloads=not summary_only, refresh=refresh)
+        if not fetched:
             return None
+        header, records = fetched
 
-        # Get run items with their scores
         items = []
-        scores_summary = {}
-
-        if hasattr(run, 'items') and run.items:
-            for item in run.items:
-                item_dict = {
-                    "id": item.id if hasattr(item, 'id') else None,
-                    "input": item.input if hasattr(item, 'input') else None,
-                    "output": item.output if hasattr(item, 'output') else None,
-                    "expected_output": item.expected_output if hasattr(item, 'expected_output') else None,
-                }
+        item_count = 0
+        matched_count = 0
+        missing_traces = 0
+        aggregator = ScoreAggregator()
+        item_scores: Dict[str, Dict[str, float]] = {}
+
+        for record in records:
+            item_count += 1
+            if not record.get("trace_found", True):
+                missing_traces += 1
+            scores = {}
+            for name, raw_value in record.get("scores", {}).items():
+                value = normalize_score(raw_value) if isinstance(raw_value, (int, float)) else raw_value
+                scores[name] = value
+                aggregator.add(name, value)
+            if with_item_scores and record.get("id"):
+                item_scores[record["id"]] = {k: v for k, v in scores.items() if isinstance(v, (int, float))}
+
+            if summary_only or (item_filter and not item_filter(scores)):
+                continue
+            matched_count += 1
+            if max_items is not None and len(items) >= max_items:
+                continue
 
-                # Get scores for this item
-                if hasattr(item, 'scores') and item.scores:
-                    item_dict["scores"] = {}
-                    for score in item.scores:
-                        name = score.name if hasattr(score, 'name') else "score"
-                        raw_value = score.value if hasattr(score, 'value') else score
-                        value = normalize_score(raw_value) if isinstance(raw_value, (int, float)) else raw_value
-                        item_dict["scores"][name] = value
-
-                        if name not in scores_summary:
-                            scores_summary[name] = []
-                        if isinstance(value, (int, float)):
-                            scores_summary[name].append(value)
-
-                items.append(item_dict)
-
-        # Calculate score statistics
-        score_stats = {}
-        for name, values in scores_summary.items():
-            if values:
-                score_stats[name] = {
-                    "mean": sum(values) / len(values),
-                    "min": min(values),
-                    "max": max(values),
-                    "count": len(values)
-                }
+            item_dict = {
+                "id": record.get("id"),
+                "input": record.get("input"),
+                "output": record.get("output"),
+                "expected_output": record.get("expected_output"),
+            }
+            if scores:
+                item_dict["scores"] = scores
+            items.append(item_dict)
 
-        return {
+        result = {
             "name": run_name,
             "dataset": dataset_name,
-            "created_at": str(run.created_at) if hasattr(run, 'created_at') else None,
-            "description": run.description if hasattr(run, 'description') else None,
-            "metadata": run.metadata if hasattr(run, 'metadata') else {},
-            "item_count": len(items),
-            "score_stats": score_stats,
-            "items": items
+            "created_at": header.get("created_at"),
+            "description": header.get("description"),
+            "metadata": header.get("metadata") or {},
+            "item_count": item_count,
+            "score_stats": aggregator.stats(),
+            "from_cache": header["from_cache"],
+            "missing_traces": missing_traces,
         }
+        if not summary_only:
+            result["items"] = items
+            result["matched_count"] = matched_count
+        if with_item_scores:
+            result["item_scores"] = item_scores
+        return result
 
     except Exception as e:
         print(f"Error getting run: {e}", file=sys.stderr)
         return None
 
 
-def compare_runs(dataset_name: str, run_names: List[str]) -> str:
+def compare_runs(dataset_name: str, run_names: List[str], refresh: bool = False) -> str:
     """Compare multiple experiment runs."""
     runs_data = []
 
     for run_name in run_names:
-        run = get_run(dataset_name, run_name)
+        run = get_run(dataset_name, run_name, summary_only=True, refresh=refresh, with_item_scores=True)
         if run:
             runs_data.append(run)
         else:
@@ -1212,6 +1624,30 @@ def compare_runs(dataset_name: str, run_names: List[str]) -> str:
                 lines.append(f"| {run['name']} | {mean} | {min_v} | {max_v} | {count} |")
             lines.append("")
 
+        # Paired comparison of each run against the first, joined on dataset item
+        baseline = runs_data[0]
+        for run in runs_data[1:]:
+            paired = compare_item_scores(baseline["item_scores"], run["item_scores"], sorted(all_scores))
+            lines.append(f"## Paired: {run['name']} vs {baseline['name']}\n")
+            lines.append(
+                f"Per-item differences ({run['name']} - {baseline['name']}), "
+                f"{int(CONFIDENCE * 100)}% bootstrap CI{'' if HAS_NUMPY else ' (NumPy not installed: fewer resamples)'}\n"
+            )
+            lines.append("| Score | Pairs | Mean Diff | CI | p (t-test) | p (sign) | W / L / T | Verdict |")
+            lines.append("|-------|-------|-----------|----|------------|----------|-----------|---------|")
+            for score_name, stats in paired.items():
+                if not stats["pairs"]:
+                    lines.append(f"| {score_name} | 0 | - | - | - | - | - | {stats['verdict']} |")
+                    continue
+                p_t = f"{stats['p_t_test']:.4f}" if stats["p_t_test"] is not None else "-"
+                p_sign = f"{stats['p_sign_test']:.4f}" if stats["p_sign_test"] is not None else "-"
+                lines.append(
+                    f"| {score_name} | {stats['pairs']} | {stats['mean_diff']:+.3f} | "
+                    f"[{stats['ci_low']:+.3f}, {stats['ci_high']:+.3f}] | {p_t} | {p_sign} | "
+                    f"{stats['wins']} / {stats['losses']} / {stats['ties']} | {stats['verdict']} |"
+                )
+            lines.append("")
+
     return "\n".join(lines)
 
 
@@ -1220,10 +1656,38 @@ def analyze_run(
     run_name: str,
     show_failures: bool = False,
     score_threshold: Optional[float] = None,
-    score_name: Optional[str] = None
+    score_name: Optional[str] = None,
+    summary_only: bool = False,
+    refresh: bool = False
 ) -> str:
-    """Analyze an experiment run with score distributions and failure details."""
-    run = get_run(dataset_name, run_name)
+    """
+    Analyze an experiment run with score distributions and failure details.
+
+    Only the items that get listed are materialized: low-scoring items are
+    selected while the run streams, and summary_only skips item details.
+    """
+    if summary_only:
+        show_failures, score_threshold = False, None
+    item_filter: Optional[Callable[[Dict[str, Any]], bool]] = None
+    if score_threshold is not None and score_name:
+        threshold_normalized = normalize_score(score_threshold)
+        item_filter = lambda scores: (
+            score_name in scores and normalize_score(scores[score_name]) < threshold_normalized
+        )
+    elif show_failures:
+        # Items with any low score (< 0.5 on the normalized scale)
+        item_filter = lambda scores: any(
+            isinstance(v, (int, float)) and normalize_score(v) < 0.5 for v in scores.values()
+        )
+
+    run = get_run(
+        dataset_name,
+        run_name,
+        summary_only=item_filter is None,
+        item_filter=item_filter,
+        max_items=ANALYZE_MAX_ITEMS,
+        refresh=refresh
+    )
     if not run:
         return f"Error: Run '{run_name}' not found in dataset '{dataset_name}'"
 
@@ -1253,38 +1717,23 @@ def analyze_run(
             )
         lines.append("")
 
-    # Filter items by score threshold
+    if item_filter is None:
+        return "\n".join(lines)
+
     items = run.get('items', [])
+    matched_count = run.get('matched_count', len(items))
     if score_threshold is not None and score_name:
-        threshold_normalized = normalize_score(score_threshold)
-        filtered_items = []
-        for item in items:
-            scores = item.get('scores', {})
-            if score_name in scores:
-                if normalize_score(scores[score_name]) < threshold_normalized:
-                    filtered_items.append(item)
-        items = filtered_items
         lines.append(f"## Items Below Threshold\n")
         lines.append(
             f"Showing items where `{score_name}` < {threshold_normalized:.3f} ({threshold_normalized * 10:.1f}/10)"
         )
-        lines.append(f"**Count:** {len(items)}\n")
-    elif show_failures:
-        # Show items with any low scores (< 0.5 for normalized scores)
-        failure_items = []
-        for item in items:
-            scores = item.get('scores', {})
-            for name, value in scores.items():
-                if isinstance(value, (int, float)) and normalize_score(value) < 0.5:
-                    failure_items.append(item)
-                    break
-        items = failure_items
+    else:
         lines.append("## Low-Scoring Items\n")
-        lines.append(f"**Count:** {len(items)}\n")
+    lines.append(f"**Count:** {matched_count}\n")
 
     # Show item details
-    if items and (show_failures or score_threshold is not None):
-        for i, item in enumerate(items[:20]):  # Limit to 20 items
+    if items:
+        for i, item in enumerate(items):
             lines.append(f"### Item {i+1}")
             if item.get('input'):
                 input_str = json.dumps(item['input']) if isinstance(item['input'], dict) else str(item['input'])
@@ -1312,8 +1761,8 @@ def analyze_run(
                 lines.append(f"**Scores:** {scores_str}")
             lines.append("")
 
-        if len(run.get('items', [])) > 20:
-            lines.append(f"*...and {len(run.get('items', [])) - 20} more items*\n")
+        if matched_count > len(items):
+            lines.append(f"*...and {matched_count - len(items)} more items*\n")
 
     return "\n".join(lines)
 
@@ -1349,6 +1798,10 @@ def format_run_detail(run: Dict[str, Any]) -> str:
     lines.append(f"**Dataset:** {run.get('dataset', '?')}")
     lines.append(f"**Created:** {run.get('created_at', 'Unknown')}")
     lines.append(f"**Items:** {run.get('item_count', 0)}")
+    if run.get('missing_traces'):
+        lines.append(f"**Missing traces:** {run['missing_traces']} (items without a retrievable trace)")
+    if run.get('from_cache'):
+        lines.append("*From the local run cache; pass --refresh to re-fetch.*")
 
     if run.get('description'):
         lines.append(f"**Description:** {run['description']}")
@@ -1382,12 +1835,60 @@ def format_result(result: Dict[str, Any]) -> str:
     lines = ["# Experiment Complete\n"]
     lines.append(f"**Dataset:** {result.get('dataset', '?')}")
     lines.append(f"**Run:** {result.get('run_name', '?')}")
-    lines.append(f"**Total Items:** {result.get('total_items', 0)}")
+    if result.get('dataset_version'):
+        lines.append(f"**Dataset Version:** `{result['dataset_version']}`")
+    lines.append(f"**Total Items:** {result.get('total_items', 0)}" + (" (sampled)" if result.get('sampled') else ""))
     lines.append(f"**Successful:** {result.get('successful', 0)}")
     lines.append(f"**Failed:** {result.get('failed', 0)}")
 
     if result.get('evaluators_used'):
         lines.append(f"**Evaluators:** {', '.join(result['evaluators_used'])}")
+    if result.get('live_dataset'):
+        lines.append(format_live_dataset_line(result['live_dataset']))
+    checkpoint = result.get('checkpoint') or {}
+    if checkpoint.get('resumed_items') is not None:
+        lines.append(
+            f"**Resumed:** {checkpoint['resumed_items']} items from the checkpoint, "
+            f"{result.get('total_items', 0) - checkpoint['resumed_items']} run now"
+        )
+
+    execution = result.get('execution')
+    if execution:
+        lines.append(
+            f"**Execution:** {execution.get('mode')} mode, {execution.get('elapsed_seconds', 0)}s, "
+            f"{execution.get('throughput', 0)} items/s"
+        )
+        if execution.get('concurrency'):
+            lines.append(format_concurrency_line(execution['concurrency']))
+        if result.get('task_cache'):
+            cache = result['task_cache']
+            lines.append(
+                f"**Task Cache:** {cache['hits']} replayed, {execution.get('processed', 0) - cache['hits']} executed, "
+                f"{cache['stored']} stored (fingerprint `{cache['fingerprint']}`)"
+            )
+        if result.get('judge_cache'):
+            cache = result['judge_cache']
+            lines.append(
+                f"**Judge Cache:** {cache['hits']} hits, {cache['misses']} misses "
+                f"({cache['hit_rate']:.0%} hit rate)"
+            )
+        if result.get('combined_judges'):
+            combined = result['combined_judges']
+            groups = "; ".join(", ".join(group) for group in combined["groups"])
+            lines.append(f"**Combined Judges:** {groups} ({combined['fallback_calls']} fallback calls)")
+        if result.get('judge_batch'):
+            lines.append(format_judge_batch_line(result['judge_batch']))
+        if result.get('early_stop'):
+            lines.append(format_early_stop_line(result['early_stop']))
+        if result.get('judge_rate_limit'):
+            limit = result['judge_rate_limit']
+            caps = ", ".join(f"{v:g} {k}" for k, v in (("rpm", limit["rpm"]), ("tpm", limit["tpm"])) if v)
+            lines.append(f"**Judge Rate Limit:** {caps} ({limit['waited_seconds']}s spent waiting)")
+        if execution.get('events_failed') or execution.get('run_items_failed'):
+            lines.append(
+                f"**Warning:** {execution.get('events_failed', 0)} trace/score events and "
+                f"{execution.get('run_items_failed', 0)} run links failed to write to Langfuse"
+            )
 
     if result.get('score_averages'):
         lines.append("\n## Average Scores\n")
@@ -1403,6 +1904,121 @@ def format_result(result: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def format_live_dataset_line(report: Dict[str, Any]) -> str:
+    if report["reused"]:
+        return f"**Live Dataset:** reused `{report['dataset']}` ({report['traces']} traces, trace set `{report['trace_set']}`)"
+    line = (
+        f"**Live Dataset:** {report['created']} items created from {report['traces']} traces, "
+        f"{report['duplicates']} duplicates skipped"
+    )
+    if report["without_input"]:
+        line += f", {report['without_input']} without input"
+    if report["failed"]:
+        line += f", **{report['failed']} failed** (first: {report['failures'][0]['error']})"
+    return line
+
+
+def format_concurrency_line(summary: Dict[str, Any]) -> str:
+    timeline = summary["timeline"]
+    path = " → ".join(str(entry["concurrency"]) for entry in timeline[-8:])
+    if len(timeline) > 8:
+        path = "… → " + path
+    return (
+        f"**Concurrency:** adaptive, final {summary['final']}, peak {summary['peak']} "
+        f"({summary['changes']} changes, {summary['backoffs']} backoffs: {path})"
+    )
+
+
+def format_early_stop_line(summary: Dict[str, Any]) -> str:
+    low, high = summary["ci"]
+    detail = f"{summary['pairs']} pairs"
+    if summary.get("mean_diff") is not None:
+        detail += f", mean diff {summary['mean_diff']:+.3f}, {round((1 - summary['alpha']) * 100)}% CS [{low:+.3f}, {high:+.3f}]"
+    if summary["decision"] == "inconclusive":
+        return (
+            f"**Sequential Test:** no significant difference from `{summary['baseline_run']}` on "
+            f"{summary.get('score') or 'any shared score'} ({detail})"
+        )
+    return (
+        f"**Early Stop:** {summary['decision']} than `{summary['baseline_run']}` on {summary['score']} ({detail}); "
+        f"{summary['skipped']} items skipped"
+    )
+
+
+def format_judge_batch_line(summary: Dict[str, Any]) -> str:
+    status = summary.get("status")
+    if status == "cached":
+        return f"**Judge Batch:** all {summary.get('requests', 0)} judge responses came from the cache"
+    if status in ("applied", "partial"):
+        line = f"**Judge Batch:** {summary.get('scored', 0)} responses scored, {summary.get('failed', 0)} failed"
+        if summary.get("unparsed_dimensions"):
+            line += f", {summary['unparsed_dimensions']} combined dimensions unparsed"
+        if status == "partial":
+            jobs = ", ".join(f"{job['id']} {job['status']}" for job in summary.get("incomplete_jobs", []))
+            line += f"; incomplete jobs ({jobs}), re-run to resubmit the missing requests"
+        return line
+    return (
+        f"**Judge Batch:** {summary.get('requests', 0)} requests submitted ({', '.join(summary.get('batch_ids', []))}); "
+        f"collect later with `judge-batch --run-name <run>`"
+    )
+
+
+def format_judge_batch_result(result: Dict[str, Any]) -> str:
+    """Format judge-batch command output."""
+    if "error" in result:
+        return f"Error: {result['error']}"
+    lines = [f"# Judge Batch: {result.get('run_name')}\n"]
+    lines.append(f"**Status:** {result.get('status')}")
+    if result.get("status") == "pending":
+        for entry in result.get("batches", []):
+            lines.append(f"- `{entry['id']}`: {entry['status']}")
+        counts = result.get("request_counts", {})
+        lines.append(f"\n{counts.get('completed', 0)}/{counts.get('total', 0)} requests done, {counts.get('failed', 0)} failed")
+        return "\n".join(lines)
+    lines.append(f"**Scored:** {result.get('scored', 0)}")
+    lines.append(f"**Failed:** {result.get('failed', 0)}")
+    for job in result.get("incomplete_jobs") or []:
+        detail = f": {job['errors'][0]}" if job.get("errors") else ""
+        lines.append(f"- Job `{job['id']}` ended {job['status']}{detail}")
+    if result.get("unparsed_dimensions"):
+        lines.append(f"**Unparsed combined dimensions:** {result['unparsed_dimensions']}")
+    for error, count in (result.get("errors") or {}).items():
+        lines.append(f"- {count}x {error}")
+    if result.get("status") == "partial":
+        lines.append("\nSome jobs did not complete; re-run the experiment to resubmit the missing requests.")
+    if result.get("score_averages"):
+        lines.append("\n## Average Scores\n")
+        for name, avg in result["score_averages"].items():
+            lines.append(f"- **{name}:** {format_score_dual(avg)}")
+    return "\n".join(lines)
+
+
+def format_cache_summary(summary: Dict[str, Any], actions: Dict[str, Any]) -> str:
+    """Format local cache statistics for display."""
+    lines = ["# Experiment Caches\n"]
+    if actions.get("cleared") is not None:
+        lines.append(f"**Cleared:** {', '.join(actions['cleared']) or 'nothing to clear'}")
+    if actions.get("pruned"):
+        pruned = actions["pruned"]
+        lines.append(
+            f"**Pruned judge responses:** {pruned['expired']} expired, {pruned['evicted']} evicted, "
+            f"{pruned['remaining']} remaining"
+        )
+    if len(lines) > 1:
+        lines.append("")
+
+    lines.append("| Cache | Entries | Size | Oldest | Newest |")
+    lines.append("|-------|---------|------|--------|--------|")
+    for name, info in summary.items():
+        size = f"{info['bytes'] / 1024 / 1024:.1f} MB"
+        oldest = (info.get("oldest") or "-")[:19]
+        newest = (info.get("newest") or "-")[:19]
+        label = name + (f" ({info['fingerprints']} fingerprints)" if info.get("fingerprints") else "")
+        lines.append(f"| {label} | {info['entries']} | {size} | {oldest} | {newest} |")
+
+    return "\n".join(lines)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Langfuse Experiment Runner",
@@ -1414,9 +2030,11 @@ def main():
     # Run command
     run_parser = subparsers.add_parser("run", help="Run an experiment on a dataset")
     run_parser.add_argument("--dataset", required=False, help="Dataset name (required if source-type is dataset)")
-    run_parser.add_argument("--run-name", required=True, help="Name for this experiment run")
-    run_parser.add_argument("--task-script", required=True,
-                           help="Path to Python script with task() function")
+    run_parser.add_argument("--run-name", help="Name for this experiment run (required unless --resume)")
+    run_parser.add_argument("--task-script",
+                           help="Path to Python script with task() function (required unless --resume)")
+    run_parser.add_argument("--resume", metavar="RUN_NAME",
+                           help="Resume an interrupted run from its checkpoint: same arguments, only unfinished items")
     run_parser.add_argument("--evaluator-script",
                            help="Path to Python script with evaluator functions")
     run_parser.add_argument("--use-langfuse-judges", action="store_true",
@@ -1425,14 +2043,60 @@ def main():
                            help="Specific Langfuse judge prompt names to use (e.g., judge-accuracy judge-helpfulness)")
     run_parser.add_argument("--max-concurrency", type=int, default=5,
                            help="Maximum concurrent executions (default: 5)")
+    run_parser.add_argument("--adaptive-concurrency", action="store_true",
+                           help="Adjust concurrency during the run (AIMD): start at --max-concurrency, raise it while "
+                                "latency is stable, back off on 429s/timeouts")
+    run_parser.add_argument("--concurrency-ceiling", type=int, default=ADAPTIVE_MAX_CONCURRENCY,
+                           help=f"Upper bound for --adaptive-concurrency (default: {ADAPTIVE_MAX_CONCURRENCY})")
     run_parser.add_argument("--description", help="Run description")
+    run_parser.add_argument("--workers",
+                           help="Execution mode: thread[:N] (default) or process[:N] for CPU-bound scripts "
+                                "(N defaults to --max-concurrency)")
+    run_parser.add_argument("--cache-outputs", action="store_true",
+                           help="Store task outputs in the local cache (.claude/experiment-cache)")
+    run_parser.add_argument("--reuse-outputs", action="store_true",
+                           help="Replay cached task outputs and only run the task for cache misses (implies --cache-outputs)")
+    run_parser.add_argument("--cache-env", nargs="+",
+                           help="Env vars that affect the task output (e.g. MODEL_NAME); their values are part of the cache key")
+    run_parser.add_argument("--cache-key",
+                           help="Extra free-form cache key, e.g. a prompt version the task reads from elsewhere")
+    run_parser.add_argument("--no-judge-cache", action="store_true",
+                           help="Always call the judge model instead of reusing cached judge responses")
+    run_parser.add_argument("--judge-rpm", type=float,
+                           help="Max judge requests per minute, shared by all judges and items")
+    run_parser.add_argument("--judge-tpm", type=float,
+                           help="Max judge tokens per minute (prompt + completion), shared by all judges and items")
+    run_parser.add_argument("--combine-judges", action="store_true",
+                           help="Score all Langfuse judges that share a model in one structured call per item")
+    run_parser.add_argument("--judge-mode", choices=["inline", "batch"], default="inline",
+                           help="inline: call judges per item (default); batch: submit all judge requests via the OpenAI Batch API")
+    run_parser.add_argument("--batch-no-wait", action="store_true",
+                           help="In batch judge mode, return after submitting; collect later with judge-batch")
+    run_parser.add_argument("--batch-poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                           help=f"Seconds between Batch API status checks (default: {DEFAULT_POLL_INTERVAL:g})")
+    run_parser.add_argument("--baseline-run",
+                           help="Sequential test against this run: random item order, stop once clearly better or worse")
+    run_parser.add_argument("--early-stop-score",
+                           help="Score to test with --baseline-run (default: first score both runs share)")
+    run_parser.add_argument("--early-stop-alpha", type=float, default=EARLY_STOP_ALPHA,
+                           help=f"Error rate of the sequential test (default: {EARLY_STOP_ALPHA})")
+    run_parser.add_argument("--early-stop-min-items", type=int, default=EARLY_STOP_MIN_PAIRS,
+                           help=f"Paired items required before stopping (default: {EARLY_STOP_MIN_PAIRS})")
+    run_parser.add_argument("--seed", type=int,
+                           help="Seed for the randomized item order of a sequential test")
+    run_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                           help=f"Items per dispatch in process mode (default: {DEFAULT_CHUNK_SIZE})")
     
     # Live mode args
     run_parser.add_argument("--source-type", choices=["dataset", "live"], default="dataset",
                            help="Source of inputs: 'dataset' (default) or 'live' (last N traces)")
     run_parser.add_argument("--sample-size", type=int, default=10,
                            help="Number of traces to fetch in live mode")
-    run_parser.add_argument("--agent-name", help="Agent name (for filtering live traces - currently unused but reserved)")
+    run_parser.add_argument("--agent-name", help="Only use live traces with this trace name (live mode)")
+    run_parser.add_argument("--dataset-version",
+                           help="Pin the run to a local dataset snapshot (version ID, prefix, label or 'latest')")
+    run_parser.add_argument("--item-ids",
+                           help="File with dataset item IDs to run on (one per line, e.g. from dataset_manager.py sample)")
 
     # List runs command
     list_parser = subparsers.add_parser("list-runs", help="List experiment runs for a dataset")
@@ -1442,11 +2106,17 @@ def main():
     get_parser = subparsers.add_parser("get-run", help="Get details of an experiment run")
     get_parser.add_argument("--dataset", required=True, help="Dataset name")
     get_parser.add_argument("--run-name", required=True, help="Run name")
+    get_parser.add_argument("--summary-only", action="store_true",
+                           help="Only aggregate scores; never load item inputs/outputs")
+    get_parser.add_argument("--refresh", action="store_true",
+                           help="Re-fetch the run instead of using the local run cache")
 
     # Compare runs command
     compare_parser = subparsers.add_parser("compare", help="Compare experiment runs")
     compare_parser.add_argument("--dataset", required=True, help="Dataset name")
     compare_parser.add_argument("--runs", nargs="+", required=True, help="Run names to compare")
+    compare_parser.add_argument("--refresh", action="store_true",
+                               help="Re-fetch the runs instead of using the local run cache")
 
     # Analyze run command
     analyze_parser = subparsers.add_parser("analyze", help="Analyze experiment run results")
@@ -1457,10 +2127,44 @@ def main():
     analyze_parser.add_argument("--score-threshold", type=float,
                                help="Show items below this score threshold")
     analyze_parser.add_argument("--score-name", help="Score name to filter by")
+    analyze_parser.add_argument("--summary-only", action="store_true",
+                               help="Only show the score summary; never load item inputs/outputs")
+    analyze_parser.add_argument("--refresh", action="store_true",
+                               help="Re-fetch the run instead of using the local run cache")
+
+    # Judge batch command
+    batch_parser = subparsers.add_parser("judge-batch", help="Check a submitted judge batch and write its scores")
+    batch_parser.add_argument("--run-name", required=True, help="Run whose judge batch to collect")
+    batch_parser.add_argument("--wait", action="store_true", help="Poll until the batch finishes")
+    batch_parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                             help=f"Seconds between status checks (default: {DEFAULT_POLL_INTERVAL:g})")
+    batch_parser.add_argument("--force", action="store_true", help="Write scores again even if already applied")
+
+    # Cache command
+    cache_parser = subparsers.add_parser("cache", help="Inspect, prune or clear the local experiment caches")
+    cache_parser.add_argument("--prune", action="store_true",
+                             help="Evict old / least recently used judge responses")
+    cache_parser.add_argument("--max-entries", type=int, default=JUDGE_CACHE_MAX_ENTRIES,
+                             help=f"Judge responses to keep when pruning (default: {JUDGE_CACHE_MAX_ENTRIES})")
+    cache_parser.add_argument("--max-age-days", type=float, default=JUDGE_CACHE_MAX_AGE_DAYS,
+                             help=f"Drop judge responses unused for this long (default: {JUDGE_CACHE_MAX_AGE_DAYS})")
+    cache_parser.add_argument("--clear", choices=["task-outputs", "judge-responses", "runs", "live-datasets", "all"],
+                             help="Delete a cache entirely")
 
     args = parser.parse_args()
 
-    if args.command == "run":
+    if args.command == "run" and args.resume:
+        checkpoint = RunCheckpoint(args.resume)
+        if not checkpoint.exists:
+            print(f"Error: No checkpoint for run '{args.resume}' in {checkpoint.dir}", file=sys.stderr)
+            sys.exit(1)
+        result = run_experiment(**checkpoint.config()["arguments"], resume=True)
+        print(format_result(result))
+
+    elif args.command == "run":
+        if not args.run_name or not args.task_script:
+            print("Error: --run-name and --task-script are required (or --resume <run-name>)", file=sys.stderr)
+            sys.exit(1)
         # Check requirements based on source type
         if args.source_type == "dataset" and not args.dataset:
              print("Error: -dataset is required when source-type is 'dataset'", file=sys.stderr)
@@ -1478,19 +2182,53 @@ def main():
             source_type=args.source_type,
             sample_size=args.sample_size,
             agent_name=args.agent_name,
+            item_ids=read_sample_ids(args.item_ids) if args.item_ids else None,
+            dataset_version=args.dataset_version,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            cache_outputs=args.cache_outputs,
+            reuse_outputs=args.reuse_outputs,
+            cache_env=parse_cache_env(args.cache_env),
+            cache_key=args.cache_key,
+            judge_cache=not args.no_judge_cache,
+            judge_rpm=args.judge_rpm,
+            judge_tpm=args.judge_tpm,
+            combine=args.combine_judges,
+            judge_mode=args.judge_mode,
+            batch_wait=not args.batch_no_wait,
+            batch_poll_interval=args.batch_poll_interval,
+            baseline_run=args.baseline_run,
+            early_stop_score=args.early_stop_score,
+            early_stop_alpha=args.early_stop_alpha,
+            early_stop_min_items=args.early_stop_min_items,
+            seed=args.seed,
+            adaptive_concurrency=args.adaptive_concurrency,
+            concurrency_ceiling=args.concurrency_ceiling,
         )
         print(format_result(result))
 
+    elif args.command == "judge-batch":
+        result = collect_judge_batch(args.run_name, wait=args.wait, poll_interval=args.poll_interval, force=args.force)
+        print(format_judge_batch_result(result))
+
+    elif args.command == "cache":
+        actions = {}
+        if args.clear:
+            actions["cleared"] = clear_cache(args.clear)
+        if args.prune:
+            actions["pruned"] = JudgeResponseCache().prune(args.max_entries, args.max_age_days)
+        print(format_cache_summary(cache_summary(), actions))
+
     elif args.command == "list-runs":
         runs = list_runs(args.dataset)
         print(format_run_list(runs, args.dataset))
 
     elif args.command == "get-run":
-        run = get_run(args.dataset, args.run_name)
+        run = get_run(args.dataset, args.run_name, summary_only=args.summary_only, refresh=args.refresh)
         print(format_run_detail(run))
 
     elif args.command == "compare":
-        comparison = compare_runs(args.dataset, args.runs)
+        comparison = compare_runs(args.dataset, args.runs, refresh=args.refresh)
         print(comparison)
 
     elif args.command == "analyze":
@@ -1499,7 +2237,9 @@ def main():
             args.run_name,
             show_failures=args.show_failures,
             score_threshold=args.score_threshold,
-            score_name=args.score_name
+            score_name=args.score_name,
+            summary_only=args.summary_only,
+            refresh=args.refresh
         )
         print(analysis)
 
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+OpenAI Batch API Judging
+
+Collects the judge requests of an experiment run into JSONL batch files,
+submits them through the OpenAI Batch API (50% cheaper, results within 24h),
+polls for completion and yields the raw responses for the runner to parse
+and write back as scores.
+
+State lives in .claude/experiment-batches/<run-name>/:
+    requests.jsonl   one Batch API request per line
+    state.json       request -> (trace, judge) mapping, batch IDs, status
+
+so a run can submit and exit, and `experiment_runner.py judge-batch` can
+collect the results later. The client honors OPENAI_BASE_URL, so any
+Batch API compatible server can stand in for OpenAI.
+
+Used by experiment_runner.py; not a standalone CLI.
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+BATCH_DIR = Path(".claude/experiment-batches")
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_MAX_REQUESTS = 50000
+DEFAULT_POLL_INTERVAL = 30.0
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def batch_dir(run_name: str) -> Path:
+    return BATCH_DIR / re.sub(r"[^A-Za-z0-9._-]+", "_", run_name)
+
+
+class JudgeBatch:
+    """Judge requests for one run and the Batch API jobs that answer them."""
+
+    def __init__(self, run_name: str, dataset_name: Optional[str] = None):
+        self.run_name = run_name
+        self.dir = batch_dir(run_name)
+        self.requests_path = self.dir / "requests.jsonl"
+        self.state_path = self.dir / "state.json"
+        self.state: Dict[str, Any] = {
+            "run_name": run_name,
+            "dataset": dataset_name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "status": "collecting",
+            "judges": {},
+            "requests": {},
+            "batches": [],
+        }
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def load(cls, run_name: str) -> Optional["JudgeBatch"]:
+        batch = cls(run_name)
+        if not batch.state_path.exists():
+            return None
+        with open(batch.state_path) as f:
+            batch.state = json.load(f)
+        return batch
+
+    def save(self) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        tmp.replace(self.state_path)
+
+    def add_judge(self, key: str, descriptor: Dict[str, Any]) -> None:
+        self.state["judges"][key] = descriptor
+
+    def add(self, trace_id: str, judge_key: str, body: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> str:
+        """Queue one chat-completion request; returns its custom_id. `extra` is kept with the request's state."""
+        custom_id = f"{trace_id}:{judge_key}"
+        line = json.dumps({"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body})
+        with self._lock:
+            if self._file is None:
+                self.dir.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.requests_path, "w")
+            self._file.write(line + "\n")
+            self.state["requests"][custom_id] = {"custom_id": custom_id, "trace_id": trace_id, "judge": judge_key, **(extra or {})}
+        return custom_id
+
+    @property
+    def request_count(self) -> int:
+        return len(self.state["requests"])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        self.save()
+
+    def submit(self, client) -> List[str]:
+        """Upload the request file (split at the Batch API's request limit) and create the batch jobs."""
+        self.close()
+        parts: List[Path] = []
+        with open(self.requests_path) as f:
+            chunk: List[str] = []
+            for line in f:
+                chunk.append(line)
+                if len(chunk) >= BATCH_MAX_REQUESTS:
+                    parts.append(self._write_part(len(parts), chunk))
+                    chunk = []
+            if chunk:
+                parts.append(self._write_part(len(parts), chunk))
+
+        # Lines were written in request order, so each request's job follows from its position
+        offset = len(self.state["batches"])
+        for position, info in enumerate(self.state["requests"].values()):
+            info["batch"] = offset + position // BATCH_MAX_REQUESTS
+        for part in parts:
+            with open(part, "rb") as f:
+                uploaded = client.files.create(file=f, purpose="batch")
+            job = client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=BATCH_COMPLETION_WINDOW,
+                metadata={"run_name": self.run_name[:512]}
+            )
+            self.state["batches"].append({"id": job.id, "input_file_id": uploaded.id, "status": job.status})
+            print(f"Submitted judge batch {job.id} ({part.name})", file=sys.stderr)
+        self.state["status"] = "submitted"
+        self.state["submitted_at"] = datetime.now(timezone.utc).isoformat()
+        self.save()
+        return [b["id"] for b in self.state["batches"]]
+
+    def _write_part(self, index: int, lines: List[str]) -> Path:
+        path = self.dir / f"requests.part{index}.jsonl"
+        with open(path, "w") as f:
+            f.writelines(lines)
+        return path
+
+    def refresh(self, client) -> Dict[str, Any]:
+        """Fetch the status of every batch job; returns request counts across jobs."""
+        counts = {"total": 0, "completed": 0, "failed": 0}
+        for entry in self.state["batches"]:
+            if entry.get("status") not in TERMINAL_STATUSES:
+                job = client.batches.retrieve(entry["id"])
+                entry["status"] = job.status
+                entry["output_file_id"] = getattr(job, "output_file_id", None)
+                entry["error_file_id"] = getattr(job, "error_file_id", None)
+                errors = getattr(getattr(job, "errors", None), "data", None) or []
+                if errors:
+                    # Job-level failures (e.g. input validation) come with no output or error file
+                    entry["errors"] = [getattr(e, "message", None) or str(e) for e in errors][:10]
+                request_counts = getattr(job, "request_counts", None)
+                if request_counts is not None:
+                    entry["request_counts"] = {
+                        "total": getattr(request_counts, "total", 0),
+                        "completed": getattr(request_counts, "completed", 0),
+                        "failed": getattr(request_counts, "failed", 0),
+                    }
+            for key in counts:
+                counts[key] += (entry.get("request_counts") or {}).get(key, 0)
+        if self.done and self.state["status"] not in ("applied", "partial"):
+            self.state["status"] = "finished"
+        self.save()
+        return counts
+
+    @property
+    def done(self) -> bool:
+        return bool(self.state["batches"]) and all(b.get("status") in TERMINAL_STATUSES for b in self.state["batches"])
+
+    def wait(self, client, interval: float = DEFAULT_POLL_INTERVAL, timeout: Optional[float] = None) -> bool:
+        """Poll until every job is terminal (True) or timeout seconds pass (False)."""
+        started = time.monotonic()
+        while True:
+            counts = self.refresh(client)
+            statuses = ", ".join(sorted({b["status"] for b in self.state["batches"]}))
+            print(
+                f"Judge batch: {statuses} ({counts['completed']}/{counts['total'] or self.request_count} done, "
+                f"{counts['failed']} failed)",
+                file=sys.stderr
+            )
+            if self.done:
+                return True
+            if timeout is not None and time.monotonic() - started >= timeout:
+                return False
+            time.sleep(interval)
+
+    @property
+    def incomplete_jobs(self) -> List[Dict[str, Any]]:
+        """Jobs that ended failed, expired or cancelled."""
+        return [b for b in self.state["batches"] if b.get("status") in TERMINAL_STATUSES - {"completed"}]
+
+    def _missing_reason(self, info: Dict[str, Any]) -> str:
+        batches = self.state["batches"]
+        index = info.get("batch")
+        jobs = [batches[index]] if isinstance(index, int) and index < len(batches) else batches
+        for job in jobs:
+            if job.get("errors"):
+                return f"Batch {job['status']}: {job['errors'][0]}"
+        statuses = ", ".join(sorted({job.get("status") or "unknown" for job in jobs}))
+        return f"No result (batch {statuses})"
+
+    def results(self, client) -> Iterator[Tuple[Dict[str, Any], Optional[str], Optional[str]]]:
+        """
+        Yield (request info, response text, error) for every request. Requests
+        without an output or error line (a failed, expired or cancelled job)
+        are yielded last with the job's status or error as the reason.
+        """
+        seen = set()
+        for entry in self.state["batches"]:
+            for file_key in ("output_file_id", "error_file_id"):
+                file_id = entry.get(file_key)
+                if not file_id:
+                    continue
+                content = client.files.content(file_id).text
+                for line in content.splitlines():
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    info = self.state["requests"].get(record.get("custom_id"))
+                    if not info or info["custom_id"] in seen:
+                        continue
+                    seen.add(info["custom_id"])
+                    yield (info,) + _response_text(record)
+        for custom_id, info in self.state["requests"].items():
+            if custom_id not in seen:
+                yield info, None, self._missing_reason(info)
+
+    def mark_applied(self, summary: Dict[str, Any]) -> str:
+        """Record the applied summary; the status is "partial" if any job did not complete."""
+        self.state["status"] = "partial" if self.incomplete_jobs else "applied"
+        self.state["applied"] = {**summary, "at": datetime.now(timezone.utc).isoformat()}
+        self.save()
+        return self.state["status"]
+
+
+def _response_text(record: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """(text, error) from one Batch API output or error line."""
+    if record.get("error"):
+        error = record["error"]
+        return None, error.get("message") if isinstance(error, dict) else str(error)
+    response = record.get("response") or {}
+    if response.get("status_code", 200) >= 400:
+        body = response.get("body") or {}
+        message = (body.get("error") or {}).get("message") if isinstance(body, dict) else None
+        return None, message or f"HTTP {response.get('status_code')}"
+    try:
+        message = response["body"]["choices"][0]["message"]
+        if message.get("content"):
+            return message["content"].strip(), None
+        return message["tool_calls"][0]["function"]["arguments"].strip(), None
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return None, "Malformed batch response"
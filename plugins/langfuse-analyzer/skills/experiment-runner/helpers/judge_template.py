@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Judge Prompt Templates and Response Parsing
+
+JudgeTemplate compiles a Langfuse judge prompt once, at load time, into
+literal segments and placeholder slots, so filling it per item is a single
+join instead of one str.replace pass per placeholder. Compiling also checks
+the placeholders: a template without {{output}} or with unknown names is
+reported when the judge is loaded rather than silently producing bad scores.
+
+parse_judge_response turns a judge's reply into (raw score, reasoning). It
+accepts JSON-mode replies, tool-call arguments, JSON inside code fences or
+prose (nested objects included) and, as a last resort, a bare number.
+
+Used by experiment_runner.py; not a standalone CLI.
+"""
+
+import json
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+CODE_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+SCORE_PATTERN = re.compile(r"\bscore\b\"?\s*[:=]\s*\"?(-?\d+(?:\.\d+)?)", re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r"\b(\d+(?:\.\d+)?)\b")
+
+TEMPLATE_VARIABLES = ("input", "output", "expected_output")
+REASONING_KEYS = ("reasoning", "explanation", "rationale", "comment")
+
+
+class JudgeTemplate:
+    """
+    A judge prompt split into literal segments and placeholder slots.
+
+    render() fills known slots from a mapping; placeholders with no value
+    are kept verbatim, as plain string replacement would have left them.
+    """
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self._segments: List[str] = []
+        self._slots: List[Tuple[str, str]] = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(self.text):
+            self._segments.append(self.text[position:match.start()])
+            self._slots.append((match.group(1), match.group(0)))
+            position = match.end()
+        self._segments.append(self.text[position:])
+        self.variables = {name for name, _ in self._slots}
+
+    def problems(self) -> List[str]:
+        """Placeholder issues worth warning about when the judge is loaded."""
+        issues = []
+        if "output" not in self.variables:
+            issues.append("no {{output}} placeholder, so the judge never sees the task output")
+        unknown = sorted(self.variables - set(TEMPLATE_VARIABLES))
+        if unknown:
+            issues.append(
+                f"unknown placeholders {', '.join('{{' + name + '}}' for name in unknown)} are sent as-is"
+            )
+        return issues
+
+    def render(self, values: Dict[str, str]) -> str:
+        parts = [self._segments[0]]
+        for (name, token), segment in zip(self._slots, self._segments[1:]):
+            parts.append(values.get(name, token))
+            parts.append(segment)
+        return "".join(parts)
+
+
+def template_values(input: Any, output: Any, expected_output: Any = None) -> Dict[str, str]:
+    """Placeholder values for one item, formatted as judges have always seen them."""
+    return {
+        "input": str(input) if input else "",
+        "output": str(output) if output else "",
+        "expected_output": str(expected_output) if expected_output else "Not provided",
+    }
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """First JSON object in text, nested braces included; None if there is none."""
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(text, start)
+            if isinstance(value, dict):
+                return value
+        except json.JSONDecodeError:
+            pass
+        start = text.find("{", start + 1)
+    return None
+
+
+def parse_json_response(text: str) -> Optional[Dict[str, Any]]:
+    """The JSON object in a judge reply: whole-text JSON mode first, then fenced or embedded JSON."""
+    text = text.strip()
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            return value
+    except json.JSONDecodeError:
+        pass
+    fenced = CODE_FENCE_PATTERN.search(text)
+    if fenced:
+        value = extract_json_object(fenced.group(1))
+        if value is not None:
+            return value
+    return extract_json_object(text)
+
+
+def _find_score(value: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The object holding "score": the reply itself or the first nested object with one."""
+    if "score" in value:
+        return value
+    for child in value.values():
+        if isinstance(child, dict):
+            found = _find_score(child)
+            if found is not None:
+                return found
+    return None
+
+
+def parse_judge_response(text: str) -> Optional[Tuple[float, str]]:
+    """
+    (raw score, reasoning) from a judge reply, or None if no score can be found.
+
+    A reply containing JSON is trusted as structured: a missing or non-numeric
+    score ("N/A", null) is a parse failure, never a number scraped from the
+    reasoning. Only replies without any JSON fall back to a "score: N" or
+    first-number match.
+    """
+    parsed = parse_json_response(text)
+    if parsed is not None:
+        entry = _find_score(parsed)
+        if entry is None or isinstance(entry["score"], bool):
+            return None
+        raw_score = entry["score"]
+        try:
+            if not isinstance(raw_score, (int, float)):
+                raw_score = float(raw_score)
+        except (TypeError, ValueError):
+            return None
+        if not math.isfinite(raw_score):
+            return None
+        reasoning = next((str(entry[k]) for k in REASONING_KEYS if entry.get(k)), "")
+        return raw_score, reasoning
+
+    match = SCORE_PATTERN.search(text) or NUMBER_PATTERN.search(text)
+    if match:
+        return float(match.group(1)), text[:100]
+    return None
+
+
+def message_text(message: Any) -> str:
+    """Reply text of a chat message: its content, or the first tool call's arguments."""
+    content = getattr(message, "content", None)
+    if content:
+        return content.strip()
+    tool_calls = getattr(message, "tool_calls", None) or []
+    if tool_calls:
+        return (tool_calls[0].function.arguments or "").strip()
+    return ""
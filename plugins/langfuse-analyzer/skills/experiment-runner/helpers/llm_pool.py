@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Shared LLM Clients and Rate Limiting
+
+One pooled OpenAI client per process and one AsyncOpenAI client per event
+loop, so judge calls reuse HTTP connections instead of opening a new pool
+per evaluation. Every judge call also goes through a process-wide token
+bucket limiter on requests and tokens per minute.
+
+Used by experiment_runner.py; not a standalone CLI.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any, Optional
+
+OPENAI_MAX_RETRIES = 5
+
+_client_lock = threading.Lock()
+_sync_client: Any = None
+_sync_client_pid: Optional[int] = None
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_openai_client():
+    """Process-wide OpenAI client (recreated after fork, since sockets do not survive it)."""
+    global _sync_client, _sync_client_pid
+    with _client_lock:
+        if _sync_client is None or _sync_client_pid != os.getpid():
+            from openai import OpenAI
+            _sync_client = OpenAI(max_retries=OPENAI_MAX_RETRIES)
+            _sync_client_pid = os.getpid()
+        return _sync_client
+
+
+def get_async_openai_client():
+    """AsyncOpenAI client for the running event loop; async HTTP pools are loop-bound."""
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(max_retries=OPENAI_MAX_RETRIES)
+            _async_clients[loop] = client
+        return client
+
+
+def estimate_tokens(text: str, max_completion_tokens: int = 0) -> int:
+    """Rough token count for rate limiting (~4 characters per token) plus the completion budget."""
+    return len(text) // 4 + 1 + (max_completion_tokens or 0)
+
+
+class RateLimiter:
+    """
+    Token buckets for requests and tokens per minute.
+
+    Both buckets start full and refill continuously. A call reserves one
+    request plus its estimated tokens, and waits until both buckets can cover
+    it. settle() corrects the token bucket once the actual usage is known.
+    None disables a limit.
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm) if rpm else 0.0
+        self._tokens = float(tpm) if tpm else 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rpm or self.tpm)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60.0)
+
+    def _reserve(self, tokens: int) -> float:
+        """Take capacity and return 0, or return how long to wait before retrying."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tpm:
+                tokens = min(tokens, int(self.tpm))
+            wait = 0.0
+            if self.rpm and self._requests < 1:
+                wait = max(wait, (1 - self._requests) * 60.0 / self.rpm)
+            if self.tpm and self._tokens < tokens:
+                wait = max(wait, (tokens - self._tokens) * 60.0 / self.tpm)
+            if wait > 0:
+                return wait
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+            return 0.0
+
+    def acquire(self, tokens: int = 0) -> None:
+        if not self.enabled:
+            return
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            self._note_wait(wait)
+            time.sleep(min(wait, 1.0))
+
+    async def acquire_async(self, tokens: int = 0) -> None:
+        if not self.enabled:
+            return
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            self._note_wait(wait)
+            await asyncio.sleep(min(wait, 1.0))
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Refund (or charge) the difference between estimated and actual tokens."""
+        if not self.tpm or actual is None:
+            return
+        with self._lock:
+            self._tokens = min(float(self.tpm), self._tokens + estimated - actual)
+
+    def _note_wait(self, wait: float) -> None:
+        with self._lock:
+            self.waited_seconds += min(wait, 1.0)
+
+
+_limiter = RateLimiter()
+
+
+def configure_rate_limits(rpm: Optional[float] = None, tpm: Optional[float] = None) -> RateLimiter:
+    """Replace the process-wide limiter shared by all judges."""
+    global _limiter
+    _limiter = RateLimiter(rpm, tpm)
+    return _limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    return _limiter
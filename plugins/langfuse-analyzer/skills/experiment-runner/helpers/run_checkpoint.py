@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Experiment Run Checkpoints
+
+Every run keeps a checkpoint in .claude/experiment-checkpoints/<run-name>/:
+    run.json        the run's arguments, so it can be resumed by name alone
+    journal.jsonl   one line per finished item: dataset item ID, trace ID,
+                    output and scores
+
+An item is journaled only once its trace, scores and run link have been
+written to Langfuse, so `experiment_runner.py run --resume <run-name>`
+can skip every journaled item and run just the remainder without losing
+or duplicating results.
+
+The journal is append-only. Each record is written as one complete line
+to an O_APPEND file under a lock (short writes are continued), so concurrent
+workers never interleave records; a line torn by a crash is cut off when the
+run resumes.
+
+Used by experiment_runner.py; not a standalone CLI.
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CHECKPOINT_DIR = Path(".claude/experiment-checkpoints")
+
+
+def checkpoint_dir(run_name: str) -> Path:
+    return CHECKPOINT_DIR / re.sub(r"[^A-Za-z0-9._-]+", "_", run_name)
+
+
+class RunCheckpoint:
+    """Arguments and completed-item journal of one experiment run."""
+
+    def __init__(self, run_name: str):
+        self.run_name = run_name
+        self.dir = checkpoint_dir(run_name)
+        self.config_path = self.dir / "run.json"
+        self.journal_path = self.dir / "journal.jsonl"
+        self.appended = 0
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+
+    @property
+    def exists(self) -> bool:
+        return self.config_path.exists()
+
+    def config(self) -> Dict[str, Any]:
+        with open(self.config_path) as f:
+            return json.load(f)
+
+    def start(self, arguments: Dict[str, Any]) -> None:
+        """Record the run's arguments and start an empty journal."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._save_config({
+            "run_name": self.run_name,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "arguments": arguments,
+        })
+        with open(self.journal_path, "w"):
+            pass
+
+    def mark(self, **fields: Any) -> None:
+        """Merge fields (status, resumed_at, ...) into run.json."""
+        self._save_config({**self.config(), **fields})
+
+    def _save_config(self, config: Dict[str, Any]) -> None:
+        tmp = self.config_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(config, f, indent=2, default=str)
+        tmp.replace(self.config_path)
+
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        """Journal records by dataset item ID. A torn final line is truncated away first."""
+        if not self.journal_path.exists():
+            return {}
+        with open(self.journal_path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+        records = {}
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["item_id"]] = record
+        return records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            if self._fd is None:
+                self.dir.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            written = 0
+            while written < len(line):
+                written += os.write(self._fd, line[written:])
+            self.appended += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Paired Run Statistics
+
+Compares two experiment runs item by item. Scores are joined on the dataset
+item ID, and for every score the candidate-minus-baseline differences get:
+
+    - a bootstrap confidence interval for the mean difference
+    - a paired t-test and an exact sign test
+    - win / loss / tie counts
+
+NumPy is used when installed (vectorized resampling); otherwise a pure
+Python fallback with fewer resamples keeps the command dependency-free.
+Scores are compared in parallel.
+
+Used by experiment_runner.py; not a standalone CLI.
+"""
+
+import math
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+BOOTSTRAP_RESAMPLES = 10000
+FALLBACK_RESAMPLES = 2000
+BOOTSTRAP_CHUNK = 1000
+CONFIDENCE = 0.95
+TIE_EPSILON = 1e-9
+
+
+def paired_differences(
+    baseline: Dict[str, Dict[str, Any]],
+    candidate: Dict[str, Dict[str, Any]],
+    score_name: str
+) -> List[float]:
+    """candidate - baseline for every item ID where both runs have a numeric score_name."""
+    diffs = []
+    for item_id, scores in candidate.items():
+        value = scores.get(score_name)
+        base = baseline.get(item_id, {}).get(score_name)
+        if _numeric(value) and _numeric(base):
+            diffs.append(float(value) - float(base))
+    return diffs
+
+
+def _numeric(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    """Continued fraction for the regularized incomplete beta function (modified Lentz)."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 201):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 3e-12:
+            break
+    return h
+
+
+def _incomplete_beta(a: float, b: float, x: float) -> float:
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def paired_t_test(diffs: Sequence[float]) -> Optional[float]:
+    """Two-sided p-value of a paired t-test on the differences; None with fewer than 2 pairs."""
+    n = len(diffs)
+    if n < 2:
+        return None
+    mean = sum(diffs) / n
+    variance = sum((d - mean) ** 2 for d in diffs) / (n - 1)
+    if variance == 0:
+        return 1.0 if mean == 0 else 0.0
+    t = mean / math.sqrt(variance / n)
+    df = n - 1
+    return _incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+
+
+def sign_test(wins: int, losses: int) -> Optional[float]:
+    """Exact two-sided sign test on wins vs losses (ties dropped); None without any decided pair."""
+    n = wins + losses
+    if n == 0:
+        return None
+    k = min(wins, losses)
+    tail = sum(math.comb(n, i) for i in range(k + 1)) / 2.0 ** n
+    return min(1.0, 2.0 * tail)
+
+
+def bootstrap_ci(
+    diffs: Sequence[float],
+    resamples: Optional[int] = None,
+    confidence: float = CONFIDENCE,
+    seed: int = 0
+) -> Optional[tuple]:
+    """Percentile bootstrap interval for the mean of diffs, as (low, high)."""
+    n = len(diffs)
+    if n == 0:
+        return None
+    alpha = (1.0 - confidence) / 2.0
+    if HAS_NUMPY:
+        resamples = resamples or BOOTSTRAP_RESAMPLES
+        rng = np.random.default_rng(seed)
+        values = np.asarray(diffs, dtype=float)
+        means = np.empty(resamples)
+        # Resample in chunks so a 1000-item run never needs a resamples x n index matrix
+        for start in range(0, resamples, BOOTSTRAP_CHUNK):
+            size = min(BOOTSTRAP_CHUNK, resamples - start)
+            means[start:start + size] = values[rng.integers(0, n, size=(size, n))].mean(axis=1)
+        low, high = np.quantile(means, [alpha, 1.0 - alpha])
+        return float(low), float(high)
+
+    resamples = resamples or FALLBACK_RESAMPLES
+    rng = random.Random(seed)
+    means = sorted(sum(rng.choices(diffs, k=n)) / n for _ in range(resamples))
+    return means[int(alpha * (resamples - 1))], means[int((1.0 - alpha) * (resamples - 1))]
+
+
+def compare_score(diffs: Sequence[float], resamples: Optional[int] = None) -> Dict[str, Any]:
+    """Paired statistics for one score's differences."""
+    n = len(diffs)
+    wins = sum(1 for d in diffs if d > TIE_EPSILON)
+    losses = sum(1 for d in diffs if d < -TIE_EPSILON)
+    ci = bootstrap_ci(diffs, resamples)
+    if ci is None:
+        verdict = "no paired items"
+    elif ci[0] > 0:
+        verdict = "better"
+    elif ci[1] < 0:
+        verdict = "worse"
+    else:
+        verdict = "no significant difference"
+    return {
+        "pairs": n,
+        "mean_diff": sum(diffs) / n if n else None,
+        "ci_low": ci[0] if ci else None,
+        "ci_high": ci[1] if ci else None,
+        "p_t_test": paired_t_test(diffs),
+        "p_sign_test": sign_test(wins, losses),
+        "wins": wins,
+        "losses": losses,
+        "ties": n - wins - losses,
+        "verdict": verdict,
+    }
+
+
+def compare_item_scores(
+    baseline: Dict[str, Dict[str, Any]],
+    candidate: Dict[str, Dict[str, Any]],
+    score_names: Sequence[str],
+    resamples: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """compare_score for every score name, computed in parallel."""
+    names = list(score_names)
+    if not names:
+        return {}
+    workers = max(1, min(len(names), os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            lambda name: compare_score(paired_differences(baseline, candidate, name), resamples),
+            names
+        )
+        return dict(zip(names, results))
+
+
+class ConfidenceSequence:
+    """
+    Always-valid confidence sequence for the mean paired difference.
+
+    Differences lie in [-1, 1] (scores are on the 0-1 scale) and are mapped
+    to [0, 1] for the predictable plug-in empirical-Bernstein bound of
+    Waudby-Smith & Ramdas (2023). The interval holds simultaneously at every
+    step with probability 1 - alpha, so it can be checked after every item
+    and the run stopped as soon as it excludes zero without inflating the
+    error rate. It tightens with the observed variance of the differences.
+    """
+
+    def __init__(self, alpha: float = 1 - CONFIDENCE, max_lambda: float = 0.5):
+        self.alpha = alpha
+        self.max_lambda = max_lambda
+        self.count = 0
+        self._log_term = math.log(2.0 / alpha)
+        self._sum_x = 0.0
+        self._sum_sq = 0.0
+        self._mean = 0.5
+        self._variance = 0.25
+        self._sum_lambda = 0.0
+        self._sum_lambda_x = 0.0
+        self._sum_penalty = 0.0
+        self._sum_diff = 0.0
+        self.low = -1.0
+        self.high = 1.0
+
+    def update(self, diff: float) -> None:
+        x = min(1.0, max(0.0, (diff + 1.0) / 2.0))
+        self.count += 1
+        t = self.count
+        lam = min(math.sqrt(2.0 * self._log_term / (self._variance * t * math.log(1.0 + t))), self.max_lambda)
+        v = 4.0 * (x - self._mean) ** 2
+        self._sum_lambda += lam
+        self._sum_lambda_x += lam * x
+        self._sum_penalty += v * (-math.log(1.0 - lam) - lam) / 4.0
+        self._sum_diff += diff
+
+        center = self._sum_lambda_x / self._sum_lambda
+        width = (self._log_term + self._sum_penalty) / self._sum_lambda
+        # The running intersection of an always-valid sequence is still valid
+        self.low = max(self.low, 2.0 * max(0.0, center - width) - 1.0)
+        self.high = min(self.high, 2.0 * min(1.0, center + width) - 1.0)
+
+        self._sum_x += x
+        self._mean = (0.5 + self._sum_x) / (t + 1)
+        self._sum_sq += (x - self._mean) ** 2
+        self._variance = (0.25 + self._sum_sq) / (t + 1)
+
+    @property
+    def mean_diff(self) -> Optional[float]:
+        return self._sum_diff / self.count if self.count else None
+
+    def decision(self, min_pairs: int = 0) -> Optional[str]:
+        """"better" / "worse" once the interval excludes zero (after min_pairs), else None."""
+        if self.count < min_pairs:
+            return None
+        if self.low > 0:
+            return "better"
+        if self.high < 0:
+            return "worse"
+        return None
+
+
+class SequentialComparison:
+    """
+    Running paired comparison of a candidate run against a baseline run's
+    per-item scores, for stopping a run early.
+
+    observe() is fed each finished item's normalized scores. Items the
+    baseline has no score for are ignored. Without a score_name, the first
+    score both runs share is used.
+    """
+
+    def __init__(
+        self,
+        baseline_scores: Dict[str, Dict[str, Any]],
+        score_name: Optional[str] = None,
+        alpha: float = 1 - CONFIDENCE,
+        min_pairs: int = 20
+    ):
+        self.baseline_scores = baseline_scores
+        self.score_name = score_name
+        self.min_pairs = min_pairs
+        self.sequence = ConfidenceSequence(alpha)
+        self.decision: Optional[str] = None
+        self.decided_at: Optional[int] = None
+
+    def observe(self, item_id: Any, scores: Dict[str, Any]) -> Optional[str]:
+        """Record one item; returns "better" / "worse" the first time the comparison is decided."""
+        baseline = self.baseline_scores.get(item_id)
+        if self.decision or not baseline:
+            return None
+        if self.score_name is None:
+            shared = [name for name, value in scores.items() if _numeric(value) and _numeric(baseline.get(name))]
+            if not shared:
+                return None
+            self.score_name = shared[0]
+        value, base = scores.get(self.score_name), baseline.get(self.score_name)
+        if not (_numeric(value) and _numeric(base)):
+            return None
+        self.sequence.update(float(value) - float(base))
+        self.decision = self.sequence.decision(self.min_pairs)
+        if self.decision:
+            self.decided_at = self.sequence.count
+        return self.decision
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "score": self.score_name,
+            "decision": self.decision or "inconclusive",
+            "pairs": self.sequence.count,
+            "mean_diff": self.sequence.mean_diff,
+            "ci": [self.sequence.low, self.sequence.high],
+            "alpha": self.sequence.alpha,
+        }